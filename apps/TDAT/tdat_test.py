@@ -1,11 +1,22 @@
 import unittest
-import time
 import logging
-from selenium import webdriver
+import re
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.action_chains import ActionChains
+
+from egis_testing import dom, links
+from egis_testing.artifacts import capture_failure, test_failed
+from egis_testing.downloads import validate_workbook
+from egis_testing.drivers import allow_resources, allowed_resources, apply_blocking
+from egis_testing.environments import current_environment
+from egis_testing.fingerprints import depends_on
+from egis_testing.logs import configure_logging
+from egis_testing.network import record_network
+from egis_testing.pages import TDATPage
+from egis_testing.pool import get_pool
+from egis_testing.queries import record_queries
+from egis_testing.tracing import get_tracer, traced
+from egis_testing.waits import Waiter, WaitStats
 
 
 class TDATSiteNavigationTests(unittest.TestCase):
@@ -13,124 +24,144 @@ class TDATSiteNavigationTests(unittest.TestCase):
     def setUpClass(cls):
         """
         Class setup method that runs once before all tests.
-        Configures logging and initializes the WebDriver.
+        Configures logging and attaches the shared WebDriver session pool.
         """
-        # Configure logging with absolute path
+        # Logging goes through a background writer; under the parallel
+        # runner every worker has its own JSON-lines log instead
         import os
 
-        log_file = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), "tdat_tests.log"
-        )
-
-        # Clear the log file at the start
-        open(log_file, "w").close()  # Clear the log file
-
-        # Clear existing handlers to avoid duplication
-        logging.getLogger().handlers = []
-
-        # Configure logging with file and stream handlers
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(asctime)s - %(levelname)s - %(message)s",
-            handlers=[
-                logging.FileHandler(
-                    log_file, mode="w"
-                ),  # 'w' mode to clear file on each run
-                logging.StreamHandler(),
-            ],
+        configure_logging(
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "tdat_tests.log")
         )
         cls.logger = logging.getLogger(__name__)
         cls.logger.info("Starting test suite execution")
 
-        # Initialize the WebDriver
-        cls.driver = webdriver.Chrome()
-        cls.driver.implicitly_wait(10)
-        cls.environment_url = "egis"
+        # Sessions are leased per test from the process-wide pool, which
+        # keeps Chrome warm across tests and suites
+        cls.pool = get_pool()
+        cls.implicit_wait = cls.pool.implicit_wait
+        cls.environment_url = current_environment()
+        cls.wait_stats = WaitStats()
+        cls.link_checks = None
         cls.logger.info("Test suite setup complete")
 
     def setUp(self):
         """
         Instance setup method that runs before each test.
-        Initializes WebDriverWait for explicit waits.
-        """
-        self.wait = WebDriverWait(self.driver, 10)
-
-    # Helper Methods
-    def visit_tdat_site(self):
-        """
-        Navigates to the TDAT website and waits for initial load.
-        """
-        self.driver.get(f"https://{self.environment_url}.hud.gov/TDAT/")
-        time.sleep(1)
-
-    def close_splash_screen(self):
-        """
-        Closes the initial splash screen modal that appears on site load.
-        """
-        close_button = self.driver.find_element(
-            By.CSS_SELECTOR, "#splash-screen-modal .close"
+        Leases a WebDriver session and initializes the condition-based waiter
+        and the page object.
+        """
+        self.test_span = get_tracer().begin(self.id(), "test")
+        self.driver = self.pool.acquire()
+        allowed = allowed_resources(self)
+        if allowed:
+            apply_blocking(self.driver, self.pool.profile, allowed)
+        self.wait = Waiter(
+            self.driver,
+            timeout=10,
+            stats=self.wait_stats,
+            implicit_wait=self.implicit_wait,
         )
-        close_button.click()
-        time.sleep(1)
+        self.page = TDATPage(self.driver, self.wait, self.environment_url, self.logger)
 
-    def open_menu(self):
+    def tearDown(self):
         """
-        Opens the main navigation menu.
+        Instance cleanup method that runs after each test.
+        Captures failure artifacts (or, when capturing, the service queries
+        of a passing test) and the test's network report, then returns the
+        session to the pool, which resets it for the next test.
         """
-        menu_button = self.driver.find_element(
-            By.CSS_SELECTOR, "#tdat-collaspe-menu .dropdown-toggle"
-        )
-        menu_button.click()
-        time.sleep(1)
-
-    def switch_to_new_tab(self):
-        """
-        Switches WebDriver focus to newly opened tab.
-        Returns: The window handle of the new tab.
-        """
-        new_window = self.driver.window_handles[-1]
-        self.driver.switch_to.window(new_window)
-        return new_window
+        if test_failed(self):
+            artifacts = capture_failure(self.driver, self.id())
+            self.logger.error(f"Failure artifacts written to {artifacts}")
+        else:
+            record_queries(self.driver, self.id())
+        record_network(self.driver, self.id())
+        self.pool.release(self.driver)
+        self.test_span.end()
 
-    def switch_back_to_main_tab(self):
+    # Helper Methods
+    def visit_tdat_site(self):
         """
-        Closes current tab and switches focus back to the main window.
+        Navigates to the TDAT website and waits for initial load.
         """
-        self.driver.close()
-        self.driver.switch_to.window(self.driver.window_handles[0])
+        self.page.visit()
 
-    def verify_url_and_log(self, expected_url, test_name):
+    def menu_link_checks(self):
         """
-        Verifies current URL matches expected URL and logs result.
+        Reads the documentation links from the menu and the HUD information
+        modal, and fetches them all concurrently over HTTP. The checks run
+        once per suite and are shared by the link tests.
+        Returns:
+            dict: URL to its link check result
+        """
+        cls = type(self)
+        if cls.link_checks is None:
+            self.page.visit()
+            self.page.close_splash_screen()
+            self.page.open_menu_item(6)
+            self.wait.visible((By.CSS_SELECTOR, "#info-text ul li a"))
+            cls.link_checks = links.check_links(links.read_links(self.driver))
+        return cls.link_checks
+
+    @traced
+    def verify_link_and_log(self, expected_url, content_type, test_name):
+        """
+        Verifies a menu link leads to expected_url and serves the expected
+        content, without opening it in a browser tab.
         Args:
-            expected_url (str): The URL that should be loaded
+            expected_url (str): The URL the link should load
+            content_type (str): Expected media type, e.g. "application/pdf"
             test_name (str): Name of the test for logging purposes
         Returns:
-            bool: True if URLs match, False otherwise
-        """
-        current_url = self.driver.current_url
-        if current_url == expected_url:
-            self.logger.info(f"Test Passed: Successfully navigated to {test_name}")
+            bool: True if the link is present and loads, False otherwise
+        """
+        result = next(
+            (
+                check
+                for check in self.menu_link_checks().values()
+                if expected_url in (check["url"], check["final_url"])
+            ),
+            None,
+        )
+        if result is None:
+            self.logger.error(f"Test Failed: No menu link leads to {expected_url}")
+            return False
+        problems = links.link_problems(result, content_type)
+        if problems:
+            self.logger.error(f"Test Failed: {test_name}: {'; '.join(problems)}")
         else:
-            self.logger.error(
-                f"Test Failed: Expected URL {expected_url} but got {current_url}"
+            self.logger.info(
+                f"Test Passed: {test_name} loads ({result['content_type']}, "
+                f"{result['bytes']} bytes, sha256 {result['sha256'][:12]})"
             )
-        return current_url == expected_url
+        return not problems
 
-    def select_dropdown_option(self, dropdown_id, option_text):
+    @traced
+    def check_tribe(self, tribe):
         """
-        Selects an option from a dropdown menu.
-        Args:
-            dropdown_id (str): The ID of the dropdown element
-            option_text (str): The text of the option to select
+        Matrix case: the grid title names the selected tribe.
+        """
+        grid = self.page.search_tribe(tribe)
+        self.assertTrue(grid.displayed("title"), "Grid title is not displayed")
+        self.assertRegex(
+            grid.text("title"), rf"^Contact Information for {re.escape(tribe)}$"
+        )
+
+    @traced
+    def check_county(self, state, county):
+        """
+        Matrix case: the grid title names the selected county and state.
         """
-        dropdown = self.driver.find_element(By.ID, dropdown_id)
-        dropdown.click()
-        time.sleep(1)
-        option = self.driver.find_element(By.XPATH, f"//option[text()='{option_text}']")
-        option.click()
-        time.sleep(1)
+        grid = self.page.search_counties(state, [county])
+        self.assertTrue(grid.displayed("title"), "Grid title is not displayed")
+        self.assertRegex(
+            grid.text("title"),
+            rf"^Contact Information for Tribes with Interests in "
+            rf"{re.escape(county)}( count(y|ies))?, {re.escape(state)}$",
+        )
 
+    @depends_on("index", "bundles", "rest")
     def test_search_for_tribes(self):
         """
         Tests the basic search functionality by clicking the 'Search For Tribes' button.
@@ -138,8 +169,7 @@ class TDATSiteNavigationTests(unittest.TestCase):
         """
         with self.subTest("Test Title: Search for Tribes"):
             try:
-                self.visit_tdat_site()
-                self.driver.find_element(By.ID, "btn-search-tribes").click()
+                self.page.open_search()
                 self.logger.info(
                     'Test Passed: Able to click the "Search For Tribes" button.'
                 )
@@ -149,6 +179,7 @@ class TDATSiteNavigationTests(unittest.TestCase):
                 )
                 raise
 
+    @depends_on("index", "bundles")
     def test_advanced_search(self):
         """
         Tests the advanced search functionality.
@@ -156,19 +187,13 @@ class TDATSiteNavigationTests(unittest.TestCase):
         """
         with self.subTest("Test Title: Advanced Search"):
             try:
-                self.visit_tdat_site()
-                self.close_splash_screen()
-
-                search_button = self.driver.find_element(
-                    By.CSS_SELECTOR, "#tdat-collaspe-menu .header-style"
-                )
-                search_button.click()
+                self.page.visit()
+                self.page.close_splash_screen()
+                self.page.click(self.page.ADVANCED_SEARCH)
 
-                time.sleep(2)
-                title = self.driver.find_element(
-                    By.CSS_SELECTOR, "#modal-body-2 .control-label"
+                title_text = self.page.text(
+                    (By.CSS_SELECTOR, "#modal-body-2 .control-label")
                 )
-                title_text = title.text
 
                 if title_text == "Option 1: Search by Address":
                     self.logger.info(
@@ -181,6 +206,7 @@ class TDATSiteNavigationTests(unittest.TestCase):
                 self.logger.error(f"Test Failed: Advanced Search test failed: {str(e)}")
                 raise
 
+    @depends_on("index", "bundles", "rest")
     def test_select_tribe(self):
         """
         Tests the tribe selection functionality.
@@ -188,20 +214,14 @@ class TDATSiteNavigationTests(unittest.TestCase):
         """
         with self.subTest("Test Title: Find Tribal Contact Information for a Tribe"):
             try:
-                self.visit_tdat_site()
-                self.driver.find_element(By.ID, "btn-search-tribes").click()
-                self.select_dropdown_option(
-                    "tribe", "Absentee-Shawnee Tribe of Indians of Oklahoma"
+                grid = self.page.search_tribe(
+                    "Absentee-Shawnee Tribe of Indians of Oklahoma"
                 )
-                time.sleep(1)
-
-                info_popup = self.driver.find_element(By.ID, "grid-title")
-                title_text = info_popup.text
                 if (
-                    title_text
+                    grid.text("title")
                     == "Contact Information for Absentee-Shawnee Tribe of Indians of Oklahoma"
                 ):
-                    assert info_popup.is_displayed()
+                    assert grid.displayed("title")
                     self.logger.info("Test Passed: Tribe selection verified")
                 else:
                     self.logger.error("Test Failed: Tribe selection failed")
@@ -210,6 +230,7 @@ class TDATSiteNavigationTests(unittest.TestCase):
                 self.logger.error(f"Test Failed: Tribe selection test failed: {str(e)}")
                 raise
 
+    @depends_on("index", "bundles", "rest")
     def test_export_to_excel(self):
         """
         Tests the Export to Excel functionality.
@@ -217,57 +238,64 @@ class TDATSiteNavigationTests(unittest.TestCase):
         """
         with self.subTest("Test Title: Export to Excel"):
             try:
-                self.visit_tdat_site()
-                self.driver.find_element(By.ID, "btn-search-tribes").click()
-                self.select_dropdown_option(
-                    "tribe", "Absentee-Shawnee Tribe of Indians of Oklahoma"
-                )
-                time.sleep(1)
+                self.page.search_tribe("Absentee-Shawnee Tribe of Indians of Oklahoma")
 
-                export_button = self.driver.find_element(By.CLASS_NAME, "excel-report")
-                export_button.click()
-                time.sleep(5)
+                # What the grid shows, to compare with the exported workbook
+                grid_headers = [
+                    header
+                    for header in dom.read_texts(
+                        self.driver, ".ui-state-default [class*='field-']"
+                    )
+                    if header
+                ]
+                grid_rows = self.page.read_elements(
+                    {"rows": "[id^='tribeResults-row']"}
+                ).get("rows")
 
-                download_button = self.driver.find_element(
-                    By.CLASS_NAME, "query-excel-success"
-                ).click()
-                time.sleep(5)
+                self.page.click((By.CLASS_NAME, "excel-report"))
+                self.page.click((By.CLASS_NAME, "query-excel-success"))
 
-                # Wait for download to complete (up to 10 seconds)
+                # Wait for the download to complete in this session's own directory
                 import os
-                import glob
-                from pathlib import Path
-
-                downloads_path = str(Path.home() / "Downloads")
 
-                # Wait for the Excel file to appear in downloads
-                start_time = time.time()
-                excel_file = None
-                while time.time() - start_time < 10:
-                    excel_files = glob.glob(
-                        os.path.join(downloads_path, "TDAT_Report*.xlsx")
+                try:
+                    excel_file = self.wait.file_downloaded(
+                        self.driver.download_dir, "TDAT_Report*.xlsx", timeout=20
                     )
-
-                    if excel_files:
-                        excel_file = excel_files[0]
-                        break
-                    time.sleep(0.5)
+                except TimeoutException:
+                    excel_file = None
 
                 # Verify download success
                 if excel_file and os.path.exists(excel_file):
                     self.logger.info(
                         f"Excel file successfully downloaded: {os.path.basename(excel_file)}"
                     )
-                    # Optional: Clean up downloaded file
-                    os.remove(excel_file)
                 else:
                     self.logger.error("Excel file download failed")
                     raise AssertionError("Excel file was not downloaded")
 
+                # The grid renders rows lazily, so it may show fewer than exported
+                workbook = validate_workbook(
+                    excel_file,
+                    grid_headers,
+                    min_data_rows=grid_rows["count"] if grid_rows else 1,
+                )
+                if workbook["problems"]:
+                    self.logger.error(
+                        f"Test Failed: Exported workbook does not match the grid: "
+                        f"{'; '.join(workbook['problems'])}"
+                    )
+                    raise AssertionError("; ".join(workbook["problems"]))
+                self.logger.info(
+                    f"Test Passed: Exported workbook has {workbook['data_rows']} rows "
+                    f"and the grid columns"
+                )
+
             except Exception as e:
                 self.logger.error(f"Test Failed: Export to Excel test failed: {str(e)}")
                 raise
 
+    @depends_on("index", "bundles", "rest")
     def test_print_page(self):
         """
         Tests the Print Page functionality.
@@ -275,14 +303,9 @@ class TDATSiteNavigationTests(unittest.TestCase):
         """
         with self.subTest("Test Title: Print Page"):
             try:
-                self.visit_tdat_site()
-                self.driver.find_element(By.ID, "btn-search-tribes").click()
-                self.select_dropdown_option(
-                    "tribe", "Absentee-Shawnee Tribe of Indians of Oklahoma"
-                )
-                time.sleep(1)
+                self.page.search_tribe("Absentee-Shawnee Tribe of Indians of Oklahoma")
 
-                print_button = self.driver.find_element(By.CLASS_NAME, "print")
+                print_button = self.page.find((By.CLASS_NAME, "print"), "visible")
 
                 # Verify print button is clicked
                 if print_button:
@@ -294,6 +317,7 @@ class TDATSiteNavigationTests(unittest.TestCase):
                 self.logger.error(f"Test Failed: Print Page test failed: {str(e)}")
                 raise
 
+    @depends_on("index", "bundles", "rest")
     def test_select_state_county(self):
         """
         Tests the state and county selection functionality.
@@ -301,28 +325,12 @@ class TDATSiteNavigationTests(unittest.TestCase):
         """
         with self.subTest("Test Title: Find Tribal Contact Information for a County"):
             try:
-                self.visit_tdat_site()
-                self.driver.find_element(By.ID, "btn-search-tribes").click()
-
-                self.select_dropdown_option("state", "Texas")
-                self.driver.find_element(
-                    By.XPATH, "//option[text()='Anderson']"
-                ).click()
-
-                self.driver.find_element(
-                    By.XPATH, "//option[text()='Armstrong']"
-                ).click()
-
-                self.driver.find_element(By.ID, "county-select").click()
-                time.sleep(1)
-
-                info_popup = self.driver.find_element(By.ID, "grid-title")
-                title_text = info_popup.text
+                grid = self.page.search_counties("Texas", ["Anderson", "Armstrong"])
                 if (
-                    title_text
+                    grid.text("title")
                     == "Contact Information for Tribes with Interests in Anderson, Armstrong counties, Texas"
                 ):
-                    assert info_popup.is_displayed()
+                    assert grid.displayed("title")
                     self.logger.info("Test Passed: State/County selection verified")
                 else:
                     self.logger.error("Test Failed: State/County selection failed")
@@ -333,6 +341,7 @@ class TDATSiteNavigationTests(unittest.TestCase):
                 )
                 raise
 
+    @depends_on("index", "bundles", "rest")
     def test_get_all_tribes(self):
         """
         Tests the Get All Tribes functionality.
@@ -340,20 +349,16 @@ class TDATSiteNavigationTests(unittest.TestCase):
         """
         with self.subTest("Test Title: Get All Tribes"):
             try:
-                self.visit_tdat_site()
-                time.sleep(1)
-                self.driver.find_element(By.ID, "btn-search-tribes").click()
-                self.select_dropdown_option("state", "District of Columbia")
-                self.driver.find_element(By.ID, "county-select-all").click()
-                time.sleep(1)
-
-                info_popup = self.driver.find_element(By.ID, "grid-title")
-                title_text = info_popup.text
+                self.page.open_search()
+                self.page.select_dropdown_option("state", "District of Columbia")
+                self.page.click(self.page.COUNTY_SELECT_ALL)
+
+                grid = self.page.grid()
                 if (
-                    title_text
+                    grid.text("title")
                     == "Contact Information for Tribes with Interests in District of Columbia"
                 ):
-                    assert info_popup.is_displayed()
+                    assert grid.displayed("title")
                     self.logger.info(
                         "Test Passed: Get All Tribes functionality verified"
                     )
@@ -366,6 +371,7 @@ class TDATSiteNavigationTests(unittest.TestCase):
                 self.logger.error(f"Test Failed: Get All Tribes test failed: {str(e)}")
                 raise
 
+    @depends_on("index", "bundles", "rest")
     def test_address_input(self):
         """
         Tests the address input functionality.
@@ -373,25 +379,14 @@ class TDATSiteNavigationTests(unittest.TestCase):
         """
         with self.subTest("Test Title: Address Input"):
             try:
-                self.visit_tdat_site()
-                time.sleep(1)
-                self.close_splash_screen()
-                time.sleep(2)
-                search_input = self.driver.find_element(By.ID, "txt-search-input")
-                search_input.send_keys(
+                grid = self.page.search_address(
                     "1200 South Quincy Street Green Bay, Wisconsin 54302"
                 )
-                search_button = self.driver.find_element(By.ID, "btn-search-location")
-                search_button.click()
-                time.sleep(2)
-
-                info_popup = self.driver.find_element(By.ID, "grid-title")
-                title_text = info_popup.text
                 if (
-                    title_text
+                    grid.text("title")
                     == "Contact Information for Tribes with Interests in Brown County, Wisconsin"
                 ):
-                    assert info_popup.is_displayed()
+                    assert grid.displayed("title")
                     self.logger.info(
                         "Test Passed: Address input functionality verified"
                     )
@@ -402,6 +397,8 @@ class TDATSiteNavigationTests(unittest.TestCase):
                 self.logger.error(f"Test Failed: Address input test failed: {str(e)}")
                 raise
 
+    @depends_on("index", "bundles", "rest")
+    @allow_resources("tiles", "images")
     def test_click_on_map(self):
         """
         Tests the map interaction functionality.
@@ -411,39 +408,34 @@ class TDATSiteNavigationTests(unittest.TestCase):
             "Test Title: Find Tribal Contact Information through the Map"
         ):
             try:
-                self.visit_tdat_site()
-                self.close_splash_screen()
+                self.page.visit()
+                self.page.close_splash_screen()
 
-                # Map interaction
-                elem = self.driver.find_element(By.ID, "mapDiv")
-                ac = ActionChains(self.driver)
-                time.sleep(2)
-                ac.move_to_element(elem).move_by_offset(20, 20).click().perform()
+                # Map interaction, once the map has loaded and drawn its tiles
+                self.page.map.click(20, 20)
 
                 # Select state and county
-                self.select_dropdown_option("state", "Ohio")
-                self.driver.find_element(By.XPATH, "//option[text()='Union']").click()
+                self.page.select_dropdown_option("state", "Ohio")
+                self.wait.option_present("Union").click()
 
-                time.sleep(1)
-                self.driver.find_element(By.ID, "county-select").click()
-                time.sleep(1)
+                self.page.click(self.page.COUNTY_SELECT)
 
                 # Verify results
-                info_popup = self.driver.find_element(By.ID, "grid-title")
+                grid = self.page.grid()
                 if (
-                    info_popup.text
+                    grid.text("title")
                     == "Contact Information for Tribes with Interests in Union County, Ohio"
                 ):
-                    tribal_name_grid_cell = self.driver.find_element(
-                        By.CSS_SELECTOR,
-                        "#tribeResults-row-undefined:first-child .field-image .plusImage:first-child",
+                    self.page.click(
+                        (
+                            By.CSS_SELECTOR,
+                            "#tribeResults-row-undefined:first-child .field-image .plusImage:first-child",
+                        )
                     )
-                    tribal_name_grid_cell.click()
 
-                    time.sleep(2)
-                    tribal_text = self.driver.find_element(
-                        By.CSS_SELECTOR, ".ui-state-default .field-CONTACT_NAME"
-                    ).text
+                    tribal_text = self.page.text(
+                        (By.CSS_SELECTOR, ".ui-state-default .field-CONTACT_NAME")
+                    )
 
                     if tribal_text == "Contact Name":
                         self.logger.info(
@@ -460,6 +452,8 @@ class TDATSiteNavigationTests(unittest.TestCase):
                 self.logger.error(f"Test Failed: Map interaction test failed: {str(e)}")
                 raise
 
+    @depends_on("index", "bundles", "rest")
+    @allow_resources("tiles", "images")
     def test_map_zoom(self):
         """
         Tests the map zoom functionality.
@@ -467,29 +461,32 @@ class TDATSiteNavigationTests(unittest.TestCase):
         """
         with self.subTest("Test Title: Map Zoom"):
             try:
-                self.visit_tdat_site()
-                self.close_splash_screen()
+                self.page.visit()
+                self.page.close_splash_screen()
 
-                # Zoom in
-                zoom_in_button = self.driver.find_element(
-                    By.CLASS_NAME, "esriSimpleSliderIncrementButton"
-                )
-                zoom_in_button.click()
-                time.sleep(1)
+                # Each zoom returns once the map has redrawn at the new scale
+                before, zoomed_in = self.page.map.zoom_in()
+                _, zoomed_out = self.page.map.zoom_out()
 
-                # Zoom out
-                zoom_out_button = self.driver.find_element(
-                    By.CLASS_NAME, "esriSimpleSliderDecrementButton"
+                levels = (
+                    f"levels {before['level']} -> {zoomed_in['level']} "
+                    f"-> {zoomed_out['level']}"
+                )
+                if not zoomed_in["scale"] < before["scale"]:
+                    self.logger.error(f"Test Failed: Zoom in had no effect ({levels})")
+                    raise AssertionError(f"Zoom in did not change the map ({levels})")
+                if not zoomed_out["scale"] > zoomed_in["scale"]:
+                    self.logger.error(f"Test Failed: Zoom out had no effect ({levels})")
+                    raise AssertionError(f"Zoom out did not change the map ({levels})")
+                self.logger.info(
+                    f"Test Passed: Map zoom functionality verified ({levels})"
                 )
-                zoom_out_button.click()
-                time.sleep(1)
-
-                self.logger.info("Test Passed: Map zoom functionality verified")
 
             except Exception as e:
                 self.logger.error(f"Test Failed: Map zoom test failed: {str(e)}")
                 raise
 
+    @depends_on("index", "bundles")
     def test_access_menu(self):
         """
         Tests the menu access functionality.
@@ -497,15 +494,15 @@ class TDATSiteNavigationTests(unittest.TestCase):
         """
         with self.subTest("Test Title: Access Menu"):
             try:
-                self.visit_tdat_site()
-                self.close_splash_screen()
-                self.open_menu()
+                self.page.visit()
+                self.page.close_splash_screen()
+                self.page.open_menu()
 
-                self.driver.find_element(By.CSS_SELECTOR, ".show-splash-screen").click()
-                time.sleep(1)
+                self.page.click((By.CSS_SELECTOR, ".show-splash-screen"))
+                self.wait.modal_open("#splash-screen-modal")
 
-                modal_title = self.driver.find_element(By.CSS_SELECTOR, ".modal-title")
-                if modal_title.text == "Tribal Directory Assessment Tool (TDAT)":
+                modal = self.page.read_elements({"title": ".modal-title"})
+                if modal.text("title") == "Tribal Directory Assessment Tool (TDAT)":
                     self.logger.info("Test Passed: Menu access verified")
                 else:
                     self.logger.error("Test Failed: Menu access failed")
@@ -514,31 +511,20 @@ class TDATSiteNavigationTests(unittest.TestCase):
                 self.logger.error(f"Test Failed: Menu access test failed: {str(e)}")
                 raise
 
+    @depends_on("index", "docs")
     def test_alaska_special_instructions(self):
         """
         Tests the Alaska Special Instructions functionality.
-        Verifies that users can access the Alaska-specific documentation in a new tab.
+        Verifies that the menu links to the Alaska-specific documentation.
         """
         with self.subTest("Test Title: Alaska Special Instructions"):
             try:
-                self.visit_tdat_site()
-                self.close_splash_screen()
-                self.open_menu()
-
-                self.driver.find_element(
-                    By.CSS_SELECTOR, ".dropdown-menu li:nth-child(3) a"
-                ).click()
-                time.sleep(3)
-
-                self.switch_to_new_tab()
-
-                success = self.verify_url_and_log(
+                success = self.verify_link_and_log(
                     f"https://{self.environment_url}.hud.gov/TDAT/docs/Special%20Instructions%20for%20Alaska.pdf",
+                    "application/pdf",
                     "Alaska Special Instructions page",
                 )
 
-                self.switch_back_to_main_tab()
-
                 if success:
                     self.logger.info(
                         "Test Passed: Alaska Special Instructions displayed successfully"
@@ -554,6 +540,7 @@ class TDATSiteNavigationTests(unittest.TestCase):
                 )
                 raise
 
+    @depends_on("index", "external")
     def test_hud_exchange_menu(self):
         """
         Tests the HUD Exchange menu functionality.
@@ -561,30 +548,12 @@ class TDATSiteNavigationTests(unittest.TestCase):
         """
         with self.subTest("Test Title: HUD Exchange Menu"):
             try:
-                self.visit_tdat_site()
-                self.close_splash_screen()
-                self.open_menu()
-
-                # Navigate to HUD Exchange
-                self.driver.find_element(
-                    By.CSS_SELECTOR, ".dropdown-menu li:nth-child(6) a"
-                ).click()
-                time.sleep(3)
-
-                self.driver.find_element(
-                    By.CSS_SELECTOR, "#info-text ul li:first-child a"
-                ).click()
-                time.sleep(3)
-
-                # Verify navigation
-                self.switch_to_new_tab()
-                success = self.verify_url_and_log(
+                success = self.verify_link_and_log(
                     "https://www.hudexchange.info/programs/environmental-review/historic-preservation/",
+                    "text/html",
                     "HUD Exchange page",
                 )
 
-                self.switch_back_to_main_tab()
-
                 if success:
                     self.logger.info(
                         "Test Passed: HUD Exchange menu functionality verified"
@@ -600,6 +569,7 @@ class TDATSiteNavigationTests(unittest.TestCase):
                 )
                 raise
 
+    @depends_on("index", "external")
     def test_info_by_state(self):
         """
         Tests the Information by State functionality.
@@ -607,29 +577,12 @@ class TDATSiteNavigationTests(unittest.TestCase):
         """
         with self.subTest("Test Title: Information by State"):
             try:
-                self.visit_tdat_site()
-                self.close_splash_screen()
-                self.open_menu()
-
-                # Navigate to State Information
-                self.driver.find_element(
-                    By.CSS_SELECTOR, ".dropdown-menu li:nth-child(6) a"
-                ).click()
-                time.sleep(3)
-
-                self.driver.find_element(
-                    By.CSS_SELECTOR, "#info-text ul li:nth-child(2) a"
-                ).click()
-                time.sleep(6)
-
-                # Verify navigation
-                self.switch_to_new_tab()
-                success = self.verify_url_and_log(
-                    "https://www.hud.gov/states", "HUD states page"
+                success = self.verify_link_and_log(
+                    "https://www.hud.gov/states",
+                    "text/html",
+                    "HUD states page",
                 )
 
-                self.switch_back_to_main_tab()
-
                 if success:
                     self.logger.info(
                         "Test Passed: Information by State functionality verified"
@@ -645,6 +598,7 @@ class TDATSiteNavigationTests(unittest.TestCase):
                 )
                 raise
 
+    @depends_on("index", "docs")
     def test_process_for_consultation(self):
         """
         Tests the Process for Consultation functionality.
@@ -652,31 +606,12 @@ class TDATSiteNavigationTests(unittest.TestCase):
         """
         with self.subTest("Test Title: Process for Consultation"):
             try:
-                self.visit_tdat_site()
-                self.close_splash_screen()
-                self.open_menu()
-
-                # Navigate to Consultation Process
-                self.driver.find_element(
-                    By.CSS_SELECTOR, ".dropdown-menu li:nth-child(6) a"
-                ).click()
-                time.sleep(3)
-
-                self.driver.find_element(
-                    By.CSS_SELECTOR, "#info-text ul li:nth-child(3) a"
-                ).click()
-                time.sleep(3)
-
-                # Verify navigation
-                self.switch_to_new_tab()
-
-                success = self.verify_url_and_log(
+                success = self.verify_link_and_log(
                     f"https://{self.environment_url}.hud.gov/TDAT/docs/ProcessForTribalConsultationInHUDProjects.pdf",
+                    "application/pdf",
                     "Consultation process page",
                 )
 
-                self.switch_back_to_main_tab()
-
                 if success:
                     self.logger.info(
                         "Test Passed: Process for Consultation functionality verified"
@@ -692,6 +627,7 @@ class TDATSiteNavigationTests(unittest.TestCase):
                 )
                 raise
 
+    @depends_on("index", "docs")
     def test_TDAT_user_guide(self):
         """
         Tests the TDAT User Guide functionality.
@@ -699,26 +635,12 @@ class TDATSiteNavigationTests(unittest.TestCase):
         """
         with self.subTest("Test Title: TDAT User Guide"):
             try:
-                self.visit_tdat_site()
-                self.close_splash_screen()
-                self.open_menu()
-
-                # Navigate to TDAT User Guide
-                self.driver.find_element(
-                    By.CSS_SELECTOR, ".dropdown-menu li:nth-child(5) a"
-                ).click()
-                time.sleep(3)
-
-                # Verify navigation
-                self.switch_to_new_tab()
-
-                success = self.verify_url_and_log(
+                success = self.verify_link_and_log(
                     f"https://{self.environment_url}.hud.gov/TDAT/docs/TDATUserManualV4.0.pdf",
+                    "application/pdf",
                     "TDAT User Guide page",
                 )
 
-                self.switch_back_to_main_tab()
-
                 if success:
                     self.logger.info(
                         "Test Passed: TDAT User Guide functionality verified"
@@ -732,6 +654,7 @@ class TDATSiteNavigationTests(unittest.TestCase):
                 self.logger.error(f"Test Failed: TDAT User Guide test failed: {str(e)}")
                 raise
 
+    @depends_on("index", "bundles")
     def test_feedback_corrections(self):
         """
         Tests the Feedback and Corrections functionality.
@@ -739,21 +662,15 @@ class TDATSiteNavigationTests(unittest.TestCase):
         """
         with self.subTest("Test Title: Feedback and Corrections"):
             try:
-                self.visit_tdat_site()
-                self.close_splash_screen()
-                self.open_menu()
+                self.page.visit()
+                self.page.close_splash_screen()
 
                 # Navigate to Feedback and Corrections
-                self.driver.find_element(
-                    By.CSS_SELECTOR, ".dropdown-menu li:nth-child(7) a"
-                ).click()
-                time.sleep(3)
-
-                # click on feedback link
-                link = self.driver.find_element(By.CSS_SELECTOR, "#feedback-text a")
+                self.page.open_menu_item(7)
 
-                # ensure the following a link is TDAT_Info@hud.gov
-                if link.text == "TDAT_Info@hud.gov":
+                # ensure the feedback link is TDAT_Info@hud.gov
+                link_text = self.page.text((By.CSS_SELECTOR, "#feedback-text a"))
+                if link_text == "TDAT_Info@hud.gov":
                     self.logger.info(
                         "Test Passed: Feedback and Corrections functionality verified"
                     )
@@ -772,10 +689,11 @@ class TDATSiteNavigationTests(unittest.TestCase):
     def tearDownClass(cls):
         """
         Class cleanup method that runs once after all tests are complete.
-        Closes the WebDriver and logs completion.
+        Logs the wait summary and completion; pooled sessions stay warm
+        for the next suite and are quit when the process exits.
         """
         cls.logger.info("Test suite teardown starting")
-        cls.driver.quit()
+        cls.wait_stats.log_summary(cls.logger)
         cls.logger.info("Test suite completed")
 
 
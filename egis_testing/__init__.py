@@ -0,0 +1,3 @@
+"""
+Shared infrastructure for the EGIS application test suites in ``apps/``.
+"""
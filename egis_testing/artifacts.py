@@ -0,0 +1,333 @@
+"""
+Failure artifacts: screenshot, page source, browser console and network log.
+
+When a test fails, the suites grab the raw artifacts from the still-open
+session (a few quick WebDriver calls) and hand them to a background thread,
+which builds a HAR file from Chrome's performance log, compresses the text
+artifacts and writes everything to disk. The session goes back to the pool
+without waiting for the disk.
+
+Artifacts go to ``$EGIS_ARTIFACTS_DIR`` (the parallel runner points this at
+``<run dir>/artifacts``) or ``test-results/artifacts/<timestamp>``, one
+directory per failed test.
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+from selenium.common.exceptions import WebDriverException
+
+
+ARTIFACTS_DIR_ENV = "EGIS_ARTIFACTS_DIR"
+DEFAULT_ARTIFACTS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "test-results",
+    "artifacts",
+    datetime.now().strftime("%Y%m%d-%H%M%S"),
+)
+
+# Chrome log types enabled through goog:loggingPrefs (see drivers.py)
+LOG_TYPES = ("browser", "performance")
+# Most recent requests kept in network.har
+MAX_HAR_ENTRIES = 500
+
+logger = logging.getLogger(__name__)
+
+
+def test_failed(test_case):
+    """
+    Returns True if the running test (or one of its subtests) has failed.
+    Meant to be called from tearDown.
+    """
+    outcome = getattr(test_case, "_outcome", None)
+    if outcome is None:
+        return False
+    if hasattr(outcome, "errors"):
+        # Python < 3.11 collects the errors on the outcome
+        return any(exc_info is not None for _, exc_info in outcome.errors)
+    result = outcome.result
+    return any(
+        test is test_case or getattr(test, "test_case", None) is test_case
+        for test, _ in result.errors + result.failures
+    )
+
+
+def drain_logs(driver):
+    """
+    Discards the browser's buffered console and performance logs, so the
+    next test's artifacts only contain its own entries.
+    """
+    for log_type in LOG_TYPES:
+        try:
+            driver.get_log(log_type)
+        except (AttributeError, WebDriverException):
+            pass
+    driver._egis_performance_log = []
+
+
+def performance_log(driver):
+    """
+    Returns the performance log entries of the session since its last reset.
+    Reading the log empties Chrome's buffer, so the entries are kept on the
+    driver for every reader of the same test (failure artifacts, captured
+    queries, network reports).
+    """
+    entries = getattr(driver, "_egis_performance_log", None)
+    if entries is None:
+        entries = driver._egis_performance_log = []
+    try:
+        entries.extend(driver.get_log("performance"))
+    except (AttributeError, WebDriverException):
+        pass
+    return entries
+
+
+def artifact_dir(test_id):
+    base = os.environ.get(ARTIFACTS_DIR_ENV) or DEFAULT_ARTIFACTS_DIR
+    return os.path.join(base, re.sub(r"[^\w.-]+", "_", test_id)[:150])
+
+
+def _iso(wall_time):
+    return datetime.fromtimestamp(wall_time, timezone.utc).isoformat()
+
+
+def _headers(headers):
+    return [
+        {"name": name, "value": str(value)} for name, value in (headers or {}).items()
+    ]
+
+
+def network_events(performance_log):
+    """
+    Decodes Chrome performance log entries.
+    Args:
+        performance_log (list): Entries from driver.get_log("performance")
+    Yields:
+        tuple: (DevTools event name, its params, the log entry)
+    """
+    for entry in performance_log:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, TypeError, ValueError):
+            continue
+        yield message.get("method", ""), message.get("params", {}), entry
+
+
+def build_har(performance_log, limit=MAX_HAR_ENTRIES):
+    """
+    Converts Chrome performance log entries into a HAR 1.2 document.
+    Args:
+        performance_log (list): Entries from driver.get_log("performance")
+        limit (int): Keep only the most recent requests
+    Returns:
+        dict: The HAR document
+    """
+    requests = {}
+    for method, params, entry in network_events(performance_log):
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            request = params["request"]
+            requests[request_id] = {
+                "wall": params.get("wallTime", entry.get("timestamp", 0) / 1000),
+                "start": params.get("timestamp", 0),
+                "request": {
+                    "method": request.get("method", "GET"),
+                    "url": request.get("url", ""),
+                    "httpVersion": "",
+                    "headers": _headers(request.get("headers")),
+                    "queryString": [],
+                    "cookies": [],
+                    "headersSize": -1,
+                    "bodySize": len(request.get("postData", "")),
+                },
+                "response": None,
+                "end": None,
+                "size": 0,
+                "error": None,
+            }
+        elif request_id in requests:
+            record = requests[request_id]
+            if method == "Network.responseReceived":
+                response = params["response"]
+                record["response"] = {
+                    "status": response.get("status", 0),
+                    "statusText": response.get("statusText", ""),
+                    "httpVersion": response.get("protocol", ""),
+                    "headers": _headers(response.get("headers")),
+                    "cookies": [],
+                    "content": {"size": 0, "mimeType": response.get("mimeType", "")},
+                    "redirectURL": "",
+                    "headersSize": -1,
+                    "bodySize": -1,
+                }
+            elif method == "Network.loadingFinished":
+                record["end"] = params.get("timestamp")
+                record["size"] = params.get("encodedDataLength", 0)
+            elif method == "Network.loadingFailed":
+                record["end"] = params.get("timestamp")
+                record["error"] = params.get("errorText", "failed")
+
+    entries = []
+    for record in list(requests.values())[-limit:]:
+        response = record["response"] or {
+            "status": 0,
+            "statusText": record["error"] or "",
+            "httpVersion": "",
+            "headers": [],
+            "cookies": [],
+            "content": {"size": 0, "mimeType": ""},
+            "redirectURL": "",
+            "headersSize": -1,
+            "bodySize": -1,
+        }
+        response["content"]["size"] = record["size"]
+        response["bodySize"] = record["size"]
+        elapsed = -1
+        if record["end"] is not None:
+            elapsed = (record["end"] - record["start"]) * 1000
+        entries.append(
+            {
+                "startedDateTime": _iso(record["wall"]),
+                "time": elapsed,
+                "request": record["request"],
+                "response": response,
+                "cache": {},
+                "timings": {"send": 0, "wait": max(elapsed, 0), "receive": 0},
+                "comment": record["error"] or "",
+            }
+        )
+    return {
+        "log": {
+            "version": "1.2",
+            "creator": {"name": "egis_testing", "version": "1"},
+            "entries": entries,
+        }
+    }
+
+
+class ArtifactWriter:
+    """
+    Writes captured artifacts to disk on a background thread.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._work, name="artifact-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, directory, artifacts):
+        """
+        Queues artifacts for writing and returns immediately.
+        Args:
+            directory (str): Destination directory
+            artifacts (dict): Raw artifacts as returned by capture
+        """
+        self._queue.put((directory, artifacts))
+
+    def flush(self):
+        """
+        Blocks until every queued artifact has been written.
+        """
+        self._queue.join()
+
+    def _work(self):
+        while True:
+            directory, artifacts = self._queue.get()
+            try:
+                self._write(directory, artifacts)
+            except Exception as e:
+                logger.warning(f"Failed to write artifacts to {directory}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, directory, artifacts):
+        os.makedirs(directory, exist_ok=True)
+        screenshot = artifacts.pop("screenshot", None)
+        if screenshot:
+            with open(os.path.join(directory, "screenshot.png"), "wb") as output:
+                output.write(screenshot)
+        page_source = artifacts.pop("page_source", None)
+        if page_source is not None:
+            with gzip.open(os.path.join(directory, "page.html.gz"), "wt") as output:
+                output.write(page_source)
+        console = artifacts.pop("browser", None)
+        if console is not None:
+            with open(
+                os.path.join(directory, "console.json"), "w", encoding="utf-8"
+            ) as output:
+                json.dump(console, output, indent=2)
+        performance = artifacts.pop("performance", None)
+        if performance is not None:
+            with gzip.open(os.path.join(directory, "network.har.gz"), "wt") as output:
+                json.dump(build_har(performance), output)
+        info_path = os.path.join(directory, "info.json")
+        with open(info_path, "w", encoding="utf-8") as output:
+            json.dump(artifacts, output, indent=2)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """
+    Returns the process-wide artifact writer; pending writes finish at exit.
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ArtifactWriter()
+            atexit.register(_writer.flush)
+        return _writer
+
+
+def flush_artifacts():
+    """
+    Waits for pending artifact writes. Worker processes call this explicitly
+    because multiprocessing children exit without running atexit handlers.
+    """
+    if _writer is not None:
+        _writer.flush()
+
+
+def capture_failure(driver, test_id):
+    """
+    Grabs the failure artifacts of a test from its session and queues them
+    for writing. Each capture is independent, so a dead page still yields
+    whatever the browser can return.
+    Args:
+        driver (WebDriver): The failed test's session
+        test_id (str): Id of the failed test
+    Returns:
+        str: The directory the artifacts are written to
+    """
+    directory = artifact_dir(test_id)
+    artifacts = {"test": test_id, "captured": _iso(time.time())}
+    captures = {
+        "url": lambda: driver.current_url,
+        "title": lambda: driver.title,
+        "screenshot": driver.get_screenshot_as_png,
+        "page_source": lambda: driver.page_source,
+    }
+    captures["browser"] = lambda: driver.get_log("browser")
+    captures["performance"] = lambda: list(performance_log(driver))
+    errors = {}
+    for name, capture in captures.items():
+        try:
+            artifacts[name] = capture()
+        except Exception as e:
+            errors[name] = str(e).splitlines()[0] if str(e) else type(e).__name__
+    if errors:
+        artifacts["capture_errors"] = errors
+    get_writer().submit(directory, artifacts)
+    return directory
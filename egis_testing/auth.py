@@ -0,0 +1,215 @@
+"""
+Authenticated session cache for the applications that require a login.
+
+The first test to log in saves the browser's cookies and local/session
+storage to disk; later tests (in any worker process) inject that state into
+their fresh or pooled session instead of driving the login form again.
+Cached state is dropped when a cookie expires, when it is older than its
+time-to-live, or when restoring it does not yield a logged-in page.
+"""
+
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(REPO_ROOT, "test-results", ".auth")
+DEFAULT_TTL = 30 * 60
+# Treat cookies that expire within this many seconds as already expired
+EXPIRY_MARGIN = 60
+
+DUMP_STORAGE = """
+const dump = (storage) => {
+    const items = {};
+    for (let i = 0; i < storage.length; i++) {
+        const key = storage.key(i);
+        items[key] = storage.getItem(key);
+    }
+    return items;
+};
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+LOAD_STORAGE = """
+const [local, session] = arguments;
+for (const [key, value] of Object.entries(local)) { localStorage.setItem(key, value); }
+for (const [key, value] of Object.entries(session)) { sessionStorage.setItem(key, value); }
+"""
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def file_lock(path, timeout=120):
+    """
+    Cross-process exclusive lock on path.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if fcntl is not None:
+        with open(path, "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+        return
+
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            descriptor = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for lock {path}")
+            time.sleep(0.1)
+    try:
+        yield
+    finally:
+        os.close(descriptor)
+        os.remove(path)
+
+
+class AuthCache:
+    """
+    Disk-backed cache of one application's logged-in browser state.
+    """
+
+    def __init__(self, name, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL):
+        """
+        Args:
+            name (str): Cache key, e.g. "tdmt-egis"
+            cache_dir (str): Directory shared by all worker processes
+            ttl (float): Seconds a captured state is trusted
+        """
+        self.name = name
+        self.ttl = ttl
+        self.path = os.path.join(cache_dir, f"{name}.json")
+        self.lock_path = os.path.join(cache_dir, f"{name}.lock")
+
+    def load(self):
+        """
+        Reads the cached state if it is still valid.
+        Returns:
+            dict: The cached state, or None
+        """
+        try:
+            with open(self.path, encoding="utf-8") as cached:
+                state = json.load(cached)
+        except (OSError, ValueError):
+            return None
+        return state if self.is_valid(state) else None
+
+    def is_valid(self, state):
+        now = time.time()
+        if now - state.get("captured", 0) > self.ttl:
+            return False
+        for cookie in state.get("cookies", []):
+            expiry = cookie.get("expiry")
+            if expiry is not None and expiry < now + EXPIRY_MARGIN:
+                return False
+        return True
+
+    def save(self, state):
+        """
+        Writes state atomically so concurrent readers never see a partial file.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as cached:
+            json.dump(state, cached)
+        os.replace(temp_path, self.path)
+
+    def invalidate(self, state=None):
+        """
+        Removes the cached state. If state is given, only removes the file
+        when it still holds that state (another worker may have refreshed it).
+        """
+        if state is not None:
+            try:
+                with open(self.path, encoding="utf-8") as cached:
+                    if json.load(cached).get("captured") != state.get("captured"):
+                        return
+            except (OSError, ValueError):
+                return
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def capture(self, driver):
+        """
+        Captures the logged-in state of driver's current page.
+        Returns:
+            dict: Cookies, storage and the URL to return to on restore
+        """
+        storage = driver.execute_script(DUMP_STORAGE)
+        return {
+            "captured": time.time(),
+            "url": driver.current_url,
+            "origin": driver.execute_script("return window.location.origin"),
+            "cookies": driver.get_cookies(),
+            "local_storage": storage["local"],
+            "session_storage": storage["session"],
+        }
+
+    def restore(self, driver, state):
+        """
+        Injects state into driver and opens the page it was captured on.
+        Cookies and storage can only be set for the current origin, so the
+        session first opens a lightweight same-origin URL.
+        """
+        driver.get(f"{state['origin']}/robots.txt")
+        for cookie in state["cookies"]:
+            driver.add_cookie(cookie)
+        driver.execute_script(
+            LOAD_STORAGE, state["local_storage"], state["session_storage"]
+        )
+        driver.get(state["url"])
+
+    def login(self, driver, perform_login, is_logged_in):
+        """
+        Leaves driver logged in, reusing cached state when possible.
+        Args:
+            driver (WebDriver): The session to log in
+            perform_login (callable): Drives the real login form
+            is_logged_in (callable): Returns True when driver shows a logged-in page
+        Returns:
+            bool: True if the cached state was reused
+        Raises:
+            RuntimeError: If the form login does not yield a logged-in page
+        """
+        state = self.load()
+        if state is not None:
+            self.restore(driver, state)
+            if is_logged_in():
+                return True
+            logger.info(f"Cached {self.name} session was rejected; logging in again")
+            self.invalidate(state)
+
+        # Only one worker refreshes the cache; the others reuse its result
+        with file_lock(self.lock_path):
+            fresh = self.load()
+            if fresh is not None and fresh.get("captured") != (state or {}).get(
+                "captured"
+            ):
+                self.restore(driver, fresh)
+                if is_logged_in():
+                    return True
+                self.invalidate(fresh)
+            perform_login()
+            # A failed login must not be cached for every other worker
+            if not is_logged_in():
+                raise RuntimeError(
+                    f"Logging in to {self.name} did not reach a logged-in page"
+                )
+            self.save(self.capture(driver))
+        return False
@@ -0,0 +1,286 @@
+"""
+Page-load performance benchmark for the TDAT and TDMT navigation flows.
+
+Runs the existing flows (landing page, tribe search, state/county search,
+address search, TDMT login) N times on pooled sessions, collects Navigation
+Timing and Resource Timing data through ``execute_script`` and reports
+p50/p95 per flow. Results are compared against a stored baseline and the run
+fails when a percentile regresses by more than the threshold.
+
+Usage:
+    python -m egis_testing.benchmark --runs 10
+    python -m egis_testing.benchmark --runs 10 --update-baseline
+    python -m egis_testing.benchmark tdat-tribe-search --threshold 0.3
+"""
+
+import argparse
+import importlib
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime
+
+from egis_testing.pool import set_up_test
+from egis_testing.profile_benchmark import ENLARGE_TIMING_BUFFER
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "benchmarks", "baseline.json")
+DEFAULT_OUTPUT_DIR = os.path.join(REPO_ROOT, "test-results", "benchmarks")
+
+# name: (app directory, module, test class, method running the flow)
+FLOWS = {
+    "tdat-landing": ("TDAT", "tdat_test", "TDATSiteNavigationTests", "visit_tdat_site"),
+    "tdat-tribe-search": (
+        "TDAT",
+        "tdat_test",
+        "TDATSiteNavigationTests",
+        "test_select_tribe",
+    ),
+    "tdat-state-county-search": (
+        "TDAT",
+        "tdat_test",
+        "TDATSiteNavigationTests",
+        "test_select_state_county",
+    ),
+    "tdat-address-search": (
+        "TDAT",
+        "tdat_test",
+        "TDATSiteNavigationTests",
+        "test_address_input",
+    ),
+    "tdmt-login": ("TDMT", "tdmt_tests", "TDMTSiteNavigationTests", "login_with_form"),
+}
+
+# Metrics (milliseconds) checked for regressions
+REGRESSION_METRICS = ("duration", "ttfb", "dom_content_loaded", "load")
+PERCENTILES = (50, 95)
+
+COLLECT_TIMINGS = """
+const nav = performance.getEntriesByType('navigation')[0] || {};
+const resources = performance.getEntriesByType('resource');
+const loaded = nav.loadEventEnd || 0;
+let bytes = nav.transferSize || 0;
+let postLoadRequests = 0;
+let postLoadEnd = loaded;
+for (const entry of resources) {
+    bytes += entry.transferSize || 0;
+    if (loaded && entry.startTime >= loaded) {
+        postLoadRequests += 1;
+        postLoadEnd = Math.max(postLoadEnd, entry.responseEnd);
+    }
+}
+return {
+    ttfb: (nav.responseStart || 0) - (nav.startTime || 0),
+    dom_content_loaded: (nav.domContentLoadedEventEnd || 0) - (nav.startTime || 0),
+    load: loaded - (nav.startTime || 0),
+    requests: resources.length + 1,
+    bytes: bytes,
+    post_load_requests: postLoadRequests,
+    post_load_network: postLoadEnd - loaded,
+};
+"""
+
+
+def percentile(values, q):
+    """
+    Linear-interpolated percentile of values.
+    Args:
+        values (iterable): Numbers
+        q (float): Percentile between 0 and 100
+    Returns:
+        float: The percentile, or None for an empty input
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = (len(ordered) - 1) * q / 100.0
+    low, high = math.floor(rank), math.ceil(rank)
+    if low == high:
+        return float(ordered[low])
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def load_test_class(app, module_name, class_name):
+    app_dir = os.path.join(REPO_ROOT, "apps", app)
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def run_flow(name, runs, cold=True):
+    """
+    Runs one flow `runs` times and collects its timings.
+    Args:
+        name (str): Key of FLOWS
+        runs (int): Number of repetitions
+        cold (bool): Clear the HTTP cache before every run
+    Returns:
+        list: Timing dict per run (all times in milliseconds)
+    """
+    app, module_name, class_name, method_name = FLOWS[name]
+    test_class = load_test_class(app, module_name, class_name)
+    test_class.setUpClass()
+    samples = []
+    try:
+        for _ in range(runs):
+            case = test_class(method_name)
+            set_up_test(case)
+            try:
+                driver = case.driver
+                if not getattr(driver, "_egis_timing_buffer", False):
+                    driver.execute_cdp_cmd(
+                        "Page.addScriptToEvaluateOnNewDocument",
+                        {"source": ENLARGE_TIMING_BUFFER},
+                    )
+                    driver._egis_timing_buffer = True
+                if cold:
+                    driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+                start = time.perf_counter()
+                getattr(case, method_name)()
+                duration = (time.perf_counter() - start) * 1000
+                sample = driver.execute_script(COLLECT_TIMINGS)
+                sample["duration"] = duration
+                samples.append(sample)
+            finally:
+                case.tearDown()
+    finally:
+        test_class.tearDownClass()
+    return samples
+
+
+def summarize(samples):
+    """
+    Reduces samples to percentiles per metric.
+    Returns:
+        dict: {metric: {"p50": ..., "p95": ...}}
+    """
+    metrics = {}
+    for metric in samples[0]:
+        values = [sample[metric] for sample in samples]
+        metrics[metric] = {
+            f"p{q}": round(percentile(values, q), 1) for q in PERCENTILES
+        }
+    return metrics
+
+
+def compare(results, baseline, threshold, min_delta):
+    """
+    Finds percentiles that regressed against the baseline.
+    Args:
+        results (dict): {flow: {metric: {"p50": ..., "p95": ...}}}
+        baseline (dict): Same shape as results
+        threshold (float): Allowed relative increase (0.2 = 20%)
+        min_delta (float): Increases below this many ms are ignored as noise
+    Returns:
+        list: Human readable regression descriptions
+    """
+    regressions = []
+    for flow, metrics in results.items():
+        for metric in REGRESSION_METRICS:
+            for key in (f"p{q}" for q in PERCENTILES):
+                base = baseline.get(flow, {}).get(metric, {}).get(key)
+                current = metrics.get(metric, {}).get(key)
+                if base is None or current is None:
+                    continue
+                if current > base * (1 + threshold) and current - base > min_delta:
+                    regressions.append(
+                        f"{flow} {metric} {key}: {current:.0f} ms vs baseline "
+                        f"{base:.0f} ms (+{100 * (current - base) / (base or 1):.0f}%)"
+                    )
+    return regressions
+
+
+def format_results(results):
+    lines = []
+    for flow, metrics in results.items():
+        lines.append(flow)
+        for metric in REGRESSION_METRICS + ("post_load_network",):
+            values = metrics[metric]
+            lines.append(
+                f"  {metric:20} p50 {values['p50']:9.0f} ms   p95 {values['p95']:9.0f} ms"
+            )
+        lines.append(
+            f"  {'requests':20} p50 {metrics['requests']['p50']:9.0f}      "
+            f"bytes p50 {metrics['bytes']['p50'] / 1024:9.0f} KiB"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark TDAT/TDMT page loads against a stored baseline."
+    )
+    parser.add_argument(
+        "flows", nargs="*", help=f"Flows to run (default: all of {', '.join(FLOWS)})"
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Runs per flow")
+    parser.add_argument(
+        "--baseline", default=DEFAULT_BASELINE, help="Baseline percentiles file"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed relative regression of p50/p95 (default 0.2 = 20%%)",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=100.0,
+        help="Ignore regressions smaller than this many milliseconds",
+    )
+    parser.add_argument(
+        "--warm", action="store_true", help="Keep the HTTP cache between runs"
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store this run's percentiles as the new baseline",
+    )
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.flows) - set(FLOWS))
+    if unknown:
+        parser.error(f"unknown flows: {', '.join(unknown)}")
+
+    results = {}
+    for flow in args.flows or list(FLOWS):
+        results[flow] = summarize(run_flow(flow, args.runs, cold=not args.warm))
+    print(format_results(results))
+
+    os.makedirs(DEFAULT_OUTPUT_DIR, exist_ok=True)
+    output_file = os.path.join(
+        DEFAULT_OUTPUT_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json"
+    )
+    with open(output_file, "w", encoding="utf-8") as output:
+        json.dump({"runs": args.runs, "results": results}, output, indent=2)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as stored:
+                baseline = json.load(stored)
+        baseline.update(results)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as stored:
+            json.dump(baseline, stored, indent=2, sort_keys=True)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline first")
+        return 0
+    with open(args.baseline, encoding="utf-8") as stored:
+        baseline = json.load(stored)
+    regressions = compare(results, baseline, args.threshold, args.min_delta)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    if not regressions:
+        print(f"No regressions beyond {100 * args.threshold:.0f}% of the baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Side-by-side comparison of one run against several environments.
+
+When the runner fans a run out to several environments (``--environments
+egis,egis-stg``), every test runs once per environment. This module lines
+the results up per test: outcome and duration in each environment, and the
+difference from the first (baseline) environment. A test whose outcome
+differs, or which (or one of whose helper steps) is at least
+``SLOWDOWN_THRESHOLD`` times slower than on the baseline, is flagged and
+listed first.
+"""
+
+import json
+
+
+SLOWDOWN_THRESHOLD = 2.0
+# Durations below this are too short for their ratio to mean anything
+MIN_SECONDS = 0.5
+
+
+def _ratio(value, baseline):
+    if value is None or baseline is None or max(value, baseline) < MIN_SECONDS:
+        return None
+    return value / baseline if baseline else None
+
+
+def compare(records, environments, threshold=SLOWDOWN_THRESHOLD):
+    """
+    Lines up the result records of each test across environments.
+    Args:
+        records (list): Result records carrying an "environment" key
+        environments (list): Environment host prefixes; the first is the baseline
+        threshold (float): Slowdown ratio that flags a test
+    Returns:
+        list: One dict per test with "test", "app", "results" (environment to
+        outcome, duration and steps), "deltas" (environment to seconds and
+        ratio against the baseline), "flags" and "worst" (the largest
+        slowdown ratio), flagged and slowest tests first
+    """
+    baseline = environments[0]
+    tests = {}
+    for record in records:
+        test = tests.setdefault(
+            record["id"], {"test": record["id"], "app": record.get("app", "")}
+        )
+        test.setdefault("results", {})[record.get("environment")] = {
+            "outcome": record["outcome"],
+            "duration": record.get("duration"),
+            "steps": record.get("steps") or {},
+        }
+
+    rows = []
+    for test in tests.values():
+        results = test["results"]
+        base = results.get(baseline)
+        test["deltas"] = {}
+        test["flags"] = []
+        test["worst"] = 1.0
+        for environment in environments[1:]:
+            result = results.get(environment)
+            if base is None or result is None:
+                continue
+            if result["outcome"] != base["outcome"]:
+                test["flags"].append(
+                    f"{result['outcome']} on {environment}, "
+                    f"{base['outcome']} on {baseline}"
+                )
+            if result["outcome"] != "success" or base["outcome"] != "success":
+                continue
+            ratio = _ratio(result["duration"], base["duration"])
+            test["deltas"][environment] = {
+                "seconds": round(result["duration"] - base["duration"], 3),
+                "ratio": None if ratio is None else round(ratio, 2),
+            }
+            if ratio is not None and ratio >= threshold:
+                test["flags"].append(f"{ratio:.1f}x slower on {environment}")
+            for step, seconds in sorted(result["steps"].items()):
+                step_ratio = _ratio(seconds, base["steps"].get(step))
+                if step_ratio is not None and step_ratio >= threshold:
+                    test["flags"].append(
+                        f"{step} {step_ratio:.1f}x slower on {environment}"
+                    )
+                    ratio = max(ratio or 1.0, step_ratio)
+            test["worst"] = max(test["worst"], ratio or 1.0)
+        rows.append(test)
+    rows.sort(key=lambda test: (not test["flags"], -test["worst"], test["test"]))
+    return rows
+
+
+def _name(row):
+    return f"{row['app']}/{row['test'].rsplit('.', 1)[-1]}"
+
+
+def _cell(result):
+    if result is None:
+        return f"{'-':8} {'':>8}"
+    duration = result["duration"]
+    return f"{result['outcome'].upper():8} {duration or 0.0:7.2f}s"
+
+
+def format_comparison(rows, environments):
+    """
+    Formats the comparison as a text table with one line per test, plus
+    totals per environment.
+    """
+    baseline = environments[0]
+    width = max([len("TEST")] + [len(_name(row)) for row in rows])
+    header = f"{'TEST':{width}}  " + "  ".join(
+        f"{environment[:17]:17}" for environment in environments
+    )
+    if len(environments) > 1:
+        header += "  DELTA"
+    lines = [f"Comparison against {baseline}:", header]
+    for row in rows:
+        line = f"{_name(row):{width}}  " + "  ".join(
+            _cell(row["results"].get(environment)) for environment in environments
+        )
+        deltas = [
+            f"{delta['seconds']:+.2f}s"
+            + ("" if delta["ratio"] is None else f" ({delta['ratio']:.2f}x)")
+            for delta in (row["deltas"].get(env) for env in environments[1:])
+            if delta
+        ]
+        if deltas:
+            line += "  " + ", ".join(deltas)
+        if row["flags"]:
+            line += "  << " + "; ".join(row["flags"])
+        lines.append(line.rstrip())
+
+    lines.append("")
+    for environment in environments:
+        results = [
+            row["results"][environment]
+            for row in rows
+            if environment in row["results"]
+        ]
+        passed = sum(1 for result in results if result["outcome"] == "success")
+        total = sum(result["duration"] or 0.0 for result in results)
+        lines.append(
+            f"{environment}: {passed}/{len(results)} passed, "
+            f"{total:.1f}s of test time"
+        )
+    flagged = sum(1 for row in rows if row["flags"])
+    lines.append(f"{flagged} of {len(rows)} tests flagged")
+    return lines
+
+
+def write_comparison(records, environments, text_file, json_file):
+    """
+    Writes the comparison as text and JSON and returns the text lines.
+    """
+    rows = compare(records, environments)
+    lines = format_comparison(rows, environments)
+    with open(text_file, "w", encoding="utf-8") as output:
+        output.write("\n".join(lines) + "\n")
+    with open(json_file, "w", encoding="utf-8") as output:
+        json.dump({"environments": environments, "tests": rows}, output, indent=2)
+    return lines
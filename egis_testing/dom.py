@@ -0,0 +1,164 @@
+"""
+Batched DOM reads.
+
+Reads the text, visibility and attributes of many elements with a single
+``execute_script`` call instead of one ``find_element`` plus one ``.text``
+round trip per element. Missing elements are reported immediately rather
+than after the driver's implicit wait.
+"""
+
+from selenium.webdriver.common.by import By
+
+
+READ_ELEMENTS = """
+const [queries, attributes] = arguments;
+const isDisplayed = (element) => {
+    const style = window.getComputedStyle(element);
+    return style.display !== 'none' && style.visibility !== 'hidden'
+        && element.getClientRects().length > 0;
+};
+const result = {};
+for (const [name, using, value] of queries) {
+    let elements = [];
+    if (using === 'xpath') {
+        const found = document.evaluate(
+            value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < found.snapshotLength; i++) {
+            elements.push(found.snapshotItem(i));
+        }
+    } else {
+        elements = Array.from(document.querySelectorAll(value));
+    }
+    if (!elements.length) {
+        result[name] = null;
+        continue;
+    }
+    const element = elements[0];
+    const displayed = isDisplayed(element);
+    const attrs = {};
+    for (const attribute of attributes) {
+        attrs[attribute] = element.getAttribute(attribute);
+    }
+    result[name] = {
+        text: displayed ? element.innerText.trim() : '',
+        displayed: displayed,
+        count: elements.length,
+        attributes: attrs,
+    };
+}
+return result;
+"""
+
+
+READ_TEXTS = """
+const [using, value] = arguments;
+let elements = [];
+if (using === 'xpath') {
+    const found = document.evaluate(
+        value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (let i = 0; i < found.snapshotLength; i++) {
+        elements.push(found.snapshotItem(i));
+    }
+} else {
+    elements = Array.from(document.querySelectorAll(value));
+}
+return elements
+    .filter((element) => element.getClientRects().length > 0)
+    .map((element) => element.innerText.trim());
+"""
+
+
+READ_OPTIONS = """
+return Array.from(document.querySelectorAll(arguments[0]))
+    .filter((option) => option.value !== '' && !option.disabled)
+    .map((option) => option.textContent.trim());
+"""
+
+
+def _query(selector):
+    """
+    Normalizes a selector to a (name of strategy, CSS/XPath expression) pair.
+    Accepts a CSS selector string or a (By, value) locator.
+    """
+    if isinstance(selector, str):
+        return "css", selector
+    using, value = selector
+    if using == By.CSS_SELECTOR:
+        return "css", value
+    if using == By.ID:
+        return "css", f"[id='{value}']"
+    if using == By.CLASS_NAME:
+        return "css", f".{value}"
+    if using == By.TAG_NAME:
+        return "css", value
+    if using == By.NAME:
+        return "css", f"[name='{value}']"
+    if using == By.XPATH:
+        return "xpath", value
+    raise ValueError(f"Unsupported locator strategy for batched reads: {using}")
+
+
+class DomSnapshot(dict):
+    """
+    Result of read_elements: maps each name to a dict with "text",
+    "displayed", "count" and "attributes", or to None if nothing matched.
+    """
+
+    @property
+    def missing(self):
+        return [name for name, element in self.items() if element is None]
+
+    def text(self, name):
+        """
+        Returns: The element's visible text, or None if it is missing.
+        """
+        element = self.get(name)
+        return None if element is None else element["text"]
+
+    def displayed(self, name):
+        element = self.get(name)
+        return bool(element and element["displayed"])
+
+    def attribute(self, name, attribute):
+        element = self.get(name)
+        return None if element is None else element["attributes"].get(attribute)
+
+
+def read_texts(driver, selector):
+    """
+    Reads the visible text of every element matching selector in one round trip.
+    Args:
+        driver (WebDriver): The driver to query
+        selector: CSS selector string or (By, value) locator
+    Returns:
+        list: Text of each displayed match, in document order
+    """
+    using, value = _query(selector)
+    return driver.execute_script(READ_TEXTS, using, value)
+
+
+def read_options(driver, selector):
+    """
+    Reads the text of every selectable option matched by a CSS selector in
+    one round trip. Placeholder (empty value) and disabled options are skipped.
+    Args:
+        driver (WebDriver): The driver to query
+        selector (str): CSS selector of the option elements, e.g. "#tribe option"
+    Returns:
+        list: Option texts in document order
+    """
+    return driver.execute_script(READ_OPTIONS, selector)
+
+
+def read_elements(driver, selectors, attributes=()):
+    """
+    Reads many elements in one driver round trip.
+    Args:
+        driver (WebDriver): The driver to query
+        selectors (dict): Name to CSS selector string or (By, value) locator
+        attributes (iterable): Attribute names to read from every element
+    Returns:
+        DomSnapshot: Text, visibility and attributes of the first match per name
+    """
+    queries = [[name, *_query(selector)] for name, selector in selectors.items()]
+    return DomSnapshot(driver.execute_script(READ_ELEMENTS, queries, list(attributes)))
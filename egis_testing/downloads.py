@@ -0,0 +1,272 @@
+"""
+Per-session download directories, event-driven download detection and
+streaming validation of exported workbooks.
+
+Every driver gets its own download directory, so parallel sessions never see
+each other's files. Completion is detected from filesystem events (inotify on
+Linux: Chrome writes ``<name>.crdownload`` and renames it when finished); on
+other platforms the directory is re-scanned at a short interval.
+
+Exported ``.xlsx`` files are validated by streaming the worksheet XML, so
+only one row is held in memory at a time.
+"""
+
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+
+PARTIAL_SUFFIXES = (".crdownload", ".tmp", ".part")
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+INOTIFY_EVENT = struct.Struct("iIII")
+
+SPREADSHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+def create_download_dir():
+    """
+    Returns: A new, empty download directory for one browser session.
+    """
+    return tempfile.mkdtemp(prefix="egis-downloads-")
+
+
+def clear_download_dir(directory):
+    """
+    Deletes everything in a session's download directory.
+    """
+    for entry in os.scandir(directory):
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            os.remove(entry.path)
+
+
+def _finished(directory, pattern):
+    for name in os.listdir(directory):
+        if fnmatch.fnmatch(name, pattern) and not name.endswith(PARTIAL_SUFFIXES):
+            return os.path.join(directory, name)
+    return None
+
+
+class _Inotify:
+    """
+    Minimal ctypes binding for inotify.
+    """
+
+    def __init__(self, directory, mask):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, "inotify_add_watch failed")
+
+    def read_names(self, timeout):
+        """
+        Waits up to timeout seconds for events.
+        Returns:
+            list: File names from the events (empty on timeout)
+        """
+        readable, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not readable:
+            return []
+        data = os.read(self.fd, 64 * 1024)
+        names = []
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            _, _, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            names.append(os.fsdecode(data[offset : offset + length].rstrip(b"\0")))
+            offset += length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+def wait_for_download(directory, pattern, timeout=30, poll_interval=0.1):
+    """
+    Waits until a finished file matching pattern appears in directory.
+    Args:
+        directory (str): The session's download directory
+        pattern (str): Glob pattern of the expected file name
+        timeout (float): Seconds before giving up
+        poll_interval (float): Re-scan interval where inotify is unavailable
+    Returns:
+        str: Path of the downloaded file, or None on timeout
+    """
+    deadline = time.monotonic() + timeout
+    watcher = None
+    if sys.platform.startswith("linux"):
+        try:
+            watcher = _Inotify(directory, IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE)
+        except OSError:
+            watcher = None
+    try:
+        # The download may have finished before the watch was set up
+        path = _finished(directory, pattern)
+        while path is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if watcher is not None:
+                names = watcher.read_names(remaining)
+                if any(
+                    fnmatch.fnmatch(name, pattern)
+                    and not name.endswith(PARTIAL_SUFFIXES)
+                    for name in names
+                ):
+                    path = _finished(directory, pattern)
+            else:
+                time.sleep(min(poll_interval, remaining))
+                path = _finished(directory, pattern)
+        return path
+    finally:
+        if watcher is not None:
+            watcher.close()
+
+
+def _column_index(reference):
+    """
+    Converts a cell reference such as "C7" to a zero-based column index.
+    """
+    index = 0
+    for character in reference:
+        if not character.isalpha():
+            break
+        index = index * 26 + (ord(character.upper()) - ord("A") + 1)
+    return index - 1
+
+
+def _shared_strings(archive, wanted):
+    """
+    Streams the shared string table and returns only the wanted indices.
+    """
+    strings = {}
+    if "xl/sharedStrings.xml" not in archive.namelist() or not wanted:
+        return strings
+    with archive.open("xl/sharedStrings.xml") as table:
+        index = 0
+        for _, element in iterparse(table):
+            if element.tag == f"{SPREADSHEET_NS}si":
+                if index in wanted:
+                    strings[index] = "".join(
+                        text.text or "" for text in element.iter(f"{SPREADSHEET_NS}t")
+                    )
+                    if len(strings) == len(wanted):
+                        break
+                index += 1
+                element.clear()
+    return strings
+
+
+def _first_sheet(archive):
+    sheets = sorted(
+        name
+        for name in archive.namelist()
+        if name.startswith("xl/worksheets/sheet") and name.endswith(".xml")
+    )
+    if not sheets:
+        raise ValueError("Workbook has no worksheets")
+    return sheets[0]
+
+
+def read_workbook_summary(path, header_rows=5):
+    """
+    Streams the first worksheet of an .xlsx file.
+    Args:
+        path (str): Workbook path
+        header_rows (int): Number of leading rows whose values are returned
+    Returns:
+        dict: "rows" (number of non-empty rows) and "head" (cell values of the
+        first header_rows non-empty rows)
+    """
+    head = []
+    shared_refs = []
+    rows = 0
+    with zipfile.ZipFile(path) as archive:
+        with archive.open(_first_sheet(archive)) as sheet:
+            for _, element in iterparse(sheet):
+                if element.tag != f"{SPREADSHEET_NS}row":
+                    continue
+                cells = element.findall(f"{SPREADSHEET_NS}c")
+                if any(
+                    cell.find(f"{SPREADSHEET_NS}v") is not None
+                    or cell.find(f"{SPREADSHEET_NS}is") is not None
+                    for cell in cells
+                ):
+                    if rows < header_rows:
+                        values = []
+                        for cell in cells:
+                            column = _column_index(cell.get("r", ""))
+                            while len(values) < column:
+                                values.append("")
+                            value = cell.find(f"{SPREADSHEET_NS}v")
+                            if cell.get("t") == "s" and value is not None:
+                                shared_refs.append((len(head), len(values)))
+                                values.append(int(value.text))
+                            elif cell.get("t") == "inlineStr":
+                                values.append(
+                                    "".join(
+                                        t.text or ""
+                                        for t in cell.iter(f"{SPREADSHEET_NS}t")
+                                    )
+                                )
+                            else:
+                                values.append(value.text if value is not None else "")
+                        head.append(values)
+                    rows += 1
+                element.clear()
+        strings = _shared_strings(
+            archive, {head[row][column] for row, column in shared_refs}
+        )
+    for row, column in shared_refs:
+        head[row][column] = strings.get(head[row][column], "")
+    return {"rows": rows, "head": head}
+
+
+def validate_workbook(path, expected_headers, min_data_rows=1):
+    """
+    Checks an exported workbook against what the grid showed.
+    Args:
+        path (str): Workbook path
+        expected_headers (list): Column titles shown in the grid
+        min_data_rows (int): Minimum number of data rows below the header
+    Returns:
+        dict: "data_rows", "headers" and a list of "problems" (empty if valid)
+    """
+    summary = read_workbook_summary(path)
+    expected = [header.strip().lower() for header in expected_headers if header.strip()]
+    header_index = None
+    for index, values in enumerate(summary["head"]):
+        normalized = {str(value).strip().lower() for value in values}
+        if expected and all(header in normalized for header in expected):
+            header_index = index
+            break
+    problems = []
+    if header_index is None:
+        header_index = 0
+        problems.append(
+            f"Header row with columns {expected_headers} not found in the workbook"
+        )
+    headers = summary["head"][header_index] if summary["head"] else []
+    data_rows = summary["rows"] - header_index - 1
+    if data_rows < min_data_rows:
+        problems.append(
+            f"Workbook has {data_rows} data rows, expected at least {min_data_rows}"
+        )
+    return {"data_rows": data_rows, "headers": headers, "problems": problems}
@@ -0,0 +1,291 @@
+"""
+WebDriver factory and launch profiles for the EGIS test suites.
+
+A launch profile decides how Chrome is started (headed or headless) and which
+resource groups are blocked through the Chrome DevTools Protocol. Blocking
+happens per tab with ``Network.setBlockedURLs``, so a test can opt back into
+a group (for example map tiles) without restarting the browser.
+
+The profile is chosen with the ``EGIS_BROWSER_PROFILE`` environment variable
+(``default`` or ``fast``). When ``EGIS_PROXY`` is set (see
+``egis_testing.replay``) all traffic is sent through that proxy.
+
+The chromedriver binary is looked up once per run and handed to every
+session, instead of each ``webdriver.Chrome()`` call asking Selenium Manager.
+"""
+
+import os
+import shutil
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service as ChromeService
+
+from egis_testing.downloads import create_download_dir
+
+
+DEFAULT_IMPLICIT_WAIT = 10
+PROFILE_ENV = "EGIS_BROWSER_PROFILE"
+PROXY_ENV = "EGIS_PROXY"
+CHROMEDRIVER_ENV = "EGIS_CHROMEDRIVER"
+
+# URL patterns for Network.setBlockedURLs, grouped so tests can allow a group
+RESOURCE_GROUPS = {
+    "tiles": [
+        "*/MapServer/tile/*",
+        "*/MapServer/export*",
+        "*/ImageServer/exportImage*",
+        "*/VectorTileServer/*",
+        "*.pbf",
+        "*basemaps.arcgis.com*",
+    ],
+    "images": [
+        "*.png",
+        "*.jpg",
+        "*.jpeg",
+        "*.gif",
+        "*.webp",
+        "*.svg",
+        "*.ico",
+    ],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "analytics": [
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*dap.digitalgov.gov*",
+    ],
+}
+
+
+class LaunchProfile:
+    """
+    How to launch Chrome and which resource groups to block.
+    """
+
+    def __init__(
+        self,
+        name,
+        headless=False,
+        blocked_groups=(),
+        window_size=(1920, 1080),
+        arguments=(),
+    ):
+        """
+        Args:
+            name (str): Name used to select the profile
+            headless (bool): Run Chrome without a visible window
+            blocked_groups (tuple): Keys of RESOURCE_GROUPS to block
+            window_size (tuple): Browser window size in pixels
+            arguments (tuple): Extra Chrome command line arguments
+        """
+        self.name = name
+        self.headless = headless
+        self.blocked_groups = tuple(blocked_groups)
+        self.window_size = window_size
+        self.arguments = tuple(arguments)
+
+    def blocked_urls(self, allowed_groups=()):
+        """
+        Returns the URL patterns to block, minus any allowed groups.
+        Args:
+            allowed_groups (iterable): Keys of RESOURCE_GROUPS to let through
+        Returns:
+            list: URL patterns for Network.setBlockedURLs
+        """
+        urls = []
+        for group in self.blocked_groups:
+            if group not in allowed_groups:
+                urls.extend(RESOURCE_GROUPS[group])
+        return urls
+
+    def chrome_options(self, proxy=None, download_dir=None, user_data_dir=None):
+        """
+        Builds the Chrome options for this profile.
+        Args:
+            proxy (str): Optional host:port of the record/replay proxy
+            download_dir (str): Directory downloads are saved to without prompting
+            user_data_dir (str): Chrome profile directory; a fresh temporary
+                profile if omitted
+        """
+        options = webdriver.ChromeOptions()
+        if user_data_dir:
+            options.add_argument(f"--user-data-dir={user_data_dir}")
+        if download_dir:
+            options.add_experimental_option(
+                "prefs",
+                {
+                    "download.default_directory": download_dir,
+                    "download.prompt_for_download": False,
+                    "download.directory_upgrade": True,
+                    "safebrowsing.enabled": False,
+                },
+            )
+        if self.headless:
+            options.add_argument("--headless=new")
+        width, height = self.window_size
+        options.add_argument(f"--window-size={width},{height}")
+        for argument in self.arguments:
+            options.add_argument(argument)
+        # Console and network events for failure artifacts and the
+        # per-test network reports; page and tracing events are not needed
+        options.set_capability(
+            "goog:loggingPrefs", {"browser": "ALL", "performance": "ALL"}
+        )
+        options.add_experimental_option(
+            "perfLoggingPrefs", {"enableNetwork": True, "enablePage": False}
+        )
+        if proxy:
+            # The proxy intercepts HTTPS with a self-signed certificate
+            options.add_argument(f"--proxy-server=http://{proxy}")
+            options.add_argument("--proxy-bypass-list=<-loopback>")
+            options.add_argument("--ignore-certificate-errors")
+        return options
+
+
+PROFILES = {
+    "default": LaunchProfile("default"),
+    "fast": LaunchProfile(
+        "fast",
+        headless=True,
+        blocked_groups=("tiles", "images", "fonts", "analytics"),
+        arguments=(
+            "--disable-extensions",
+            "--disable-gpu",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-background-networking",
+        ),
+    ),
+}
+
+
+def get_profile(name=None):
+    """
+    Looks up a launch profile.
+    Args:
+        name (str): Profile name; defaults to $EGIS_BROWSER_PROFILE or "default"
+    Returns:
+        LaunchProfile: The selected profile
+    """
+    name = name or os.environ.get(PROFILE_ENV) or "default"
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown browser profile {name!r}; choose from {sorted(PROFILES)}"
+        )
+
+
+def apply_blocking(driver, profile, allowed_groups=()):
+    """
+    Applies the profile's request blocking to the driver's current tab.
+    Args:
+        driver (WebDriver): A Chromium driver
+        profile (LaunchProfile): The profile the driver was launched with
+        allowed_groups (iterable): Resource groups to let through
+    """
+    if not profile.blocked_groups:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd(
+            "Network.setBlockedURLs",
+            {"urls": profile.blocked_urls(allowed_groups)},
+        )
+    except (AttributeError, WebDriverException):
+        # Request blocking needs Chrome DevTools; other browsers load everything
+        pass
+
+
+def allow_resources(*groups):
+    """
+    Test method decorator that lets the listed resource groups through the
+    launch profile's request blocking, e.g. ``@allow_resources("tiles")``.
+    """
+    for group in groups:
+        if group not in RESOURCE_GROUPS:
+            raise ValueError(f"Unknown resource group {group!r}")
+
+    def decorator(test_method):
+        test_method.allowed_resources = tuple(groups)
+        return test_method
+
+    return decorator
+
+
+def allowed_resources(test_case):
+    """
+    Returns the resource groups the running test method opted into.
+    """
+    test_method = getattr(test_case, test_case._testMethodName, None)
+    return getattr(test_method, "allowed_resources", ())
+
+
+def _selenium_manager_path():
+    try:
+        from selenium.webdriver.common.driver_finder import DriverFinder
+
+        service, options = ChromeService(), webdriver.ChromeOptions()
+        if hasattr(DriverFinder, "get_path"):
+            # Selenium < 4.20
+            return DriverFinder.get_path(service, options)
+        return DriverFinder(service, options).get_driver_path()
+    except Exception:
+        return None
+
+
+def chromedriver_path():
+    """
+    Resolves the chromedriver binary once: $EGIS_CHROMEDRIVER, then PATH,
+    then Selenium Manager. The result is stored in $EGIS_CHROMEDRIVER so
+    worker processes spawned afterwards inherit it.
+    Returns:
+        str: Path of the binary, or None to let Selenium find it per session
+    """
+    path = (
+        os.environ.get(CHROMEDRIVER_ENV)
+        or shutil.which("chromedriver")
+        or _selenium_manager_path()
+    )
+    if path:
+        os.environ[CHROMEDRIVER_ENV] = path
+    return path
+
+
+def create_driver(
+    implicit_wait=DEFAULT_IMPLICIT_WAIT, profile=None, user_data_dir=None
+):
+    """
+    Starts a new Chrome session with its own download directory, available
+    as ``driver.download_dir``.
+    Args:
+        implicit_wait (float): Implicit wait applied to the new session
+        profile (LaunchProfile): Launch profile; defaults to get_profile()
+        user_data_dir (str): Chrome profile directory owned by the session,
+            available as ``driver.user_data_dir``
+    Returns:
+        WebDriver: The new driver
+    """
+    profile = profile or get_profile()
+    download_dir = create_download_dir()
+    options = profile.chrome_options(
+        proxy=os.environ.get(PROXY_ENV),
+        download_dir=download_dir,
+        user_data_dir=user_data_dir,
+    )
+    driver = webdriver.Chrome(
+        service=ChromeService(executable_path=chromedriver_path()), options=options
+    )
+    driver.download_dir = download_dir
+    driver.user_data_dir = user_data_dir
+    try:
+        # Headless Chrome ignores the download preference without this
+        driver.execute_cdp_cmd(
+            "Browser.setDownloadBehavior",
+            {"behavior": "allow", "downloadPath": download_dir},
+        )
+    except (AttributeError, WebDriverException):
+        pass
+    driver.implicitly_wait(implicit_wait)
+    apply_blocking(driver, profile)
+    return driver
@@ -0,0 +1,21 @@
+"""
+The environment (deployment host prefix) the suites run against.
+
+The sites are served from ``https://<environment>.hud.gov/``. The suites,
+the session pool and the tools built on them read the environment from
+``$EGIS_ENVIRONMENT``; the runner sets it in every worker process.
+"""
+
+import os
+
+
+ENVIRONMENT_ENV = "EGIS_ENVIRONMENT"
+DEFAULT_ENVIRONMENT = "egis"
+
+
+def current_environment():
+    """
+    Returns the environment host prefix the suites run against:
+    $EGIS_ENVIRONMENT, or "egis".
+    """
+    return os.environ.get(ENVIRONMENT_ENV) or DEFAULT_ENVIRONMENT
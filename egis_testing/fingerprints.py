@@ -0,0 +1,338 @@
+"""
+Content fingerprints of the deployed applications, for incremental runs.
+
+Before a run, each application is fingerprinted over plain HTTP: its index
+page, the script and stylesheet bundles it loads, the PDF documents it
+links to and, for each ArcGIS REST service its code refers to, the service
+metadata plus a few real queries. The queries are the ones the API cases
+(``egis_testing.queries``) recorded against that service, or a record count
+per layer when none were recorded. Tests declare which of these inputs they
+depend on with ``@depends_on``. A test is skipped when the digest of its
+inputs (plus its suite's and the ``egis_testing`` package's source) matches
+the one recorded the last time it ran and passed.
+
+Usage:
+    python -m egis_testing.fingerprints TDAT TDMT
+"""
+
+import argparse
+import functools
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urlencode, urljoin
+
+import urllib3
+
+from egis_testing.environments import DEFAULT_ENVIRONMENT
+from egis_testing.links import DEFAULT_TIMEOUT, MAX_REDIRECTS, USER_AGENT, http_client
+from egis_testing.queries import DEFAULT_CASES, load_cases, parse_json, retarget
+from egis_testing.tracing import get_tracer
+
+
+# Inputs a test can depend on. "external" covers pages outside the
+# deployment; they are not fingerprinted, so their tests always run.
+INPUTS = ("index", "bundles", "docs", "rest", "external")
+DEFAULT_INPUTS = ("index", "bundles", "docs", "rest")
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Queries hashed per REST service
+QUERIES_PER_SERVICE = 5
+COUNT_QUERY = urlencode({"where": "1=1", "returnCountOnly": "true", "f": "json"})
+
+REST_SERVICE = re.compile(
+    r"https?://[^\s\"'<>\\]+?/rest/services/"
+    r"[^\s\"'<>\\?#]+?/(?:MapServer|FeatureServer)"
+)
+
+
+def depends_on(*inputs):
+    """
+    Test method decorator naming the fingerprinted inputs the test depends
+    on, e.g. ``@depends_on("index", "docs")``. Undecorated tests depend on
+    every input except "external".
+    """
+    for name in inputs:
+        if name not in INPUTS:
+            raise ValueError(f"Unknown fingerprint input {name!r}")
+
+    def decorator(test_method):
+        test_method.fingerprint_inputs = tuple(inputs)
+        return test_method
+
+    return decorator
+
+
+def declared_inputs(test_id):
+    """
+    Returns the inputs the test declared, looking the method up in its
+    (already imported) test module.
+    """
+    module_name, class_name, method_name = test_id.rsplit(".", 2)
+    module = sys.modules.get(module_name)
+    test_method = getattr(getattr(module, class_name, None), method_name, None)
+    return getattr(test_method, "fingerprint_inputs", DEFAULT_INPUTS)
+
+
+class AssetParser(HTMLParser):
+    """
+    Collects the bundle and document URLs of an HTML page.
+    """
+
+    def __init__(self, base_url):
+        super().__init__()
+        self.base_url = base_url
+        self.bundles = []
+        self.docs = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "script" and attrs.get("src"):
+            self.bundles.append(urljoin(self.base_url, attrs["src"]))
+        elif tag == "link" and "stylesheet" in (attrs.get("rel") or "").lower():
+            if attrs.get("href"):
+                self.bundles.append(urljoin(self.base_url, attrs["href"]))
+        elif tag == "a" and (attrs.get("href") or "").lower().endswith(".pdf"):
+            self.docs.append(urljoin(self.base_url, attrs["href"]))
+
+
+def fetch(http, url, timeout=DEFAULT_TIMEOUT):
+    """
+    Returns:
+        bytes: The body of a successful response, or None
+    """
+    try:
+        response = http.request(
+            "GET",
+            url,
+            headers={"User-Agent": USER_AGENT},
+            timeout=timeout,
+            retries=urllib3.Retry(connect=0, read=0, redirect=MAX_REDIRECTS),
+        )
+    except urllib3.exceptions.HTTPError:
+        return None
+    return response.data if response.status == 200 else None
+
+
+def combine(digests):
+    """
+    Combines named digests into one; None if any of them is missing.
+    """
+    if any(digest is None for digest in digests.values()):
+        return None
+    payload = json.dumps(digests, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _sha256(body):
+    return hashlib.sha256(body).hexdigest() if body is not None else None
+
+
+def recorded_queries(
+    services, environment=DEFAULT_ENVIRONMENT, cases_file=DEFAULT_CASES
+):
+    """
+    Picks the recorded GET queries of each service from the API cases.
+    Returns:
+        dict: Service URL to up to QUERIES_PER_SERVICE query URLs, by case id
+    """
+    queries = {service: [] for service in services}
+    for case_id, case in sorted(load_cases(cases_file).items()):
+        if case["method"] != "GET":
+            continue
+        url = retarget(case["url"], case["environment"], environment)
+        for service in services:
+            picked = queries[service]
+            if url.startswith(f"{service}/") and len(picked) < QUERIES_PER_SERVICE:
+                picked.append(url)
+    return queries
+
+
+def _response_digest(body):
+    # Parsed and re-serialized, so member order and JSONP wrappers do not count
+    payload = parse_json(body) if body is not None else None
+    if payload is None:
+        return _sha256(body)
+    return _sha256(json.dumps(payload, sort_keys=True).encode("utf-8"))
+
+
+def fingerprint_service(http, service, queries):
+    """
+    Digest of one REST service: its metadata and the responses to queries,
+    or to a record count of each of its first layers when there are none.
+    Returns:
+        str: The digest, or None if a response could not be read
+    """
+    metadata = fetch(http, f"{service}?f=json")
+    digests = {"metadata": _sha256(metadata)}
+    if not queries:
+        layers = (parse_json(metadata) or {}).get("layers") if metadata else None
+        queries = [
+            f"{service}/{layer['id']}/query?{COUNT_QUERY}"
+            for layer in (layers or [])[:QUERIES_PER_SERVICE]
+            if isinstance(layer, dict) and "id" in layer
+        ]
+    for url in queries:
+        digests[url] = _response_digest(fetch(http, url))
+    return combine(digests)
+
+
+def fingerprint_app(app, environment=DEFAULT_ENVIRONMENT, http=None, max_workers=8):
+    """
+    Fingerprints one deployed application.
+    Args:
+        app (str): Application path, e.g. "TDAT"
+        environment (str): Environment host prefix
+    Returns:
+        dict: Input name to digest; None for an input that could not be read
+    """
+    with get_tracer().span(f"fingerprint {app}", "http"):
+        http = http or http_client(max_workers)
+        index_url = f"https://{environment}.hud.gov/{app}/"
+        index = fetch(http, index_url)
+        if index is None:
+            return {name: None for name in DEFAULT_INPUTS}
+        parser = AssetParser(index_url)
+        parser.feed(index.decode("utf-8", errors="replace"))
+        bundle_urls = sorted(set(parser.bundles))
+        doc_urls = sorted(set(parser.docs))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            bundles = dict(
+                zip(bundle_urls, pool.map(lambda url: fetch(http, url), bundle_urls))
+            )
+            # Service URLs live in the page and, mostly, in the app's scripts
+            sources = [index] + [body for body in bundles.values() if body]
+            services = sorted(
+                {
+                    match.group(0)
+                    for body in sources
+                    for match in REST_SERVICE.finditer(
+                        body.decode("utf-8", errors="replace")
+                    )
+                }
+            )
+            docs = pool.map(lambda url: _sha256(fetch(http, url)), doc_urls)
+            queries = recorded_queries(services, environment)
+            rest = pool.map(
+                lambda url: fingerprint_service(http, url, queries[url]), services
+            )
+            return {
+                "index": _sha256(index),
+                "bundles": combine(
+                    {url: _sha256(body) for url, body in bundles.items()}
+                ),
+                "docs": combine(dict(zip(doc_urls, docs))),
+                "rest": combine(dict(zip(services, rest))),
+            }
+
+
+def suite_digest(app_dir, test_id):
+    """
+    Returns: The digest of the test module's source, so editing a test
+    makes it run again.
+    """
+    module_name = test_id.split(".")[0]
+    try:
+        with open(os.path.join(app_dir, f"{module_name}.py"), "rb") as source:
+            return _sha256(source.read())
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def package_digest():
+    """
+    Returns: The digest of the egis_testing package's source, which every
+    suite runs on (page objects, waits, the pool, ...).
+    """
+    digests = {}
+    for path in sorted(glob.glob(os.path.join(PACKAGE_DIR, "*.py"))):
+        with open(path, "rb") as source:
+            digests[os.path.basename(path)] = _sha256(source.read())
+    return combine(digests)
+
+
+def inputs_digest(app_dir, test_id, fingerprint):
+    """
+    Combines the fingerprints a test depends on with its suite's and the
+    package's source.
+    Returns:
+        str: The digest, or None if any input could not be fingerprinted
+    """
+    digests = {
+        "suite": suite_digest(app_dir, test_id),
+        "package": package_digest(),
+    }
+    for name in declared_inputs(test_id):
+        digests[name] = fingerprint.get(name)
+    return combine(digests)
+
+
+def select_changed(tests, store, environment=DEFAULT_ENVIRONMENT):
+    """
+    Splits tests into those to run and those whose inputs are unchanged
+    since they last ran and passed.
+    Args:
+        tests (list): ``(app_dir, test_id)`` pairs
+        store (ResultsStore): History of previous runs
+    Returns:
+        tuple: (tests to run, unchanged tests, test id to input digest)
+    """
+    fingerprints = {}
+    http = http_client()
+    try:
+        for app_dir, _ in tests:
+            app = os.path.basename(app_dir)
+            if app not in fingerprints:
+                fingerprints[app] = fingerprint_app(app, environment, http)
+    finally:
+        http.clear()
+    digests = {
+        test_id: inputs_digest(
+            app_dir, test_id, fingerprints[os.path.basename(app_dir)]
+        )
+        for app_dir, test_id in tests
+    }
+    last = (
+        store.last_executed([test_id for _, test_id in tests], environment)
+        if os.path.exists(store.path)
+        else {}
+    )
+    changed, unchanged = [], []
+    for app_dir, test_id in tests:
+        digest = digests[test_id]
+        if digest is not None and last.get(test_id) == ("success", digest):
+            unchanged.append((app_dir, test_id))
+        else:
+            changed.append((app_dir, test_id))
+    return changed, unchanged, digests
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Print the content fingerprints of deployed applications."
+    )
+    parser.add_argument("apps", nargs="+", help="Application paths, e.g. TDAT")
+    parser.add_argument(
+        "--environment", default=DEFAULT_ENVIRONMENT, help="Environment host prefix"
+    )
+    args = parser.parse_args(argv)
+    http = http_client()
+    try:
+        fingerprints = {
+            app: fingerprint_app(app, args.environment, http) for app in args.apps
+        }
+    finally:
+        http.clear()
+    print(json.dumps(fingerprints, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+HTTP-level verification of the documentation links in the TDAT menus.
+
+Instead of clicking each menu entry, waiting for Chrome to render a PDF or
+external page in a new tab and comparing ``current_url``, the link targets
+are read from the DOM and fetched concurrently over a pooled HTTP client.
+Each check records the status, content type, redirect chain and a hash of
+the content.
+"""
+
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+import urllib3
+
+from egis_testing.drivers import PROXY_ENV
+from egis_testing.tracing import get_tracer
+
+
+DEFAULT_TIMEOUT = 15
+DEFAULT_WORKERS = 8
+MAX_REDIRECTS = 5
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko)"
+
+MENU_LINKS = ".dropdown-menu a[href], #info-text a[href]"
+
+READ_LINKS = """
+return Array.from(document.querySelectorAll(arguments[0]))
+    .map((link) => link.href)
+    .filter((href) => href.startsWith('http'));
+"""
+
+
+def read_links(driver, selector=MENU_LINKS):
+    """
+    Reads the absolute targets of the links matching selector.
+    Returns:
+        list: Unique http(s) URLs in document order
+    """
+    return list(dict.fromkeys(driver.execute_script(READ_LINKS, selector)))
+
+
+def http_client(max_workers=DEFAULT_WORKERS):
+    """
+    Returns a pooled HTTP client, routed through the record/replay proxy when
+    one is configured (its interception certificate is not verified).
+    """
+    proxy = os.environ.get(PROXY_ENV)
+    if proxy:
+        return urllib3.ProxyManager(
+            f"http://{proxy}", maxsize=max_workers, cert_reqs="CERT_NONE"
+        )
+    return urllib3.PoolManager(maxsize=max_workers)
+
+
+def check_link(http, url, timeout=DEFAULT_TIMEOUT):
+    """
+    Fetches one URL, following redirects.
+    Returns:
+        dict: "url", "status", "content_type", "final_url", "redirects",
+        "sha256", "bytes", "elapsed" and "error" (None on success)
+    """
+    result = {
+        "url": url,
+        "status": None,
+        "content_type": None,
+        "final_url": url,
+        "redirects": [],
+        "sha256": None,
+        "bytes": 0,
+        "elapsed": 0.0,
+        "error": None,
+    }
+    start = time.perf_counter()
+    try:
+        response = http.request(
+            "GET",
+            url,
+            headers={"User-Agent": USER_AGENT},
+            timeout=timeout,
+            retries=urllib3.Retry(connect=0, read=0, redirect=MAX_REDIRECTS),
+            preload_content=False,
+        )
+        digest = hashlib.sha256()
+        for chunk in response.stream(64 * 1024):
+            digest.update(chunk)
+            result["bytes"] += len(chunk)
+        response.release_conn()
+        final_url = url
+        for redirect in response.retries.history if response.retries else ():
+            final_url = urljoin(final_url, redirect.redirect_location or "")
+            result["redirects"].append(
+                {"url": redirect.url, "status": redirect.status, "location": final_url}
+            )
+        result.update(
+            status=response.status,
+            content_type=response.headers.get("Content-Type", "").split(";")[0],
+            final_url=final_url,
+            sha256=digest.hexdigest(),
+        )
+    except urllib3.exceptions.HTTPError as e:
+        result["error"] = str(e)
+    result["elapsed"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def check_links(urls, timeout=DEFAULT_TIMEOUT, max_workers=DEFAULT_WORKERS):
+    """
+    Fetches all URLs concurrently.
+    Returns:
+        dict: URL to its check_link result
+    """
+    urls = list(urls)
+    if not urls:
+        return {}
+    with get_tracer().span("check links", "http", count=len(urls)):
+        http = http_client(max_workers)
+        try:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as pool:
+                results = pool.map(lambda url: check_link(http, url, timeout), urls)
+                return dict(zip(urls, results))
+        finally:
+            http.clear()
+
+
+def link_problems(result, content_type=None):
+    """
+    Checks a link the way the browser-tab tests did: it must load and
+    serve the expected kind of content.
+    Args:
+        result (dict): A check_link result
+        content_type (str): Expected media type, e.g. "application/pdf"
+    Returns:
+        list: Problem descriptions (empty if the link is good)
+    """
+    if result["error"]:
+        return [f"{result['url']} could not be fetched: {result['error']}"]
+    problems = []
+    if result["status"] != 200:
+        problems.append(f"{result['url']} returned HTTP {result['status']}")
+    if content_type and result["content_type"] != content_type:
+        problems.append(
+            f"{result['url']} is {result['content_type']}, expected {content_type}"
+        )
+    if not result["bytes"]:
+        problems.append(f"{result['url']} returned no content")
+    return problems
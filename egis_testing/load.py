@@ -0,0 +1,552 @@
+"""
+Load generation from the TDAT and TDMT scenarios.
+
+Runs the benchmark flows (see ``egis_testing.benchmark.FLOWS``) as virtual
+users and reports throughput and latency percentiles per step. Each user
+repeats its flows until the load profile ends, pausing ``--think`` seconds
+between iterations. Two kinds of user are available:
+
+- ``browser``: every user drives a headless Chrome session through the
+  suite's own test methods; steps are the traced helpers (``visit``,
+  ``search_address``, ``search_counties``, ...).
+- ``http``: every user re-sends the HTTP requests one run of the flow made,
+  as recorded with ``record``, without a browser, so a single machine can
+  simulate hundreds of users. Steps are request groups (``geocode``,
+  ``query``, ``page``, ...).
+
+The number of users follows ``--stages`` (``users:seconds`` pairs, ramped
+linearly like k6 stages) or ``--users``/``--ramp``/``--duration``. With
+``--replay ARCHIVE`` all traffic is served by the local record/replay proxy
+(see ``egis_testing.replay``) instead of the real servers.
+
+Usage:
+    python -m egis_testing.load record recordings/load
+    python -m egis_testing.load browser --users 4 --ramp 30 --duration 120
+    python -m egis_testing.load http --archive recordings/load --stages 50:30,200:90
+    python -m egis_testing.load browser --users 2 --replay recordings/load
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+
+import urllib3
+
+from egis_testing.benchmark import FLOWS, load_test_class, percentile
+from egis_testing.drivers import PROFILES, PROXY_ENV
+from egis_testing.links import DEFAULT_TIMEOUT, USER_AGENT, http_client
+from egis_testing.pool import SessionPool, set_up_test
+from egis_testing.replay import Archive, ReplayProxy, parse_latency
+from egis_testing.templates import TEMPLATE_ENV
+from egis_testing.tracing import get_tracer, step_timings
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT_DIR = os.path.join(REPO_ROOT, "test-results", "load")
+# The flows behind test_address_input and test_select_state_county
+DEFAULT_FLOWS = ("tdat-address-search", "tdat-state-county-search")
+FLOWS_FILE = "flows.json"
+PERCENTILES = (50, 90, 95, 99)
+TIMELINE_WINDOW = 10.0
+
+# Request groups of the http users, first match wins; anything else is
+# "page" (HTML) or "static"
+REQUEST_STEPS = (
+    ("geocode", re.compile(r"/GeocodeServer/|findAddressCandidates|/suggest\b", re.I)),
+    ("query", re.compile(r"/(?:MapServer|FeatureServer)/\d+/query\b", re.I)),
+    ("tiles", re.compile(r"/tile/\d+/|/MapServer/export\b", re.I)),
+    ("service", re.compile(r"/rest/services/", re.I)),
+)
+STATIC_STEPS = ("static", "tiles")
+
+logger = logging.getLogger(__name__)
+
+
+def parse_stages(value):
+    """
+    Parses "users:seconds,..." into [(users, seconds), ...].
+    """
+    stages = []
+    try:
+        for stage in value.split(","):
+            users, seconds = stage.split(":")
+            stages.append((int(users), float(seconds)))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "stages must look like 10:30,50:60 (users:seconds)"
+        )
+    return stages
+
+
+def target_users(stages, elapsed):
+    """
+    Returns the number of users the load profile asks for after `elapsed`
+    seconds, ramping linearly from the previous stage's target (0 at the
+    start), or None once the last stage has ended.
+    """
+    previous = 0
+    for users, seconds in stages:
+        if elapsed < seconds:
+            return round(previous + (users - previous) * elapsed / seconds)
+        elapsed -= seconds
+        previous = users
+    return None
+
+
+class Metrics:
+    """
+    Thread-safe latency samples per step.
+    """
+
+    def __init__(self):
+        self.start = time.monotonic()
+        self.samples = []
+        self.errors = {}
+        self.users = []
+        self._lock = threading.Lock()
+
+    def add(self, step, seconds, ok=True, error=None):
+        with self._lock:
+            self.samples.append((time.monotonic() - self.start, step, seconds, ok))
+            if error:
+                messages = self.errors.setdefault(step, [])
+                if len(messages) < 5:
+                    messages.append(error)
+
+    def add_users(self, active):
+        with self._lock:
+            self.users.append((time.monotonic() - self.start, active))
+
+    def summary(self, elapsed):
+        """
+        Returns:
+            dict: Per step "count", "errors", "throughput" (per second) and
+            latency percentiles and maximum in milliseconds
+        """
+        steps = {}
+        for _, step, seconds, ok in self.samples:
+            entry = steps.setdefault(step, {"latencies": [], "errors": 0})
+            entry["latencies"].append(seconds * 1000)
+            entry["errors"] += 0 if ok else 1
+        summary = {}
+        for step, entry in sorted(steps.items()):
+            latencies = entry["latencies"]
+            summary[step] = {
+                "count": len(latencies),
+                "errors": entry["errors"],
+                "throughput": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+                **{
+                    f"p{q}": round(percentile(latencies, q), 1) for q in PERCENTILES
+                },
+                "max": round(max(latencies), 1),
+            }
+        return summary
+
+    def timeline(self, flows, window=TIMELINE_WINDOW):
+        """
+        Returns:
+            list: Per window of `window` seconds the peak number of users,
+            completed flow iterations per second and their p95 in milliseconds
+        """
+        windows = {}
+        for offset, step, seconds, _ in self.samples:
+            if step in flows:
+                windows.setdefault(int(offset // window), []).append(seconds * 1000)
+        rows = []
+        for index in range(int(max(windows, default=-1)) + 1):
+            latencies = windows.get(index, [])
+            users = [
+                active
+                for offset, active in self.users
+                if index * window <= offset < (index + 1) * window
+            ]
+            rows.append(
+                {
+                    "start": index * window,
+                    "users": max(users, default=0),
+                    "throughput": round(len(latencies) / window, 2),
+                    "p95": round(percentile(latencies, 95), 1) if latencies else None,
+                }
+            )
+        return rows
+
+
+class BrowserUsers:
+    """
+    Runs flows through the suites' test methods on pooled headless sessions.
+    """
+
+    def __init__(self, flows, users, profile, cold=False):
+        """
+        Args:
+            flows (list): Keys of FLOWS
+            users (int): Peak number of users, one session each
+            profile (LaunchProfile): Launch profile of the sessions
+            cold (bool): Clear the HTTP cache before every iteration
+        """
+        self.pool = SessionPool(size=users, profile=profile)
+        self.cold = cold
+        self.classes = {}
+        for flow in flows:
+            app, module_name, class_name, _ = FLOWS[flow]
+            if (app, module_name, class_name) not in self.classes:
+                test_class = load_test_class(app, module_name, class_name)
+                test_class.setUpClass()
+                test_class.pool = self.pool
+                self.classes[(app, module_name, class_name)] = test_class
+
+    def run_once(self, flow, metrics):
+        app, module_name, class_name, method_name = FLOWS[flow]
+        test_class = self.classes[(app, module_name, class_name)]
+        tracer = get_tracer()
+        thread = tracer.thread_id()
+        mark = tracer.mark()
+        case = test_class(method_name)
+        start = time.perf_counter()
+        error = None
+        try:
+            set_up_test(case)
+            try:
+                if self.cold:
+                    case.driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+                getattr(case, method_name)()
+            finally:
+                case.tearDown()
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+        elapsed = time.perf_counter() - start
+        events = [
+            event for event in tracer.events_since(mark) if event["tid"] == thread
+        ]
+        tracer.release(mark)
+        for step, seconds in step_timings(events).items():
+            metrics.add(step, seconds)
+        metrics.add(flow, elapsed, error is None, error)
+
+    def close(self):
+        for test_class in self.classes.values():
+            test_class.tearDownClass()
+        self.pool.close()
+
+
+def request_step(entry):
+    """
+    Names the request group of a recorded exchange.
+    """
+    for step, pattern in REQUEST_STEPS:
+        if pattern.search(entry["url"]):
+            return step
+    content_type = next(
+        (value for name, value in entry["headers"] if name.lower() == "content-type"),
+        "",
+    )
+    return "page" if "html" in content_type else "static"
+
+
+def read_flows(archive_path):
+    """
+    Reads the requests each flow made from an archive written by record.
+    Returns:
+        dict: Flow name to its archive entries, in request order
+    """
+    with open(os.path.join(archive_path, FLOWS_FILE), encoding="utf-8") as ranges:
+        flow_ranges = json.load(ranges)
+    with open(os.path.join(archive_path, "index.jsonl"), encoding="utf-8") as index:
+        entries = [json.loads(line) for line in index if line.strip()]
+    return {
+        flow: entries[first:last] for flow, (first, last) in flow_ranges.items()
+    }
+
+
+class HttpUsers:
+    """
+    Re-sends the recorded requests of each flow without a browser.
+    """
+
+    def __init__(self, flows, users, archive_path, skip_static=False):
+        """
+        Args:
+            flows (list): Keys of FLOWS recorded in the archive
+            users (int): Peak number of users, sharing one connection pool
+            archive_path (str): Archive written by record
+            skip_static (bool): Leave out static files and map tiles, to load
+                only the pages and the ArcGIS services
+        """
+        archive = Archive(archive_path)
+        recorded = read_flows(archive_path)
+        missing = sorted(set(flows) - set(recorded))
+        if missing:
+            raise ValueError(f"Flows not recorded in {archive_path}: {missing}")
+        self.requests = {}
+        for flow in flows:
+            self.requests[flow] = [
+                (
+                    request_step(entry),
+                    entry["method"],
+                    entry["url"],
+                    archive.read_request_body(entry) or None,
+                    entry.get("request_type"),
+                )
+                for entry in recorded[flow]
+                if not (skip_static and request_step(entry) in STATIC_STEPS)
+            ]
+        self.http = http_client(max(users, 1))
+
+    def run_once(self, flow, metrics):
+        start = time.perf_counter()
+        failed = None
+        for step, method, url, body, content_type in self.requests[flow]:
+            headers = {"User-Agent": USER_AGENT}
+            if content_type:
+                headers["Content-Type"] = content_type
+            sent = time.perf_counter()
+            error = None
+            try:
+                response = self.http.request(
+                    method,
+                    url,
+                    body=body,
+                    headers=headers,
+                    timeout=DEFAULT_TIMEOUT,
+                    retries=False,
+                )
+                if response.status >= 400:
+                    error = f"HTTP {response.status}: {url}"
+            except urllib3.exceptions.HTTPError as e:
+                error = f"{type(e).__name__}: {url}"
+            metrics.add(step, time.perf_counter() - sent, error is None, error)
+            failed = failed or error
+        metrics.add(flow, time.perf_counter() - start, failed is None)
+
+    def close(self):
+        self.http.clear()
+
+
+def run_load(users, flows, stages, think, metrics):
+    """
+    Starts and stops virtual users to follow the load profile; each user
+    runs the flows in turn until it is told to stop.
+    Args:
+        users (BrowserUsers|HttpUsers): Runs one iteration of a flow
+        flows (list): Flows the users cycle through
+        stages (list): (users, seconds) load profile
+        think (float): Seconds a user pauses between iterations
+    Returns:
+        float: Seconds the load ran
+    """
+
+    def user(index, stop):
+        iteration = 0
+        while not stop.is_set():
+            flow = flows[(index + iteration) % len(flows)]
+            try:
+                users.run_once(flow, metrics)
+            except Exception as e:
+                logger.exception(f"User {index} failed outside its flow")
+                metrics.add(flow, 0.0, False, f"{type(e).__name__}: {e}")
+            iteration += 1
+            stop.wait(think)
+
+    active, stopping = [], []
+    start = time.monotonic()
+    while True:
+        target = target_users(stages, time.monotonic() - start)
+        if target is None:
+            break
+        while len(active) < target:
+            index = len(active) + len(stopping)
+            stop = threading.Event()
+            thread = threading.Thread(
+                target=user, args=(index, stop), name=f"load-user-{index}", daemon=True
+            )
+            thread.start()
+            active.append((thread, stop))
+        while len(active) > target:
+            # A user finishes its current iteration before it stops
+            thread, stop = active.pop()
+            stop.set()
+            stopping.append((thread, stop))
+        metrics.add_users(len(active))
+        time.sleep(0.25)
+    elapsed = time.monotonic() - start
+    for thread, stop in active:
+        stop.set()
+    for thread, _ in active + stopping:
+        thread.join()
+    return elapsed
+
+
+def record_flows(archive_path, flows):
+    """
+    Runs each flow once in a browser through a recording proxy and notes
+    which of the archive's requests belong to which flow.
+    """
+    proxy = ReplayProxy(archive_path, "record").start()
+    os.environ[PROXY_ENV] = proxy.address
+    # Every request has to reach the proxy: no pre-warmed profile, no
+    # blocked resources and an empty HTTP cache for every flow
+    os.environ[TEMPLATE_ENV] = "0"
+    ranges = {}
+    try:
+        users = BrowserUsers(flows, 1, PROFILES["default"], cold=True)
+        try:
+            for flow in flows:
+                first = len(proxy.archive)
+                users.run_once(flow, Metrics())
+                ranges[flow] = [first, len(proxy.archive)]
+                print(f"{flow}: {ranges[flow][1] - first} requests")
+        finally:
+            users.close()
+    finally:
+        proxy.stop()
+        os.environ.pop(PROXY_ENV, None)
+    with open(os.path.join(archive_path, FLOWS_FILE), "w", encoding="utf-8") as output:
+        json.dump(ranges, output, indent=2)
+
+
+def format_summary(summary, flows, elapsed, timeline):
+    lines = [f"Ran for {elapsed:.0f}s", ""]
+    header = (
+        f"{'STEP':28} {'COUNT':>7} {'ERR':>5} {'/s':>7} "
+        + " ".join(f"{f'p{q}':>8}" for q in PERCENTILES)
+        + f" {'max':>8}"
+    )
+    lines.append(header)
+    for step, values in sorted(summary.items(), key=lambda item: item[0] not in flows):
+        lines.append(
+            f"{step[:28]:28} {values['count']:7} {values['errors']:5} "
+            f"{values['throughput']:7.2f} "
+            + " ".join(f"{values[f'p{q}']:8.0f}" for q in PERCENTILES)
+            + f" {values['max']:8.0f}"
+        )
+    lines.append("(latencies in ms; flows first, then their steps)")
+    lines.append("")
+    lines.append(f"{'WINDOW':>8} {'USERS':>6} {'FLOWS/S':>8} {'p95':>8}")
+    for row in timeline:
+        p95 = "-" if row["p95"] is None else f"{row['p95']:.0f}"
+        lines.append(
+            f"{row['start']:7.0f}s {row['users']:6} {row['throughput']:8.2f} {p95:>8}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure TDAT/TDMT latency under concurrent virtual users."
+    )
+    parser.add_argument("mode", choices=("browser", "http", "record"))
+    parser.add_argument(
+        "archive_dir", nargs="?", help="Archive to record the flows into (record)"
+    )
+    parser.add_argument(
+        "--flows",
+        default=",".join(DEFAULT_FLOWS),
+        help=f"Comma-separated flows (any of {', '.join(FLOWS)})",
+    )
+    parser.add_argument("--users", type=int, default=4, help="Peak virtual users")
+    parser.add_argument("--ramp", type=float, default=30.0, help="Ramp-up seconds")
+    parser.add_argument(
+        "--duration", type=float, default=60.0, help="Seconds at peak after the ramp"
+    )
+    parser.add_argument(
+        "--stages",
+        type=parse_stages,
+        help="Load profile as users:seconds pairs, e.g. 10:30,50:60,0:10 "
+        "(overrides --users, --ramp and --duration)",
+    )
+    parser.add_argument(
+        "--think", type=float, default=1.0, help="Seconds between a user's iterations"
+    )
+    parser.add_argument(
+        "--profile",
+        choices=sorted(PROFILES),
+        default="fast",
+        help="Launch profile of the browser users (default: headless 'fast')",
+    )
+    parser.add_argument("--archive", help="Recorded flows for the http users")
+    parser.add_argument(
+        "--skip-static",
+        action="store_true",
+        help="http users leave out static files and map tiles",
+    )
+    parser.add_argument(
+        "--replay", metavar="ARCHIVE", help="Serve all traffic from this recording"
+    )
+    parser.add_argument(
+        "--latency",
+        type=parse_latency,
+        default="recorded",
+        help="Replay delay: zero, recorded (default) or a number of seconds",
+    )
+    args = parser.parse_args(argv)
+    flows = [flow.strip() for flow in args.flows.split(",") if flow.strip()]
+    unknown = sorted(set(flows) - set(FLOWS))
+    if unknown:
+        parser.error(f"unknown flows: {', '.join(unknown)}")
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.mode == "record":
+        if not args.archive_dir:
+            parser.error("record needs an archive directory")
+        record_flows(args.archive_dir, flows)
+        return 0
+    if args.mode == "http" and not args.archive:
+        parser.error("http users need --archive (see the record mode)")
+
+    stages = args.stages or [(args.users, args.ramp), (args.users, args.duration)]
+    peak = max(users for users, _ in stages)
+    proxy = None
+    if args.replay:
+        proxy = ReplayProxy(args.replay, "replay", latency=args.latency).start()
+        os.environ[PROXY_ENV] = proxy.address
+    try:
+        if args.mode == "browser":
+            users = BrowserUsers(flows, peak, PROFILES[args.profile])
+        else:
+            users = HttpUsers(flows, peak, args.archive, args.skip_static)
+        metrics = Metrics()
+        try:
+            elapsed = run_load(users, flows, stages, args.think, metrics)
+        finally:
+            users.close()
+    finally:
+        if proxy is not None:
+            proxy.stop()
+            if proxy.misses:
+                print(f"{len(proxy.misses)} requests were not in the recording")
+
+    summary = metrics.summary(elapsed)
+    timeline = metrics.timeline(flows)
+    print(format_summary(summary, flows, elapsed, timeline))
+    os.makedirs(DEFAULT_OUTPUT_DIR, exist_ok=True)
+    output_file = os.path.join(
+        DEFAULT_OUTPUT_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json"
+    )
+    with open(output_file, "w", encoding="utf-8") as output:
+        json.dump(
+            {
+                "mode": args.mode,
+                "flows": flows,
+                "stages": stages,
+                "think": args.think,
+                "elapsed": round(elapsed, 1),
+                "steps": summary,
+                "timeline": timeline,
+                "errors": metrics.errors,
+            },
+            output,
+            indent=2,
+        )
+    print(f"Results written to {output_file}")
+    errors = sum(values["errors"] for step, values in summary.items() if step in flows)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
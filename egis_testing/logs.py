@@ -0,0 +1,208 @@
+"""
+Non-blocking logging for the EGIS test suites.
+
+Log calls put records on a queue; a background listener thread formats and
+writes them, so a test never waits on the disk or the console. Every process
+has one file sink: a plain text log for standalone runs, or a JSON-lines
+file per worker under the parallel runner (``$EGIS_LOG_FILE``), which the
+runner merges into one log by timestamp at the end of the run.
+
+The native stack traces that chromedriver appends to every WebDriver error
+(20-odd ``#N 0x...`` frames) are folded into a single line.
+"""
+
+import atexit
+import copy
+import glob
+import json
+import logging
+import os
+import queue
+import re
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+
+LOG_FILE_ENV = "EGIS_LOG_FILE"
+WORKER_ENV = "EGIS_WORKER"
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# "Stacktrace:" (or "Backtrace:") followed by frames that carry a native address
+NATIVE_STACK = re.compile(
+    r"(?P<label>Stacktrace|Backtrace):[ \t]*\n"
+    r"(?P<frames>(?:[^\n]*0x[0-9a-fA-F]{6,}[^\n]*(?:\n|$))+)"
+)
+
+
+def condense(text):
+    """
+    Replaces chromedriver's native stack traces in text with a one-line note.
+    """
+    return NATIVE_STACK.sub(
+        lambda match: f"{match.group('label')}: "
+        f"<{match.group('frames').count(chr(10)) or 1} native frames omitted>\n",
+        text,
+    ).rstrip("\n")
+
+
+class CondensingFormatter(logging.Formatter):
+    """
+    The suites' text format, with native stack traces condensed.
+    """
+
+    def __init__(self):
+        super().__init__(TEXT_FORMAT)
+
+    def format(self, record):
+        return condense(super().format(record))
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    One JSON object per record, for the per-worker sinks.
+    """
+
+    def format(self, record):
+        entry = {
+            "ts": record.created,
+            "time": datetime.fromtimestamp(record.created).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "worker": os.environ.get(WORKER_ENV),
+            "pid": record.process,
+            "message": condense(record.getMessage()),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = condense(record.exc_text)
+        return json.dumps(entry)
+
+
+class ExceptionQueueHandler(QueueHandler):
+    """
+    QueueHandler that keeps the traceback apart from the message. The stock
+    one folds it into the message text, so the JSON-lines sinks could not
+    tell them apart.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(
+                record.exc_info
+            )
+            # The traceback would keep every frame alive until written
+            record.exc_info = None
+        return record
+
+
+def _file_handler(path, mode):
+    handler = logging.FileHandler(path, mode=mode, encoding="utf-8")
+    if path.endswith(".jsonl"):
+        handler.setFormatter(JsonLinesFormatter())
+    else:
+        handler.setFormatter(CondensingFormatter())
+    return handler
+
+
+_lock = threading.Lock()
+_queue = None
+_listener = None
+_sink_path = None
+_opened = set()
+
+
+def configure_logging(default_file):
+    """
+    Routes the root logger through a queue to a background writer.
+    Safe to call from every setUpClass: the queue is set up once per process,
+    and a log file is truncated only the first time the process opens it.
+    Args:
+        default_file (str): Log file for standalone runs; $EGIS_LOG_FILE wins
+    Returns:
+        str: The path of the file sink
+    """
+    global _queue, _listener, _sink_path
+    path = os.environ.get(LOG_FILE_ENV) or default_file
+    with _lock:
+        if _listener is not None and path == _sink_path:
+            return path
+        if _queue is None:
+            _queue = queue.SimpleQueue()
+            root = logging.getLogger()
+            root.handlers = [ExceptionQueueHandler(_queue)]
+            root.setLevel(logging.INFO)
+            atexit.register(stop_logging)
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+
+        # The parallel runner's worker sinks are shared by every suite the
+        # worker runs, so they are appended to
+        mode = "a" if path in _opened or os.environ.get(LOG_FILE_ENV) else "w"
+        _opened.add(path)
+        console = logging.StreamHandler()
+        console.setFormatter(CondensingFormatter())
+        _listener = QueueListener(
+            _queue, console, _file_handler(path, mode), respect_handler_level=True
+        )
+        _listener.start()
+        _sink_path = path
+    return path
+
+
+def stop_logging():
+    """
+    Writes out queued records and closes the sinks. Worker processes call
+    this explicitly because multiprocessing children skip atexit handlers.
+    """
+    global _listener, _sink_path
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        _sink_path = None
+
+
+def merge_logs(log_dir, output_file):
+    """
+    Interleaves the per-worker JSON-lines sinks by timestamp into one text
+    log and one JSON-lines log (``output_file`` with a ``.jsonl`` suffix).
+    Args:
+        log_dir (str): Directory containing ``worker-*.jsonl`` files
+        output_file (str): Path of the merged text log
+    """
+    entries = []
+    for path in sorted(glob.glob(os.path.join(log_dir, "worker-*.jsonl"))):
+        worker = os.path.splitext(os.path.basename(path))[0]
+        with open(path, encoding="utf-8", errors="replace") as log:
+            for line in log:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entry.setdefault("source", worker)
+                entries.append(entry)
+    entries.sort(key=lambda entry: entry["ts"])
+    json_file = os.path.splitext(output_file)[0] + ".jsonl"
+    with open(output_file, "w", encoding="utf-8") as merged, open(
+        json_file, "w", encoding="utf-8"
+    ) as merged_json:
+        for entry in entries:
+            stamp = entry["time"].replace("T", " ").replace(".", ",")
+            merged.write(
+                f"[{entry['source']}] {stamp} - {entry['level']} - {entry['message']}\n"
+            )
+            if entry.get("exception"):
+                merged.write(entry["exception"] + "\n")
+            merged_json.write(json.dumps(entry) + "\n")
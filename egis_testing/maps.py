@@ -0,0 +1,181 @@
+"""
+Readiness and interaction hooks for the ArcGIS JS map on the EGIS sites.
+
+The map tests used to click ``#mapDiv`` or the zoom slider as soon as the
+element was visible, without knowing whether the map had loaded or was
+still redrawing. These helpers find the ``esri.Map`` instance in the page,
+subscribe to its ``update-start``/``update-end`` events and report its load
+state, pending tile images, extent and zoom level in one script call, so an
+action ends as soon as the map has finished rendering.
+"""
+
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.by import By
+
+
+ZOOM_IN = (By.CLASS_NAME, "esriSimpleSliderIncrementButton")
+ZOOM_OUT = (By.CLASS_NAME, "esriSimpleSliderDecrementButton")
+
+# Finds the map (a global, or one level down in an app namespace), hooks its
+# update events once and returns its current state
+MAP_STATE = """
+const containerId = arguments[0];
+let hooks = window.__egisMapHooks;
+if (!hooks || hooks.map.id !== containerId) {
+    const isMap = (value) => value && value.declaredClass === 'esri.Map'
+        && value.id === containerId;
+    let map = null;
+    for (const key of Object.keys(window)) {
+        let value;
+        try { value = window[key]; } catch (e) { continue; }
+        if (isMap(value)) { map = value; break; }
+        if (value && typeof value === 'object' && !(value instanceof Node)) {
+            try {
+                map = Object.values(value).find(isMap) || null;
+            } catch (e) {}
+            if (map) break;
+        }
+    }
+    if (!map) return null;
+    hooks = {map: map, updating: !!map.updating, updateEnds: 0};
+    map.on('update-start', () => { hooks.updating = true; });
+    map.on('update-end', () => { hooks.updating = false; hooks.updateEnds += 1; });
+    window.__egisMapHooks = hooks;
+}
+const map = hooks.map;
+const container = document.getElementById(containerId);
+const pendingTiles = container
+    ? Array.from(container.querySelectorAll('img'))
+        .filter((img) => !img.complete).length
+    : 0;
+const extent = map.extent;
+return {
+    loaded: !!map.loaded,
+    updating: hooks.updating || !!map.updating,
+    update_ends: hooks.updateEnds,
+    pending_tiles: pendingTiles,
+    level: typeof map.getLevel === 'function' ? map.getLevel() : null,
+    scale: typeof map.getScale === 'function' ? map.getScale() : null,
+    extent: extent ? {
+        xmin: extent.xmin,
+        ymin: extent.ymin,
+        xmax: extent.xmax,
+        ymax: extent.ymax,
+        wkid: extent.spatialReference ? extent.spatialReference.wkid : null,
+    } : null,
+};
+"""
+
+
+def is_settled(state, since=None):
+    """
+    Returns True if the map has loaded and is not redrawing or fetching
+    tiles; with since, at least one redraw must have finished after it.
+    Args:
+        state (dict): A map state as returned by ArcGISMap.state
+        since (int): The "update_ends" count before the action
+    """
+    return bool(
+        state
+        and state["loaded"]
+        and not state["updating"]
+        and not state["pending_tiles"]
+        and (since is None or state["update_ends"] > since)
+    )
+
+
+class ArcGISMap:
+    """
+    The ArcGIS JS map rendered in one container of the current page.
+    """
+
+    def __init__(self, driver, wait, container_id="mapDiv"):
+        """
+        Args:
+            driver (WebDriver): The session showing the map
+            wait (Waiter): Waiter used for the readiness conditions
+            container_id (str): ID of the map's container element
+        """
+        self.driver = driver
+        self.wait = wait
+        self.container_id = container_id
+
+    def state(self):
+        """
+        Returns:
+            dict: "loaded", "updating", "update_ends", "pending_tiles",
+            "level", "scale" and "extent", or None if no map was found
+        """
+        return self.driver.execute_script(MAP_STATE, self.container_id)
+
+    def wait_settled(self, since=None, timeout=None):
+        """
+        Waits until the map has loaded and finished redrawing.
+        Args:
+            since (int): Also wait for a redraw that ended after this
+                "update_ends" count
+        Returns:
+            dict: The settled map state
+        """
+
+        def settled(driver):
+            state = self.state()
+            return state if is_settled(state, since) else False
+
+        description = "map settled" if since is None else "map redrawn"
+        return self.wait.until(settled, description, timeout)
+
+    def extent(self):
+        """
+        Returns:
+            dict: "xmin", "ymin", "xmax", "ymax" and "wkid" of the visible area
+        """
+        return self.wait_settled()["extent"]
+
+    def level(self):
+        """
+        Returns:
+            int: The current zoom level
+        """
+        return self.wait_settled()["level"]
+
+    def _act(self, action, redraws=True, timeout=None):
+        before = self.wait_settled(timeout=timeout)
+        action()
+        since = before["update_ends"] if redraws else None
+        return before, self.wait_settled(since, timeout)
+
+    def zoom_in(self, timeout=None):
+        """
+        Clicks the zoom-in button and waits for the redraw.
+        Returns:
+            tuple: (state before, state after)
+        """
+        return self._act(lambda: self._click(ZOOM_IN), timeout=timeout)
+
+    def zoom_out(self, timeout=None):
+        """
+        Clicks the zoom-out button and waits for the redraw.
+        Returns:
+            tuple: (state before, state after)
+        """
+        return self._act(lambda: self._click(ZOOM_OUT), timeout=timeout)
+
+    def click(self, x_offset=0, y_offset=0, timeout=None):
+        """
+        Clicks the map at an offset from its centre and waits until it has
+        settled again (a click does not necessarily redraw it).
+        Returns:
+            tuple: (state before, state after)
+        """
+
+        def click():
+            container = self.driver.find_element(By.ID, self.container_id)
+            ActionChains(self.driver).move_to_element(container).move_by_offset(
+                x_offset, y_offset
+            ).click().perform()
+
+        return self._act(click, redraws=False, timeout=timeout)
+
+    def _click(self, locator):
+        self.wait.clickable(locator).click()
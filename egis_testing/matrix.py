@@ -0,0 +1,366 @@
+"""
+Exhaustive tribe and county matrix for TDAT.
+
+Harvests every option of the ``#tribe`` dropdown and every county of every
+``#state`` in one pass, caches the catalog on disk keyed by a fingerprint of
+the deployed site (its script and stylesheet URLs), and runs one case per
+tribe and per county across parallel worker processes. Each case checks the
+``#grid-title`` text for the selected tribe or county.
+
+Results are appended to ``progress-<worker>.jsonl`` as each case finishes,
+so re-running the same command against the same site version picks up
+where an interrupted run stopped.
+
+Usage:
+    python -m egis_testing.matrix --workers 4
+    python -m egis_testing.matrix --kind tribe --limit 50
+    python -m egis_testing.matrix --retry-failed
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from egis_testing.artifacts import ARTIFACTS_DIR_ENV, capture_failure, flush_artifacts
+from egis_testing.benchmark import load_test_class
+from egis_testing.drivers import PROFILE_ENV, PROFILES
+from egis_testing.logs import LOG_FILE_ENV, WORKER_ENV, merge_logs, stop_logging
+from egis_testing.pool import close_pool, set_up_test
+from egis_testing.results import ResultsStore
+from egis_testing.runner import DEFAULT_RESULTS_DIR, write_report
+from egis_testing.tracing import TRACE_DIR_ENV, export_trace, merge_traces
+
+
+MATRIX_DIR = os.path.join(DEFAULT_RESULTS_DIR, "matrix")
+
+# (app directory, module, test class) providing the matrix helpers
+SUITE = ("TDAT", "tdat_test", "TDATSiteNavigationTests")
+# case kind: suite method that checks one case
+CHECKS = {"tribe": "check_tribe", "county": "check_county"}
+
+SITE_ASSETS = """
+const assets = Array.from(
+    document.querySelectorAll('script[src], link[rel="stylesheet"][href]'))
+    .map((element) => element.src || element.href)
+    .sort();
+return {title: document.title, assets: assets};
+"""
+
+
+def site_fingerprint(driver):
+    """
+    Fingerprints the deployed site from the page driver has loaded.
+    A deployment changes the (versioned) script and stylesheet URLs.
+    Returns:
+        str: A short hex digest
+    """
+    assets = driver.execute_script(SITE_ASSETS)
+    digest = hashlib.sha256(json.dumps(assets, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class OptionCatalog:
+    """
+    Cached dropdown options of one site version.
+    """
+
+    def __init__(self, fingerprint, matrix_dir=MATRIX_DIR):
+        self.fingerprint = fingerprint
+        self.path = os.path.join(matrix_dir, fingerprint, "catalog.json")
+
+    def load(self):
+        """
+        Returns:
+            dict: The cached options, or None if this version was never harvested
+        """
+        try:
+            with open(self.path, encoding="utf-8") as cached:
+                return json.load(cached)["options"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, options):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as cached:
+            json.dump(
+                {
+                    "fingerprint": self.fingerprint,
+                    "harvested": time.time(),
+                    "options": options,
+                },
+                cached,
+                indent=2,
+            )
+        os.replace(temp_path, self.path)
+
+
+def build_cases(options, kinds=tuple(CHECKS)):
+    """
+    Expands harvested options into matrix cases.
+    Args:
+        options (dict): "tribes" and "counties" as returned by TDATPage.harvest_options
+        kinds (iterable): Case kinds to include
+    Returns:
+        list: Case dicts with "id", "kind" and the check's "args"
+    """
+    cases = []
+    if "tribe" in kinds:
+        for tribe in options["tribes"]:
+            cases.append({"id": f"tribe/{tribe}", "kind": "tribe", "args": [tribe]})
+    if "county" in kinds:
+        for state, counties in sorted(options["counties"].items()):
+            for county in counties:
+                cases.append(
+                    {
+                        "id": f"county/{state}/{county}",
+                        "kind": "county",
+                        "args": [state, county],
+                    }
+                )
+    return cases
+
+
+def load_progress(run_dir):
+    """
+    Reads the results recorded so far.
+    Returns:
+        dict: Case id to its latest result record
+    """
+    records = {}
+    for path in sorted(glob.glob(os.path.join(run_dir, "progress-*.jsonl"))):
+        with open(path, encoding="utf-8") as progress:
+            for line in progress:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Last line of a worker that was killed mid-write
+                    continue
+                records[record["id"]] = record
+    return records
+
+
+def run_case(test_class, case, worker):
+    """
+    Runs one case on a pooled session.
+    Returns:
+        dict: A result record in the runner's format
+    """
+    outcome, details, failure_class = "success", "", None
+    start = time.perf_counter()
+    test = test_class(CHECKS[case["kind"]])
+    try:
+        set_up_test(test)
+        try:
+            getattr(test, CHECKS[case["kind"]])(*case["args"])
+        except Exception:
+            capture_failure(test.driver, case["id"])
+            raise
+        finally:
+            test.tearDown()
+    except test.failureException as e:
+        outcome, details = "failure", traceback.format_exc()
+        failure_class = type(e).__name__
+    except Exception as e:
+        outcome, details = "error", traceback.format_exc()
+        failure_class = type(e).__name__
+    if outcome == "success":
+        test.logger.info(f"Matrix case passed: {case['id']}")
+    else:
+        test.logger.error(f"Matrix case {outcome}: {case['id']}")
+    return {
+        "id": case["id"],
+        "app": SUITE[0],
+        "environment": test.environment_url,
+        "outcome": outcome,
+        "duration": round(time.perf_counter() - start, 3),
+        "worker": worker,
+        "details": details,
+        "failure_class": failure_class,
+    }
+
+
+def run_matrix_shard(worker, cases, run_dir):
+    """
+    Runs a share of the matrix in the current (worker) process, appending
+    each result to the worker's progress file as soon as it is known.
+    Returns:
+        list: Result records of the shard
+    """
+    os.environ[WORKER_ENV] = str(worker)
+    os.environ[LOG_FILE_ENV] = os.path.join(run_dir, f"worker-{worker}.jsonl")
+    os.environ[TRACE_DIR_ENV] = run_dir
+    os.environ[ARTIFACTS_DIR_ENV] = os.path.join(run_dir, "artifacts")
+
+    test_class = load_test_class(*SUITE)
+    test_class.setUpClass()
+    records = []
+    try:
+        progress_path = os.path.join(run_dir, f"progress-{worker}.jsonl")
+        with open(progress_path, "a", encoding="utf-8") as progress:
+            for case in cases:
+                record = run_case(test_class, case, worker)
+                progress.write(json.dumps(record) + "\n")
+                progress.flush()
+                records.append(record)
+    finally:
+        test_class.tearDownClass()
+        close_pool()
+        export_trace()
+        flush_artifacts()
+        stop_logging()
+    return records
+
+
+def harvest(refresh=False, matrix_dir=MATRIX_DIR):
+    """
+    Fingerprints the site and returns its option catalog, harvesting the
+    dropdowns only when this site version has no cached catalog.
+    Returns:
+        tuple: (fingerprint, options)
+    """
+    os.makedirs(matrix_dir, exist_ok=True)
+    os.environ[LOG_FILE_ENV] = os.path.join(matrix_dir, "harvest.log")
+    test_class = load_test_class(*SUITE)
+    test_class.setUpClass()
+    test = test_class("visit_tdat_site")
+    set_up_test(test)
+    try:
+        test.page.visit()
+        fingerprint = site_fingerprint(test.driver)
+        catalog = OptionCatalog(fingerprint, matrix_dir)
+        options = None if refresh else catalog.load()
+        if options is None:
+            test.logger.info(f"Harvesting dropdown options for site {fingerprint}")
+            options = test.page.harvest_options()
+            catalog.save(options)
+    finally:
+        test.tearDown()
+        test_class.tearDownClass()
+        close_pool()
+        os.environ.pop(LOG_FILE_ENV, None)
+    return fingerprint, options
+
+
+def run(cases, pending, workers, run_dir):
+    """
+    Runs the pending cases across worker processes and reports on all of
+    cases, including those finished by earlier, interrupted runs.
+    Args:
+        cases (list): Every case selected for this run
+        pending (list): The cases without a recorded result
+        workers (int): Number of worker processes (and browser sessions)
+        run_dir (str): Directory holding the catalog and progress files
+    Returns:
+        dict: The report summary
+    """
+    shards = [pending[worker :: max(workers, 1)] for worker in range(max(workers, 1))]
+    shards = [cases_in_shard for cases_in_shard in shards if cases_in_shard]
+    records = []
+    start = time.perf_counter()
+    if shards:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=len(shards), mp_context=context) as pool:
+            futures = {
+                pool.submit(run_matrix_shard, worker, cases_in_shard, run_dir): worker
+                for worker, cases_in_shard in enumerate(shards)
+            }
+            for future in as_completed(futures):
+                try:
+                    records.extend(future.result())
+                except Exception:
+                    # Unfinished cases stay pending for the next run
+                    print(
+                        f"Worker {futures[future]} crashed:\n{traceback.format_exc()}"
+                    )
+    wall = time.perf_counter() - start
+
+    merge_logs(run_dir, os.path.join(run_dir, "run.log"))
+    traces = sorted(glob.glob(os.path.join(run_dir, "trace-*.json")))
+    if traces:
+        merge_traces(traces, os.path.join(run_dir, "trace.json"))
+    if records:
+        ResultsStore().add_run(
+            records, wall=wall, workers=len(shards), run_dir=run_dir, kind="matrix"
+        )
+    progress = load_progress(run_dir)
+    reported = [progress[case["id"]] for case in cases if case["id"] in progress]
+    return write_report(reported, wall, os.path.join(run_dir, "report.txt"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run every TDAT tribe and county search in parallel sessions."
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=max(1, min(4, os.cpu_count() or 1)),
+        help="Number of worker processes, each with its own Chrome session",
+    )
+    parser.add_argument(
+        "--kind",
+        action="append",
+        choices=sorted(CHECKS),
+        help="Case kinds to run (default: all)",
+    )
+    parser.add_argument("--limit", type=int, help="Only run the first N cases")
+    parser.add_argument(
+        "--profile",
+        choices=sorted(PROFILES),
+        help="Browser launch profile (default: $EGIS_BROWSER_PROFILE or 'default')",
+    )
+    parser.add_argument(
+        "--refresh-catalog",
+        action="store_true",
+        help="Harvest the dropdowns even if this site version is cached",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Run recorded failures and errors again",
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Discard recorded progress and run every case",
+    )
+    args = parser.parse_args(argv)
+    if args.profile:
+        os.environ[PROFILE_ENV] = args.profile
+
+    fingerprint, options = harvest(args.refresh_catalog)
+    cases = build_cases(options, args.kind or tuple(CHECKS))
+    if args.limit:
+        cases = cases[: args.limit]
+    run_dir = os.path.join(MATRIX_DIR, fingerprint)
+    if args.fresh:
+        for path in glob.glob(os.path.join(run_dir, "progress-*.jsonl")):
+            os.remove(path)
+
+    done = load_progress(run_dir)
+    pending = [
+        case
+        for case in cases
+        if case["id"] not in done
+        or (args.retry_failed and done[case["id"]]["outcome"] != "success")
+    ]
+    print(
+        f"Site {fingerprint}: {len(cases)} cases, "
+        f"{len(cases) - len(pending)} already done, {len(pending)} to run"
+    )
+    summary = run(cases, pending, args.workers, run_dir)
+    print(f"Results written to {run_dir}")
+    return 0 if summary["failure"] == 0 and summary["error"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
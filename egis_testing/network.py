@@ -0,0 +1,418 @@
+"""
+Per-test network waterfalls and transfer sizes from Chrome's performance log.
+
+After every test the suites turn the session's Network events into a
+waterfall: each request's start, duration, timing phases, bytes on the wire
+and cache status. It is summarized into request counts and bytes per domain
+and resource type, the slowest requests and the cache hit ratio. Reports go
+to ``$EGIS_NETWORK_DIR`` (the parallel runner points this at
+``<run dir>/network``) or ``test-results/network/<timestamp>``, as
+``<test id>.json`` and a readable ``<test id>.txt``.
+
+The runner compares every run's reports with those of the previous run and
+lists the tests whose transfer grew and the heavy assets that are new or
+have grown.
+
+Usage:
+    python -m egis_testing.network show test-results/<run>/network/<test>.json
+    python -m egis_testing.network compare \
+        test-results/<old run>/network test-results/<new run>/network
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import re
+import sys
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit
+
+from egis_testing.artifacts import network_events, performance_log
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NETWORK_DIR_ENV = "EGIS_NETWORK_DIR"
+DEFAULT_NETWORK_DIR = os.path.join(
+    REPO_ROOT, "test-results", "network", datetime.now().strftime("%Y%m%d-%H%M%S")
+)
+TOP_REQUESTS = 10
+WATERFALL_WIDTH = 50
+# An asset this large that is new or has grown is reported
+HEAVY_ASSET_BYTES = 100 * 1024
+# A test's transfer must grow by both to be reported
+GROWTH_RATIO = 0.2
+GROWTH_BYTES = 50 * 1024
+
+PHASES = ("queued", "dns", "connect", "ssl", "send", "wait", "receive")
+
+logger = logging.getLogger(__name__)
+
+
+def _span(timing, start, end):
+    if timing.get(start, -1) < 0 or timing.get(end, -1) < 0:
+        return 0.0
+    return max(timing[end] - timing[start], 0.0)
+
+
+def _phases(record):
+    timing = record["timing"]
+    if not timing or record["end"] is None:
+        return {}
+    sent = timing["requestTime"] * 1000
+    headers = sent + timing.get("receiveHeadersEnd", 0)
+    return {
+        "queued": round(max(sent - record["start"] * 1000, 0.0), 1),
+        "dns": round(_span(timing, "dnsStart", "dnsEnd"), 1),
+        # Chrome's connect phase includes the TLS handshake
+        "connect": round(
+            _span(timing, "connectStart", "connectEnd")
+            - _span(timing, "sslStart", "sslEnd"),
+            1,
+        ),
+        "ssl": round(_span(timing, "sslStart", "sslEnd"), 1),
+        "send": round(_span(timing, "sendStart", "sendEnd"), 1),
+        "wait": round(_span(timing, "sendEnd", "receiveHeadersEnd"), 1),
+        "receive": round(max(record["end"] * 1000 - headers, 0.0), 1),
+    }
+
+
+def waterfall(entries):
+    """
+    Builds the waterfall of the requests in performance log entries.
+    Args:
+        entries (list): Entries from driver.get_log("performance")
+    Returns:
+        list: One dict per request (each hop of a redirect counts), by start
+        time, with "url", "domain", "method", "type", "status", "start" and
+        "duration" (milliseconds from the first request), "bytes", "cache"
+        (None, "memory", "disk", "service-worker", "prefetch" or
+        "revalidated"), "error" and "phases"
+    """
+    records, done = {}, []
+
+    def finish(record, end):
+        record["end"] = end
+        done.append(record)
+
+    for method, params, _ in network_events(entries):
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            if request_id in records and "redirectResponse" in params:
+                previous = records.pop(request_id)
+                previous["status"] = params["redirectResponse"].get("status")
+                finish(previous, params.get("timestamp"))
+            request = params.get("request", {})
+            records[request_id] = {
+                "url": request.get("url", ""),
+                "method": request.get("method", "GET"),
+                "type": params.get("type", "Other"),
+                "start": params.get("timestamp", 0.0),
+                "end": None,
+                "status": None,
+                "bytes": 0,
+                "cache": None,
+                "error": None,
+                "timing": None,
+            }
+        elif request_id in records:
+            record = records[request_id]
+            if method == "Network.requestServedFromCache":
+                record["cache"] = "memory"
+            elif method == "Network.responseReceived":
+                response = params.get("response", {})
+                record["status"] = response.get("status")
+                record["timing"] = response.get("timing")
+                if response.get("fromServiceWorker"):
+                    record["cache"] = "service-worker"
+                elif response.get("fromPrefetchCache"):
+                    record["cache"] = "prefetch"
+                elif response.get("fromDiskCache") and record["cache"] is None:
+                    record["cache"] = "disk"
+                elif record["status"] == 304:
+                    record["cache"] = "revalidated"
+            elif method == "Network.loadingFinished":
+                record["bytes"] = params.get("encodedDataLength", 0)
+                finish(records.pop(request_id), params.get("timestamp"))
+            elif method == "Network.loadingFailed":
+                record["error"] = params.get("errorText") or "failed"
+                if params.get("canceled"):
+                    record["error"] = "canceled"
+                finish(records.pop(request_id), params.get("timestamp"))
+    # Still loading when the test ended
+    done.extend(records.values())
+    if not done:
+        return []
+
+    origin = min(record["start"] for record in done)
+    requests = []
+    for record in sorted(done, key=lambda record: record["start"]):
+        requests.append(
+            {
+                "url": record["url"],
+                "domain": urlsplit(record["url"]).netloc or record["url"][:20],
+                "method": record["method"],
+                "type": record["type"],
+                "status": record["status"],
+                "start": round((record["start"] - origin) * 1000, 1),
+                "duration": (
+                    None
+                    if record["end"] is None
+                    else round((record["end"] - record["start"]) * 1000, 1)
+                ),
+                "bytes": int(record["bytes"] or 0),
+                "cache": record["cache"],
+                "error": record["error"],
+                "phases": _phases(record),
+            }
+        )
+    return requests
+
+
+def summarize(requests, top=TOP_REQUESTS):
+    """
+    Totals a waterfall.
+    Returns:
+        dict: "requests", "bytes", "duration" (first start to last end, in
+        milliseconds), "failed", "cache" (hits, revalidated, hit ratio),
+        "domains" and "types" (requests and bytes each) and "slowest"
+    """
+    domains, types = {}, {}
+    for request in requests:
+        for groups, key in ((domains, request["domain"]), (types, request["type"])):
+            group = groups.setdefault(key, {"requests": 0, "bytes": 0})
+            group["requests"] += 1
+            group["bytes"] += request["bytes"]
+    hits = sum(
+        1 for request in requests if request["cache"] not in (None, "revalidated")
+    )
+    revalidated = sum(1 for request in requests if request["cache"] == "revalidated")
+    ends = [
+        request["start"] + request["duration"]
+        for request in requests
+        if request["duration"] is not None
+    ]
+    slowest = sorted(
+        (request for request in requests if request["duration"] is not None),
+        key=lambda request: request["duration"],
+        reverse=True,
+    )[:top]
+    return {
+        "requests": len(requests),
+        "bytes": sum(request["bytes"] for request in requests),
+        "duration": round(max(ends, default=0.0), 1),
+        "failed": sum(1 for request in requests if request["error"]),
+        "cache": {
+            "hits": hits,
+            "revalidated": revalidated,
+            "hit_ratio": round(hits / len(requests), 3) if requests else 0.0,
+        },
+        "domains": dict(
+            sorted(domains.items(), key=lambda item: item[1]["bytes"], reverse=True)
+        ),
+        "types": dict(
+            sorted(types.items(), key=lambda item: item[1]["bytes"], reverse=True)
+        ),
+        "slowest": [
+            {
+                key: request[key]
+                for key in ("url", "duration", "bytes", "status", "cache")
+            }
+            for request in slowest
+        ],
+    }
+
+
+def _kib(size):
+    return f"{size / 1024:,.0f} KiB" if size >= 1024 else f"{size} B"
+
+
+def _short(url, width=70):
+    return url if len(url) <= width else url[: width - 3] + "..."
+
+
+def format_report(test_id, requests, summary, width=WATERFALL_WIDTH):
+    """
+    Renders a network report as text: totals, domains, slowest requests and
+    a waterfall with one bar per request.
+    """
+    cache = summary["cache"]
+    lines = [
+        test_id,
+        f"{summary['requests']} requests, {_kib(summary['bytes'])} transferred in "
+        f"{summary['duration']:.0f} ms; {summary['failed']} failed; cache hits "
+        f"{cache['hits']} ({100 * cache['hit_ratio']:.0f}%), "
+        f"{cache['revalidated']} revalidated",
+        "",
+        f"{'DOMAIN':40} {'REQUESTS':>8} {'TRANSFER':>12}",
+    ]
+    for domain, group in summary["domains"].items():
+        lines.append(
+            f"{domain[:40]:40} {group['requests']:8} {_kib(group['bytes']):>12}"
+        )
+    lines += ["", f"Slowest {len(summary['slowest'])} requests:"]
+    for request in summary["slowest"]:
+        lines.append(
+            f"  {request['duration']:8.0f} ms {_kib(request['bytes']):>10}  "
+            f"{_short(request['url'])}"
+        )
+    lines += ["", "Waterfall:"]
+    total = summary["duration"] or 1.0
+    for request in requests:
+        begin = int(width * request["start"] / total)
+        length = (
+            width - begin
+            if request["duration"] is None
+            else max(1, int(width * request["duration"] / total))
+        )
+        duration = "-" if request["duration"] is None else f"{request['duration']:.0f}"
+        bar = " " * begin + ("=" if request["cache"] is None else "-") * length
+        lines.append(
+            f"  |{bar[:width]:{width}}| {request['start']:7.0f} ms "
+            f"{duration:>6} "
+            f"{_kib(request['bytes']):>10} {request['status'] or '-':>3} "
+            f"{_short(request['url'], 60)}"
+        )
+    lines.append("  (= network, - served from cache)")
+    return "\n".join(lines)
+
+
+def report_path(test_id, directory=None):
+    directory = directory or os.environ.get(NETWORK_DIR_ENV) or DEFAULT_NETWORK_DIR
+    return os.path.join(directory, re.sub(r"[^\w.-]+", "_", test_id)[:150])
+
+
+def record_network(driver, test_id):
+    """
+    Writes the network report of the test that just ran on driver. Meant to
+    be called from tearDown, before the session goes back to the pool.
+    Returns:
+        dict: The summary, or None if the test made no requests
+    """
+    try:
+        requests = waterfall(performance_log(driver))
+        if not requests:
+            return None
+        summary = summarize(requests)
+        path = report_path(test_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.json", "w", encoding="utf-8") as output:
+            json.dump(
+                {"test": test_id, "summary": summary, "requests": requests}, output
+            )
+        with open(f"{path}.txt", "w", encoding="utf-8") as output:
+            output.write(format_report(test_id, requests, summary) + "\n")
+        return summary
+    except Exception as e:
+        logger.warning(f"Could not write the network report of {test_id}: {e}")
+        return None
+
+
+def asset_key(url):
+    """
+    Identifies an asset across runs, ignoring its query string.
+    """
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+
+
+def load_reports(directory):
+    """
+    Returns:
+        dict: Test id to (summary, asset key to largest transfer in bytes)
+    """
+    reports = {}
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        try:
+            with open(path, encoding="utf-8") as stored:
+                report = json.load(stored)
+        except (OSError, ValueError):
+            continue
+        assets = {}
+        for request in report["requests"]:
+            key = asset_key(request["url"])
+            assets[key] = max(assets.get(key, 0), request["bytes"])
+        reports[report["test"]] = (report["summary"], assets)
+    return reports
+
+
+def compare_reports(previous_dir, current_dir):
+    """
+    Compares two runs' network reports.
+    Returns:
+        list: Lines naming the tests whose transfer grew and the heavy
+        assets that are new or grew by half
+    """
+    previous = load_reports(previous_dir)
+    current = load_reports(current_dir)
+    grown, heavy = [], []
+    for test_id, (summary, assets) in sorted(current.items()):
+        if test_id not in previous:
+            continue
+        before, before_assets = previous[test_id]
+        delta = summary["bytes"] - before["bytes"]
+        if delta > GROWTH_BYTES and delta > before["bytes"] * GROWTH_RATIO:
+            grown.append(
+                f"  {test_id}: {_kib(before['bytes'])} -> {_kib(summary['bytes'])}, "
+                f"{before['requests']} -> {summary['requests']} requests"
+            )
+        for key, size in sorted(assets.items(), key=lambda item: -item[1]):
+            if size < HEAVY_ASSET_BYTES:
+                break
+            old = before_assets.get(key)
+            if old is None:
+                heavy.append(f"  new   {_kib(size):>10}  {_short(key)}  ({test_id})")
+            elif size > old * 1.5:
+                heavy.append(
+                    f"  grown {_kib(size):>10}  {_short(key)}  "
+                    f"(was {_kib(old)}; {test_id})"
+                )
+    lines = [
+        f"Network compared with {previous_dir}: "
+        f"{len(grown)} tests transfer more, {len(heavy)} heavy assets new or grown"
+    ]
+    lines.extend(grown)
+    lines.extend(heavy)
+    return lines
+
+
+def previous_reports(results_dir, run_dir, relative="network"):
+    """
+    Finds the network reports of the latest run before run_dir.
+    Returns:
+        str: The directory, or None if no earlier run has reports
+    """
+    current = os.path.basename(os.path.normpath(run_dir))
+    candidates = {}
+    for directory in glob.glob(os.path.join(results_dir, "*", relative)):
+        # The run directory is the part the "*" matched
+        run = os.path.relpath(directory, results_dir).split(os.sep)[0]
+        if run < current:
+            candidates[run] = directory
+    return candidates[max(candidates)] if candidates else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Show or compare per-test network reports."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    show = commands.add_parser("show", help="Print one test's waterfall")
+    show.add_argument("report", help="A <test id>.json network report")
+    compare = commands.add_parser("compare", help="Compare two runs' reports")
+    compare.add_argument("previous", help="Network directory of the earlier run")
+    compare.add_argument("current", help="Network directory of the later run")
+    args = parser.parse_args(argv)
+
+    if args.command == "show":
+        with open(args.report, encoding="utf-8") as stored:
+            report = json.load(stored)
+        print(format_report(report["test"], report["requests"], report["summary"]))
+        return 0
+    print("\n".join(compare_reports(args.previous, args.current)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
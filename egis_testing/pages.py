@@ -0,0 +1,463 @@
+"""
+Page objects for the EGIS applications.
+
+TDAT and TDMT share their page chrome (splash screen, collapsed menu, search
+dropdowns), so the helpers that drive it live here once instead of in each
+suite. Every page object keeps the element handles it has found for as long
+as the page state lasts: the cache is dropped whenever the driver navigates
+or switches windows or frames, and a handle that has gone stale anyway
+(the page replaced the element in place) is looked up again.
+"""
+
+import logging
+
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.command import Command
+
+from egis_testing import dom
+from egis_testing.maps import ArcGISMap
+from egis_testing.tracing import traced
+
+
+# Commands after which no previously found element handle can be used
+NAVIGATION_COMMANDS = frozenset(
+    (
+        Command.GET,
+        Command.GO_BACK,
+        Command.GO_FORWARD,
+        Command.REFRESH,
+        Command.NEW_WINDOW,
+        Command.SWITCH_TO_WINDOW,
+        Command.CLOSE,
+        Command.SWITCH_TO_FRAME,
+        Command.SWITCH_TO_PARENT_FRAME,
+    )
+)
+# Errors that mean a cached handle must be looked up (and waited for) again
+REFIND_ERRORS = (
+    StaleElementReferenceException,
+    ElementNotInteractableException,
+    ElementClickInterceptedException,
+)
+
+SPLASH_SCREEN = "#splash-screen-modal"
+SPLASH_CLOSE = (By.CSS_SELECTOR, "#splash-screen-modal .close")
+MENU_TOGGLE = (By.CSS_SELECTOR, "#tdat-collaspe-menu .dropdown-toggle")
+MENU = (By.CSS_SELECTOR, "#tdat-collaspe-menu .dropdown-menu")
+GRID_TITLE = (By.ID, "grid-title")
+
+# The county list is the results dropdown that is neither #tribe nor #state
+COUNTY_OPTIONS = "select:not(#tribe):not(#state) option"
+COUNTY_OPTION_SCOPE = "//select[not(@id='tribe') and not(@id='state')]"
+
+
+def menu_item(position):
+    """
+    Returns: The locator of the link in the given (1-based) menu entry.
+    """
+    return (By.CSS_SELECTOR, f".dropdown-menu li:nth-child({position}) a")
+
+
+def track_navigation(driver):
+    """
+    Counts the commands that change the page state in driver._egis_page_state,
+    so element caches can tell when their handles belong to an old document.
+    """
+    if getattr(driver, "_egis_page_state", None) is not None:
+        return driver
+    execute = driver.execute
+
+    def tracked_execute(driver_command, params=None):
+        if driver_command in NAVIGATION_COMMANDS:
+            driver._egis_page_state += 1
+        return execute(driver_command, params)
+
+    driver._egis_page_state = 0
+    driver.execute = tracked_execute
+    return driver
+
+
+class ElementCache:
+    """
+    Element handles found on the current page state, keyed by locator.
+    """
+
+    def __init__(self, driver):
+        self.driver = track_navigation(driver)
+        self._state = driver._egis_page_state
+        self._elements = {}
+
+    def get(self, locator):
+        """
+        Returns: The cached handle, or None if it was not found on this page.
+        """
+        if self._state != self.driver._egis_page_state:
+            self.clear()
+        return self._elements.get(locator)
+
+    def put(self, locator, element):
+        if self._state != self.driver._egis_page_state:
+            self.clear()
+        self._elements[locator] = element
+        return element
+
+    def discard(self, locator):
+        self._elements.pop(locator, None)
+
+    def clear(self):
+        """
+        Forgets every handle, e.g. after a click that loads a new page.
+        """
+        self._elements.clear()
+        self._state = self.driver._egis_page_state
+
+
+class BasePage:
+    """
+    An EGIS application page: URL, shared chrome and cached element lookups.
+    """
+
+    # Path of the application below the environment's host
+    path = "/"
+
+    def __init__(self, driver, wait, environment_url, logger=None):
+        """
+        Args:
+            driver (WebDriver): The test's session
+            wait (Waiter): The test's condition-based waiter
+            environment_url (str): Environment host prefix, e.g. "egis"
+            logger (logging.Logger): Logger for pass/fail messages
+        """
+        self.driver = driver
+        self.wait = wait
+        self.environment_url = environment_url
+        self.logger = logger or logging.getLogger(__name__)
+        self.cache = ElementCache(driver)
+
+    @property
+    def url(self):
+        return f"https://{self.environment_url}.hud.gov{self.path}"
+
+    # Element lookups
+    def find(self, locator, condition="clickable"):
+        """
+        Returns the element's cached handle, or waits for it and caches it.
+        Args:
+            locator (tuple): A (By, selector) pair
+            condition (str): "clickable" or "visible"
+        Returns:
+            WebElement: The element
+        """
+        element = self.cache.get(locator)
+        if element is None:
+            if condition == "visible":
+                element = self.wait.visible(locator)
+            else:
+                element = self.wait.clickable(locator)
+            self.cache.put(locator, element)
+        return element
+
+    def _use(self, locator, action, condition="clickable"):
+        """
+        Applies action to the element, looking it up again if the cached
+        handle has gone stale or is not interactable right now.
+        """
+        cached = self.cache.get(locator) is not None
+        try:
+            return action(self.find(locator, condition))
+        except REFIND_ERRORS:
+            if not cached:
+                raise
+            self.cache.discard(locator)
+        return action(self.find(locator, condition))
+
+    def click(self, locator):
+        """
+        Clicks the element once it is clickable.
+        """
+        self._use(locator, lambda element: element.click())
+
+    def type(self, locator, text):
+        """
+        Types text into the element once it is clickable.
+        """
+        self._use(locator, lambda element: element.send_keys(text))
+
+    def text(self, locator):
+        """
+        Returns: The visible text of the element once it is visible.
+        """
+        cached = self.cache.get(locator) is not None
+        text = self._use(locator, lambda element: element.text, "visible")
+        if not text and cached:
+            # A cached element may have been hidden since it was found
+            self.cache.discard(locator)
+            text = self.find(locator, "visible").text
+        return text
+
+    def read_elements(self, selectors, attributes=()):
+        """
+        Reads the text, visibility and attributes of several elements in a
+        single driver round trip.
+        Args:
+            selectors (dict): Name to CSS selector or (By, value) locator
+            attributes (iterable): Attribute names to read from each element
+        Returns:
+            DomSnapshot: Per-name results; missing elements map to None
+        """
+        return dom.read_elements(self.driver, selectors, attributes)
+
+    # Shared chrome
+    @traced
+    def visit(self):
+        """
+        Navigates to the application and waits for initial load.
+        """
+        self.driver.get(self.url)
+        self.wait.page_ready()
+
+    @traced
+    def close_splash_screen(self):
+        """
+        Closes the initial splash screen modal that appears on site load.
+        """
+        self.click(SPLASH_CLOSE)
+        self.wait.modal_closed(SPLASH_SCREEN)
+
+    @traced
+    def open_menu(self):
+        """
+        Opens the main navigation menu.
+        """
+        self.click(MENU_TOGGLE)
+        self.wait.visible(MENU)
+
+    @traced
+    def open_menu_item(self, position):
+        """
+        Opens the menu and clicks one of its entries.
+        Args:
+            position (int): 1-based position of the entry in the menu
+        """
+        self.open_menu()
+        self.click(menu_item(position))
+
+    @traced
+    def select_dropdown_option(self, dropdown_id, option_text):
+        """
+        Selects an option from a dropdown menu.
+        Args:
+            dropdown_id (str): The ID of the dropdown element
+            option_text (str): The text of the option to select
+        """
+        self.click((By.ID, dropdown_id))
+        # Options are replaced whenever the dropdown reloads; never cached
+        self.wait.dropdown_populated(dropdown_id, option_text).click()
+
+    # Windows
+    @traced
+    def switch_to_new_tab(self, known_handles):
+        """
+        Waits for a newly opened tab and switches WebDriver focus to it.
+        Args:
+            known_handles (list): Window handles open before the tab was opened
+        Returns: The window handle of the new tab.
+        """
+        new_window = self.wait.new_window_opened(known_handles)
+        self.driver.switch_to.window(new_window)
+        self.wait.window_navigated()
+        return new_window
+
+    @traced
+    def switch_back_to_main_tab(self):
+        """
+        Closes current tab and switches focus back to the main window.
+        """
+        self.driver.close()
+        self.driver.switch_to.window(self.driver.window_handles[0])
+
+    @traced
+    def verify_url_and_log(self, expected_url, test_name):
+        """
+        Verifies current URL matches expected URL and logs result.
+        Args:
+            expected_url (str): The URL that should be loaded
+            test_name (str): Name of the test for logging purposes
+        Returns:
+            bool: True if URLs match, False otherwise
+        """
+        current_url = self.driver.current_url
+        if current_url == expected_url:
+            self.logger.info(f"Test Passed: Successfully navigated to {test_name}")
+        else:
+            self.logger.error(
+                f"Test Failed: Expected URL {expected_url} but got {current_url}"
+            )
+        return current_url == expected_url
+
+
+class TDATPage(BasePage):
+    """
+    The Tribal Directory Assessment Tool.
+    """
+
+    path = "/TDAT/"
+
+    SEARCH_TRIBES = (By.ID, "btn-search-tribes")
+    COUNTY_SELECT = (By.ID, "county-select")
+    COUNTY_SELECT_ALL = (By.ID, "county-select-all")
+    ADVANCED_SEARCH = (By.CSS_SELECTOR, "#tdat-collaspe-menu .header-style")
+    ADDRESS_INPUT = (By.ID, "txt-search-input")
+    ADDRESS_SEARCH = (By.ID, "btn-search-location")
+
+    @property
+    def map(self):
+        """
+        The ArcGIS map on the landing page.
+        """
+        return ArcGISMap(self.driver, self.wait, "mapDiv")
+
+    @traced
+    def open_search(self):
+        """
+        Opens the tribe, state and county search from the landing page.
+        """
+        self.visit()
+        self.click(self.SEARCH_TRIBES)
+
+    def grid(self):
+        """
+        Waits for the results grid and reads its title.
+        Returns:
+            DomSnapshot: The grid "title"
+        """
+        self.wait.grid_rendered()
+        return self.read_elements({"title": GRID_TITLE})
+
+    @traced
+    def search_tribe(self, tribe):
+        """
+        Searches for one tribe and waits for its contact information grid.
+        Args:
+            tribe (str): The tribe as listed in the #tribe dropdown
+        Returns:
+            DomSnapshot: The grid "title"
+        """
+        self.open_search()
+        self.select_dropdown_option("tribe", tribe)
+        return self.grid()
+
+    @traced
+    def search_counties(self, state, counties):
+        """
+        Searches for the tribes with interests in one or more counties.
+        Args:
+            state (str): The state as listed in the #state dropdown
+            counties (list): County names as listed for that state
+        Returns:
+            DomSnapshot: The grid "title"
+        """
+        self.open_search()
+        self.select_dropdown_option("state", state)
+        for county in counties:
+            self.wait.option_present(county, scope=COUNTY_OPTION_SCOPE).click()
+        self.click(self.COUNTY_SELECT)
+        return self.grid()
+
+    @traced
+    def search_address(self, address):
+        """
+        Searches for the tribes with interests at an address.
+        Returns:
+            DomSnapshot: The grid "title"
+        """
+        self.visit()
+        self.close_splash_screen()
+        self.type(self.ADDRESS_INPUT, address)
+        self.click(self.ADDRESS_SEARCH)
+        return self.grid()
+
+    @traced
+    def harvest_options(self):
+        """
+        Reads every tribe, state and county offered by the search dropdowns.
+        Returns:
+            dict: "tribes" (list) and "counties" (state name to county list)
+        """
+        self.open_search()
+        self.wait.dropdown_populated("tribe")
+        self.wait.dropdown_populated("state")
+        tribes = dom.read_options(self.driver, "#tribe option")
+        states = dom.read_options(self.driver, "#state option")
+
+        def county_options_loaded(driver):
+            # The county list is replaced when the state changes
+            options = dom.read_options(driver, COUNTY_OPTIONS)
+            return options if options and options != previous else False
+
+        counties = {}
+        previous = dom.read_options(self.driver, COUNTY_OPTIONS)
+        for state in states:
+            self.select_dropdown_option("state", state)
+            try:
+                previous = self.wait.until(
+                    county_options_loaded, "county options loaded"
+                )
+            except TimeoutException:
+                self.logger.warning(f"No county options loaded for {state}")
+                counties[state] = []
+                continue
+            counties[state] = previous
+        return {"tribes": tribes, "counties": counties}
+
+
+class TDMTPage(BasePage):
+    """
+    The Tribal Directory Management Tool, behind a login form.
+    """
+
+    path = "/TDMT/"
+
+    USERNAME = (By.ID, "username")
+    PASSWORD = (By.ID, "password")
+    LOGIN = (By.CSS_SELECTOR, ".btn-primary")
+
+    def home_url(self):
+        """
+        Returns: The URL of the TDMT home page shown after login.
+        """
+        return f"https://{self.environment_url}.hud.gov/TDMT/tdmt/index.html"
+
+    def is_logged_in(self):
+        """
+        Checks whether the current page is the TDMT home page rather than
+        the login form.
+        Returns:
+            bool: True if logged in
+        """
+        self.wait.page_ready()
+        return self.driver.current_url == self.home_url() and not (
+            self.driver.execute_script("return !!document.getElementById('password')")
+        )
+
+    @traced
+    def login_with_form(self, username="test", password="test"):
+        """
+        Logs in through the login form.
+        """
+        self.visit()
+        self.close_splash_screen()
+        self.find(self.USERNAME, "visible").send_keys(username)
+        self.driver.find_element(*self.PASSWORD).send_keys(password)
+        login_url = self.driver.current_url
+        self.click(self.LOGIN)
+        self.wait.url_changes(login_url)
+        # The form submit loaded a new document without a navigation command
+        self.cache.clear()
+        self.wait.page_ready()
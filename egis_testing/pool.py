@@ -0,0 +1,333 @@
+"""
+Pool of warm WebDriver sessions shared by the EGIS test suites.
+
+Chrome cold start is a large fixed cost, so instead of every suite starting
+its own browser, tests lease a session from a per-process pool. When a
+session is returned the pool resets it (cookies, storage, extra windows,
+about:blank) so the next test starts from a clean state, and recycles it
+after a number of uses or when it no longer responds. Sessions start from a
+clone of the pre-warmed profile template (see ``egis_testing.templates``)
+when one is available.
+"""
+
+import atexit
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+
+from egis_testing.artifacts import drain_logs
+from egis_testing.drivers import (
+    DEFAULT_IMPLICIT_WAIT,
+    apply_blocking,
+    create_driver,
+    get_profile,
+)
+from egis_testing.downloads import clear_download_dir
+from egis_testing.environments import current_environment
+from egis_testing.templates import clone_template, ensure_template
+from egis_testing.tracing import get_tracer, instrument_driver
+
+
+DEFAULT_POOL_SIZE = int(os.environ.get("EGIS_POOL_SIZE", "1"))
+DEFAULT_MAX_USES = int(os.environ.get("EGIS_POOL_MAX_USES", "25"))
+
+CLEARED_STORAGE_TYPES = ",".join(
+    [
+        "local_storage",
+        "session_storage",
+        "indexeddb",
+        "websql",
+        "service_workers",
+        "cache_storage",
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PooledSession:
+    """
+    A driver together with its pool bookkeeping.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created = time.time()
+
+
+class SessionPool:
+    """
+    Keeps up to ``size`` warm WebDriver sessions and leases them to tests.
+    """
+
+    def __init__(
+        self,
+        factory=None,
+        size=DEFAULT_POOL_SIZE,
+        max_uses=DEFAULT_MAX_USES,
+        implicit_wait=DEFAULT_IMPLICIT_WAIT,
+        profile=None,
+        template=None,
+    ):
+        """
+        Args:
+            factory (callable): Returns a new driver; defaults to create_driver
+            size (int): Maximum number of live sessions
+            max_uses (int): Leases after which a session is recycled
+            implicit_wait (float): Implicit wait restored on every reset
+            profile (LaunchProfile): Launch profile; defaults to get_profile()
+            template (str): Profile template the sessions start from;
+                defaults to the current environment's template
+        """
+        self.profile = profile or get_profile()
+        self.template = template
+        self.factory = factory or self._create_driver
+        self.implicit_wait = implicit_wait
+        self.size = max(size, 1)
+        self.max_uses = max_uses
+        self._idle = []
+        self._leased = {}
+        self._starting = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self.stats = {"created": 0, "leases": 0, "recycled": 0, "discarded": 0}
+
+    @property
+    def live(self):
+        return len(self._idle) + len(self._leased) + self._starting
+
+    def prewarm(self, count=None):
+        """
+        Starts sessions ahead of the first lease.
+        Args:
+            count (int): Number of sessions to start (defaults to pool size)
+        """
+        sessions = []
+        with self._condition:
+            count = min(count or self.size, self.size - self.live)
+            self._starting += count
+        try:
+            for _ in range(count):
+                sessions.append(self._start())
+        finally:
+            with self._condition:
+                self._starting -= count
+                self._idle.extend(sessions)
+                self._condition.notify_all()
+
+    def acquire(self, timeout=None):
+        """
+        Leases a session, starting one if the pool has room.
+        Args:
+            timeout (float): Seconds to wait for a free session (None waits forever)
+        Returns:
+            WebDriver: The leased driver
+        """
+        span = get_tracer().begin("pool.acquire", "pool")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Session pool is closed")
+                if self._idle:
+                    session = self._idle.pop()
+                    break
+                if self.live < self.size:
+                    self._starting += 1
+                    session = None
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("No WebDriver session became available")
+                self._condition.wait(remaining)
+
+        if session is None:
+            try:
+                session = self._start()
+            finally:
+                with self._condition:
+                    self._starting -= 1
+
+        with self._condition:
+            session.uses += 1
+            self._leased[id(session.driver)] = session
+            self.stats["leases"] += 1
+        span.end(uses=session.uses)
+        return session.driver
+
+    def release(self, driver, discard=False):
+        """
+        Returns a leased session to the pool.
+        The session is reset for the next test, or quit if it is worn out,
+        has crashed or discard is set.
+        Args:
+            driver (WebDriver): The driver returned by acquire
+            discard (bool): Quit the session instead of reusing it
+        """
+        with self._condition:
+            session = self._leased.pop(id(driver), None)
+            if session is None:
+                return
+            # Count the session as live while it is reset outside the lock
+            self._starting += 1
+
+        span = get_tracer().begin("pool.release", "pool")
+        keep = False
+        if not discard and not self._closed:
+            if session.uses >= self.max_uses:
+                self.stats["recycled"] += 1
+            else:
+                try:
+                    self.reset(driver)
+                    keep = True
+                except Exception as e:
+                    logger.warning(f"Discarding unresponsive session: {e}")
+                    self.stats["discarded"] += 1
+        if not keep:
+            self._quit(driver)
+        span.end(kept=keep)
+
+        with self._condition:
+            self._starting -= 1
+            if keep:
+                self._idle.append(session)
+            self._condition.notify_all()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """
+        Context manager around acquire/release.
+        A session whose test raised a WebDriverException is discarded.
+        """
+        driver = self.acquire(timeout)
+        discard = False
+        try:
+            yield driver
+        except WebDriverException:
+            discard = True
+            raise
+        finally:
+            self.release(driver, discard=discard)
+
+    def reset(self, driver):
+        """
+        Returns a session to a clean state: extra windows closed, cookies and
+        storage, downloads and browser logs cleared, the profile's request
+        blocking restored and the main window on about:blank.
+        """
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        origin = driver.execute_script("return window.location.origin")
+        try:
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            if origin and origin != "null":
+                driver.execute_cdp_cmd(
+                    "Storage.clearDataForOrigin",
+                    {"origin": origin, "storageTypes": CLEARED_STORAGE_TYPES},
+                )
+        except (AttributeError, WebDriverException):
+            # Not a Chromium driver; fall back to what WebDriver can reach
+            driver.delete_all_cookies()
+            driver.execute_script(
+                "try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}"
+            )
+
+        apply_blocking(driver, self.profile)
+        drain_logs(driver)
+        if getattr(driver, "download_dir", None):
+            clear_download_dir(driver.download_dir)
+        driver.get("about:blank")
+        driver.implicitly_wait(self.implicit_wait)
+
+    def close(self):
+        """
+        Quits every session, including leased ones.
+        """
+        with self._condition:
+            self._closed = True
+            sessions = self._idle + list(self._leased.values())
+            self._idle = []
+            self._leased = {}
+            self._condition.notify_all()
+        for session in sessions:
+            self._quit(session.driver)
+
+    def _create_driver(self):
+        if self.template is None:
+            self.template = ensure_template(current_environment()) or ""
+        user_data_dir = clone_template(self.template) if self.template else None
+        try:
+            return create_driver(self.implicit_wait, self.profile, user_data_dir)
+        except Exception:
+            if user_data_dir:
+                shutil.rmtree(user_data_dir, ignore_errors=True)
+            raise
+
+    def _start(self):
+        with get_tracer().span("pool.start_session", "pool"):
+            session = PooledSession(instrument_driver(self.factory()))
+        self.stats["created"] += 1
+        return session
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Failed to quit WebDriver session: {e}")
+        for directory in ("download_dir", "user_data_dir"):
+            if getattr(driver, directory, None):
+                shutil.rmtree(getattr(driver, directory), ignore_errors=True)
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Returns the process-wide session pool, creating it on first use.
+    The pool's sessions are quit when the process exits.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = SessionPool()
+            atexit.register(_default_pool.close)
+        return _default_pool
+
+
+def close_pool():
+    """
+    Quits the sessions of the process-wide pool if it was created.
+    Worker processes call this explicitly because multiprocessing children
+    exit without running atexit handlers.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        pool, _default_pool = _default_pool, None
+    if pool is not None:
+        pool.close()
+
+
+def set_up_test(test):
+    """
+    Runs the setUp() of a suite test case driven by hand (matrix, load and
+    benchmark runs). tearDown() only follows a setUp() that returned, so if
+    setUp() raises after leasing a session, the session is given back here.
+    """
+    try:
+        test.setUp()
+    except Exception:
+        if getattr(test, "driver", None) is not None:
+            test.pool.release(test.driver)
+        raise
@@ -0,0 +1,130 @@
+"""
+Benchmarks page-load time and bytes transferred per launch profile.
+
+Usage:
+    python -m egis_testing.profile_benchmark --runs 5
+    python -m egis_testing.profile_benchmark --url https://egis.hud.gov/TDMT/ default fast
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from egis_testing.drivers import PROFILES, create_driver
+
+
+DEFAULT_URL = "https://egis.hud.gov/TDAT/"
+
+# Resource timing keeps 250 entries by default, far fewer than the ArcGIS app loads
+ENLARGE_TIMING_BUFFER = "performance.setResourceTimingBufferSize(100000);"
+
+COLLECT_METRICS = """
+const nav = performance.getEntriesByType('navigation')[0] || {};
+const resources = performance.getEntriesByType('resource');
+let bytes = nav.transferSize || 0;
+for (const entry of resources) { bytes += entry.transferSize || 0; }
+return {
+    load: (nav.loadEventEnd || 0) - (nav.startTime || 0),
+    domContentLoaded: (nav.domContentLoadedEventEnd || 0) - (nav.startTime || 0),
+    requests: resources.length + 1,
+    bytes: bytes,
+};
+"""
+
+
+def wait_for_network_quiet(driver, quiet=1.0, timeout=20):
+    """
+    Waits until no new resource timing entries appear for `quiet` seconds,
+    so late requests such as map tiles are counted.
+    """
+    deadline = time.monotonic() + timeout
+    last_count = -1
+    last_change = time.monotonic()
+    while time.monotonic() < deadline:
+        count = driver.execute_script(
+            "return performance.getEntriesByType('resource').length"
+        )
+        now = time.monotonic()
+        if count != last_count:
+            last_count, last_change = count, now
+        elif now - last_change >= quiet:
+            return
+        time.sleep(0.1)
+
+
+def measure(driver, url):
+    """
+    Loads url with an empty HTTP cache and returns its load metrics.
+    """
+    driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+    driver.get("about:blank")
+    driver.get(url)
+    wait_for_network_quiet(driver)
+    return driver.execute_script(COLLECT_METRICS)
+
+
+def benchmark_profile(profile, url, runs):
+    """
+    Measures `runs` cold-cache page loads of url with one profile.
+    Returns:
+        list: Metrics dict per run
+    """
+    driver = create_driver(profile=profile)
+    try:
+        driver.execute_cdp_cmd(
+            "Page.addScriptToEvaluateOnNewDocument", {"source": ENLARGE_TIMING_BUFFER}
+        )
+        return [measure(driver, url) for _ in range(runs)]
+    finally:
+        driver.quit()
+
+
+def format_row(name, samples):
+    load = [sample["load"] for sample in samples]
+    size = [sample["bytes"] for sample in samples]
+    requests = [sample["requests"] for sample in samples]
+    return (
+        f"{name:10} load p50 {statistics.median(load):8.0f} ms "
+        f"(min {min(load):.0f}, max {max(load):.0f})  "
+        f"transfer p50 {statistics.median(size) / 1024:9.0f} KiB  "
+        f"requests p50 {statistics.median(requests):5.0f}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "profiles",
+        nargs="*",
+        default=["default", "fast"],
+        choices=sorted(PROFILES),
+        help="Launch profiles to compare",
+    )
+    parser.add_argument("--url", default=DEFAULT_URL, help="Page to load")
+    parser.add_argument("--runs", type=int, default=3, help="Loads per profile")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.profiles:
+        results[name] = benchmark_profile(PROFILES[name], args.url, args.runs)
+        print(format_row(name, results[name]))
+
+    if len(results) > 1:
+        baseline_name = args.profiles[0]
+        baseline = results[baseline_name]
+        base_load = statistics.median(sample["load"] for sample in baseline)
+        base_bytes = statistics.median(sample["bytes"] for sample in baseline)
+        for name in args.profiles[1:]:
+            load = statistics.median(sample["load"] for sample in results[name])
+            size = statistics.median(sample["bytes"] for sample in results[name])
+            print(
+                f"{name} vs {baseline_name}: "
+                f"load {100 * (load - base_load) / (base_load or 1):+.0f}%, "
+                f"transfer {100 * (size - base_bytes) / (base_bytes or 1):+.0f}%"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,424 @@
+"""
+API-level regression checks built from the backend queries of the UI tests.
+
+Every TDAT search ends in ArcGIS REST or geocoder requests whose JSON the
+page then renders. While the suites run with ``$EGIS_CAPTURE_DIR`` set (the
+runner's ``--capture-queries``), each passing test's queries are read from
+Chrome's performance log together with their responses and appended to a
+capture file. ``build`` turns the captures into cases: one per distinct
+request, with the response structure (top-level keys, attribute fields,
+geometry type) and record count it returned. ``run`` sends the cases
+straight to the services with a pooled HTTP client and checks each response
+against them, which takes milliseconds per case instead of seconds.
+
+Usage:
+    python -m egis_testing.runner --capture-queries apps/TDAT
+    python -m egis_testing.queries build test-results/<run>/queries
+    python -m egis_testing.queries run --workers 32
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import urllib3
+
+from egis_testing.artifacts import network_events, performance_log
+from egis_testing.environments import current_environment
+from egis_testing.links import DEFAULT_TIMEOUT, USER_AGENT, http_client
+from egis_testing.replay import request_key
+from egis_testing.results import ResultsStore
+
+
+CAPTURE_DIR_ENV = "EGIS_CAPTURE_DIR"
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CASES = os.path.join(REPO_ROOT, "test-results", "api", "cases.jsonl")
+
+# Service operations whose responses the pages render
+SERVICE_QUERY = re.compile(
+    r"/rest/services/.+/(?:MapServer|FeatureServer|GeocodeServer)"
+    r"(?:/\d+)?/(?:query|find|identify|findAddressCandidates|suggest|"
+    r"geocodeAddresses|reverseGeocode)\b",
+    re.I,
+)
+# Parameters that only shape the transport, not the result
+TRANSPORT_PARAMS = {"callback", "_", "dojo.preventCache"}
+JSONP = re.compile(r"^\s*[\w.$\[\]\"']+\((.*)\)\s*;?\s*$", re.S)
+# Response members holding the records, in order of precedence
+RECORD_MEMBERS = ("features", "candidates", "results", "suggestions", "locations")
+
+logger = logging.getLogger(__name__)
+_capture_lock = threading.Lock()
+
+
+def clean_url(url):
+    """
+    Drops JSONP and cache-busting parameters and asks for plain JSON.
+    """
+    parts = urlsplit(url)
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in TRANSPORT_PARAMS
+    ]
+    query = [(key, "json" if key == "f" else value) for key, value in query]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+def parse_json(body):
+    """
+    Parses a JSON or JSONP response body.
+    Returns:
+        The decoded payload, or None if the body is not JSON
+    """
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    try:
+        return json.loads(body)
+    except ValueError:
+        match = JSONP.match(body)
+        if match:
+            try:
+                return json.loads(match.group(1))
+            except ValueError:
+                pass
+    return None
+
+
+def describe(payload):
+    """
+    Summarizes a service response into the expectations of a case.
+    Returns:
+        dict: "keys", and where the response has them "records", "fields"
+        and "geometry_type"; None for an error response
+    """
+    if not isinstance(payload, dict) or "error" in payload:
+        return None
+    expected = {"keys": sorted(payload)}
+    for member in RECORD_MEMBERS:
+        records = payload.get(member)
+        if isinstance(records, list):
+            expected["records"] = len(records)
+            first = records[0] if records else {}
+            attributes = first.get("attributes") if isinstance(first, dict) else None
+            if isinstance(attributes, dict):
+                expected["fields"] = sorted(attributes)
+            break
+    else:
+        if isinstance(payload.get("count"), int):
+            expected["records"] = payload["count"]
+    if payload.get("geometryType"):
+        expected["geometry_type"] = payload["geometryType"]
+    return expected
+
+
+def captured_queries(driver, performance_log):
+    """
+    Picks the finished service queries out of a performance log and reads
+    their response bodies from the page.
+    Returns:
+        list: Dicts with "method", "url", "body", "status" and "response"
+    """
+    requests = {}
+    for method, params, _ in network_events(performance_log):
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            request = params["request"]
+            if SERVICE_QUERY.search(request.get("url", "")):
+                requests[request_id] = {
+                    "method": request.get("method", "GET"),
+                    "url": request["url"],
+                    "body": request.get("postData"),
+                    "content_type": (request.get("headers") or {}).get(
+                        "Content-Type"
+                    ),
+                    "status": None,
+                    "finished": False,
+                }
+        elif request_id in requests:
+            if method == "Network.responseReceived":
+                requests[request_id]["status"] = params["response"].get("status")
+            elif method == "Network.loadingFinished":
+                requests[request_id]["finished"] = True
+
+    queries = []
+    for request_id, query in requests.items():
+        if not query.pop("finished") or query["status"] != 200:
+            continue
+        try:
+            response = driver.execute_cdp_cmd(
+                "Network.getResponseBody", {"requestId": request_id}
+            )
+        except Exception:
+            # Evicted from the page's buffer; the query is captured next time
+            continue
+        query["response"] = response.get("body", "")
+        queries.append(query)
+    return queries
+
+
+def record_queries(driver, test_id):
+    """
+    Appends the service queries of a passing test to this process's capture
+    file. Does nothing unless $EGIS_CAPTURE_DIR is set; meant to be called
+    from tearDown, before the session goes back to the pool.
+    Returns:
+        int: Number of queries captured
+    """
+    capture_dir = os.environ.get(CAPTURE_DIR_ENV)
+    if not capture_dir:
+        return 0
+    try:
+        queries = captured_queries(driver, performance_log(driver))
+    except Exception as e:
+        logger.warning(f"Could not capture the queries of {test_id}: {e}")
+        return 0
+    if not queries:
+        return 0
+    os.makedirs(capture_dir, exist_ok=True)
+    environment = current_environment()
+    path = os.path.join(capture_dir, f"queries-{os.getpid()}.jsonl")
+    with _capture_lock, open(path, "a", encoding="utf-8") as capture:
+        for query in queries:
+            query.update(test=test_id, environment=environment)
+            capture.write(json.dumps(query) + "\n")
+    return len(queries)
+
+
+def load_cases(path):
+    """
+    Returns:
+        dict: Case id to case
+    """
+    cases = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as stored:
+            for line in stored:
+                if line.strip():
+                    case = json.loads(line)
+                    cases[case["id"]] = case
+    return cases
+
+
+def build_cases(capture_dir, cases_file=DEFAULT_CASES):
+    """
+    Turns captured queries into cases, merged into the cases file. A request
+    captured again replaces the earlier case with the same id.
+    Returns:
+        tuple: (number of cases added or updated, total number of cases)
+    """
+    cases = load_cases(cases_file)
+    updated = 0
+    for path in sorted(glob.glob(os.path.join(capture_dir, "queries-*.jsonl"))):
+        with open(path, encoding="utf-8") as capture:
+            for line in capture:
+                query = json.loads(line)
+                expected = describe(parse_json(query.pop("response")))
+                if expected is None:
+                    continue
+                url = clean_url(query["url"])
+                body = query["body"] or ""
+                key = request_key(query["method"], url, body.encode("utf-8"))
+                test_name = query["test"].rsplit(".", 1)[-1]
+                operation = urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+                digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:10]
+                case_id = f"{test_name}:{operation}:{digest}"
+                cases[case_id] = {
+                    "id": case_id,
+                    "test": query["test"],
+                    "environment": query["environment"],
+                    "method": query["method"],
+                    "url": url,
+                    "body": query["body"],
+                    "content_type": query["content_type"],
+                    "expected": expected,
+                    "captured": datetime.now().isoformat(timespec="seconds"),
+                }
+                updated += 1
+    os.makedirs(os.path.dirname(os.path.abspath(cases_file)), exist_ok=True)
+    with open(cases_file, "w", encoding="utf-8") as stored:
+        for case in sorted(cases.values(), key=lambda case: case["id"]):
+            stored.write(json.dumps(case, sort_keys=True) + "\n")
+    return updated, len(cases)
+
+
+def retarget(url, source, environment):
+    """
+    Points a URL captured on the source environment's host at another one.
+    """
+    parts = urlsplit(url)
+    if environment and parts.netloc.lower() == f"{source}.hud.gov":
+        parts = parts._replace(netloc=f"{environment}.hud.gov")
+    return urlunsplit(parts)
+
+
+def check(payload, expected, tolerance=0.0):
+    """
+    Compares a response with a case's expectations.
+    Returns:
+        list: Descriptions of the differences; empty if it matches
+    """
+    if payload is None:
+        return ["response is not JSON"]
+    if not isinstance(payload, dict):
+        return [f"response is a {type(payload).__name__}, not an object"]
+    if "error" in payload:
+        return [f"service error: {json.dumps(payload['error'])[:200]}"]
+    problems = []
+    actual = describe(payload)
+    missing = sorted(set(expected["keys"]) - set(actual["keys"]))
+    if missing:
+        problems.append(f"missing members {missing}")
+    if "fields" in expected and actual.get("records"):
+        missing = sorted(set(expected["fields"]) - set(actual.get("fields", [])))
+        if missing:
+            problems.append(f"missing fields {missing}")
+    if expected.get("geometry_type") not in (None, actual.get("geometry_type")):
+        problems.append(
+            f"geometry type {actual.get('geometry_type')}, "
+            f"expected {expected['geometry_type']}"
+        )
+    if "records" in expected:
+        records = actual.get("records")
+        allowed = expected["records"] * tolerance
+        if records is None or abs(records - expected["records"]) > allowed:
+            problems.append(f"{records} records, expected {expected['records']}")
+    return problems
+
+
+def run_case(http, case, environment=None, tolerance=0.0):
+    """
+    Sends one case's request and checks the response.
+    Returns:
+        dict: A result record in the runner's format
+    """
+    url = retarget(case["url"], case["environment"], environment)
+    headers = {"User-Agent": USER_AGENT}
+    if case.get("content_type"):
+        headers["Content-Type"] = case["content_type"]
+    start = time.perf_counter()
+    outcome, details, failure_class = "success", "", None
+    try:
+        response = http.request(
+            case["method"],
+            url,
+            body=case["body"].encode("utf-8") if case.get("body") else None,
+            headers=headers,
+            timeout=DEFAULT_TIMEOUT,
+            retries=urllib3.Retry(connect=1, read=0, redirect=3),
+        )
+        if response.status != 200:
+            problems = [f"HTTP {response.status}"]
+        else:
+            problems = check(parse_json(response.data), case["expected"], tolerance)
+        if problems:
+            outcome, failure_class = "failure", "AssertionError"
+            details = f"{case['method']} {url}\n" + "\n".join(problems)
+    except urllib3.exceptions.HTTPError as e:
+        outcome, failure_class = "error", type(e).__name__
+        details = f"{case['method']} {url}\n{e}"
+    return {
+        "id": case["id"],
+        "app": "api",
+        "environment": environment or case["environment"],
+        "outcome": outcome,
+        "duration": round(time.perf_counter() - start, 3),
+        "worker": None,
+        "details": details,
+        "failure_class": failure_class,
+    }
+
+
+def run(cases, workers, environment=None, tolerance=0.0, results_dir=None):
+    """
+    Runs the cases concurrently on one pooled HTTP client and writes the
+    report and the results history.
+    Returns:
+        tuple: (records, summary, run_dir)
+    """
+    # The runner imports this module to build cases after a capture run
+    from egis_testing.runner import DEFAULT_RESULTS_DIR, write_report
+
+    results_dir = results_dir or DEFAULT_RESULTS_DIR
+    run_dir = os.path.join(
+        results_dir, "api", datetime.now().strftime("%Y%m%d-%H%M%S")
+    )
+    os.makedirs(run_dir, exist_ok=True)
+    http = http_client(workers)
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            records = list(
+                pool.map(
+                    lambda case: run_case(http, case, environment, tolerance), cases
+                )
+            )
+    finally:
+        http.clear()
+    wall = time.perf_counter() - start
+    rate = 60 * len(records) / wall if wall else 0.0
+    summary = write_report(
+        records,
+        wall,
+        os.path.join(run_dir, "report.txt"),
+        [f"{len(records)} API cases with {workers} connections: {rate:.0f} per minute"],
+    )
+    ResultsStore(os.path.join(results_dir, "results.sqlite")).add_run(
+        records, wall=wall, workers=workers, run_dir=run_dir, kind="api"
+    )
+    return records, summary, run_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build and run API-level checks from captured UI queries."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Turn captured queries into cases")
+    build.add_argument("capture_dir", help="Directory of queries-*.jsonl captures")
+    build.add_argument("--cases", default=DEFAULT_CASES, help="Cases file")
+    checks = commands.add_parser("run", help="Run the cases")
+    checks.add_argument("--cases", default=DEFAULT_CASES, help="Cases file")
+    checks.add_argument("-w", "--workers", type=int, default=16, help="Connections")
+    checks.add_argument("-k", "--keyword", help="Only run cases whose id matches")
+    checks.add_argument(
+        "--environment", help="Run against this environment instead of the captured"
+    )
+    checks.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.0,
+        help="Allowed relative change of record counts (default 0: exact)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        updated, total = build_cases(args.capture_dir, args.cases)
+        print(f"{updated} cases added or updated, {total} in {args.cases}")
+        return 0
+
+    cases = [
+        case
+        for case in load_cases(args.cases).values()
+        if not args.keyword or args.keyword.lower() in case["id"].lower()
+    ]
+    if not cases:
+        print(f"No cases in {args.cases}")
+        return 1
+    _, summary, run_dir = run(cases, args.workers, args.environment, args.tolerance)
+    print(f"Results written to {run_dir}")
+    return 0 if summary["failure"] == 0 and summary["error"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,503 @@
+"""
+Record-and-replay HTTP(S) proxy for running the EGIS suites offline.
+
+In record mode the proxy forwards every request the browser makes (HTML, JS,
+ArcGIS REST queries, the geocoder, PDFs, downloads) to the real servers and
+stores the responses in an on-disk archive. In replay mode it serves the same
+responses from the archive without touching the network.
+
+HTTPS is intercepted with a throwaway self-signed certificate, which Chrome
+accepts because the driver factory launches it with
+``--ignore-certificate-errors`` when ``EGIS_PROXY`` is set.
+
+Archive layout::
+
+    ARCHIVE/
+        index.jsonl        one entry per recorded exchange
+        blobs/ab/abcd...   gzip-compressed response (and request) bodies,
+                           content addressed
+
+Entries are looked up by method, normalized URL and a hash of the request
+body. Requests that repeat with different responses are replayed in the
+order they were recorded.
+
+Usage:
+    python -m egis_testing.replay record recordings/tdat
+    python -m egis_testing.replay replay recordings/tdat --latency recorded
+    EGIS_PROXY=127.0.0.1:8899 python -m unittest apps/TDAT/tdat_test.py
+
+The parallel runner takes ``--record`` and ``--replay`` and sets up the proxy
+itself.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import socketserver
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import urllib3
+
+
+DEFAULT_PORT = 8899
+
+# Query parameters that change on every page load (cache busters, timestamps)
+VOLATILE_PARAMS = {"_", "_ts", "dojo.preventCache", "timestamp", "nocache"}
+
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "proxy-connection",
+    "te",
+    "trailers",
+    "transfer-encoding",
+    "upgrade",
+}
+
+# Bodies are stored decoded, so these no longer describe what is sent back
+STRIPPED_RESPONSE_HEADERS = HOP_BY_HOP_HEADERS | {"content-encoding", "content-length"}
+# Only offer upstream the encodings urllib3 can always decode; Chrome also
+# offers br and zstd, which it cannot without optional packages
+UPSTREAM_ACCEPT_ENCODING = "gzip, deflate"
+
+LATENCY_CHOICES = ("zero", "recorded")
+
+logger = logging.getLogger(__name__)
+
+
+def body_decoded(response):
+    """
+    Returns True if urllib3 decoded the body of response, i.e. every
+    encoding in its Content-Encoding has a decoder.
+    """
+    encodings = [
+        encoding.strip().lower()
+        for encoding in response.headers.get("Content-Encoding", "").split(",")
+        if encoding.strip().lower() not in ("", "identity")
+    ]
+    return all(encoding in response.CONTENT_DECODERS for encoding in encodings)
+
+
+def normalize_url(url):
+    """
+    Drops volatile query parameters and sorts the rest.
+    """
+    parts = urlsplit(url)
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in VOLATILE_PARAMS
+    )
+    return urlunsplit(
+        (parts.scheme, parts.netloc.lower(), parts.path, urlencode(query), "")
+    )
+
+
+def request_key(method, url, body=b""):
+    """
+    Builds the archive lookup key of a request.
+    """
+    body_hash = hashlib.sha256(body).hexdigest()[:16] if body else "-"
+    return f"{method.upper()} {normalize_url(url)} {body_hash}"
+
+
+class Archive:
+    """
+    On-disk store of recorded HTTP exchanges.
+    """
+
+    def __init__(self, path, mode="r"):
+        """
+        Args:
+            path (str): Archive directory
+            mode (str): "r" to replay an existing archive, "w" to record a new
+                        one (existing entries are discarded; blobs are reused)
+        """
+        self.path = path
+        self.mode = mode
+        self.index_file = os.path.join(path, "index.jsonl")
+        self.blob_dir = os.path.join(path, "blobs")
+        self.entries = defaultdict(list)
+        self._lock = threading.Lock()
+        self._served = defaultdict(int)
+
+        if mode == "w":
+            os.makedirs(self.blob_dir, exist_ok=True)
+            open(self.index_file, "w").close()
+        else:
+            if not os.path.exists(self.index_file):
+                raise FileNotFoundError(f"No recording found at {path}")
+            with open(self.index_file, encoding="utf-8") as index:
+                for line in index:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["key"]].append(entry)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.entries.values())
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def _store(self, body):
+        # Called with the lock held
+        digest = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            temp_path = f"{blob_path}.{threading.get_ident()}.tmp"
+            with gzip.open(temp_path, "wb", compresslevel=6) as blob:
+                blob.write(body)
+            os.replace(temp_path, blob_path)
+        return digest
+
+    def add(
+        self,
+        method,
+        url,
+        request_body,
+        status,
+        headers,
+        body,
+        elapsed,
+        request_type=None,
+    ):
+        """
+        Stores one exchange.
+        Args:
+            method (str): HTTP method
+            url (str): Absolute request URL
+            request_body (bytes): Request body, kept so the request can be
+                sent again (see egis_testing.load)
+            status (int): Response status code
+            headers (list): Response headers as [name, value] pairs
+            body (bytes): Decoded response body
+            elapsed (float): Seconds from request to complete response
+            request_type (str): Content type of the request body
+        """
+        entry = {
+            "key": request_key(method, url, request_body),
+            "method": method,
+            "url": url,
+            "status": status,
+            "headers": headers,
+            "size": len(body),
+            "elapsed": round(elapsed, 4),
+            "recorded": time.time(),
+        }
+        with self._lock:
+            entry["blob"] = self._store(body)
+            if request_body:
+                entry["request_blob"] = self._store(request_body)
+                entry["request_type"] = request_type
+            with open(self.index_file, "a", encoding="utf-8") as index:
+                index.write(json.dumps(entry) + "\n")
+            self.entries[entry["key"]].append(entry)
+        return entry
+
+    def lookup(self, method, url, request_body=b""):
+        """
+        Finds the recorded response for a request.
+        Repeated requests get the recorded responses in order; once those run
+        out the last one is served again.
+        Returns:
+            dict: The archive entry, or None if the request was not recorded
+        """
+        key = request_key(method, url, request_body)
+        with self._lock:
+            entries = self.entries.get(key)
+            if not entries:
+                return None
+            position = self._served[key]
+            self._served[key] += 1
+        return entries[min(position, len(entries) - 1)]
+
+    def read_body(self, entry):
+        with gzip.open(self._blob_path(entry["blob"]), "rb") as blob:
+            return blob.read()
+
+    def read_request_body(self, entry):
+        """
+        Returns:
+            bytes: The recorded request body (empty for archives recorded
+            before request bodies were kept)
+        """
+        if not entry.get("request_blob"):
+            return b""
+        with gzip.open(self._blob_path(entry["request_blob"]), "rb") as blob:
+            return blob.read()
+
+
+def create_certificate(directory):
+    """
+    Generates a self-signed certificate for intercepting HTTPS.
+    Returns:
+        tuple: (certificate path, key path)
+    """
+    cert_file = os.path.join(directory, "proxy-cert.pem")
+    key_file = os.path.join(directory, "proxy-key.pem")
+    if shutil.which("openssl") is None:
+        raise RuntimeError("openssl is required to intercept HTTPS traffic")
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "3650",
+            "-subj",
+            "/CN=egis-replay-proxy",
+            "-keyout",
+            key_file,
+            "-out",
+            cert_file,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert_file, key_file
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    """
+    Forward proxy handler that records or replays every request.
+    """
+
+    protocol_version = "HTTP/1.1"
+    tunnel_host = None
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_CONNECT(self):
+        host, _, port = self.path.partition(":")
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        tls = self.server.tls_context.wrap_socket(self.connection, server_side=True)
+        self.connection = tls
+        self.rfile = tls.makefile("rb", self.rbufsize)
+        self.wfile = socketserver._SocketWriter(tls)
+        self.tunnel_host = host if port in ("", "443") else f"{host}:{port}"
+        self.close_connection = False
+
+    def _url(self):
+        if self.path.startswith(("http://", "https://")):
+            return self.path
+        return f"https://{self.tunnel_host or self.headers['Host']}{self.path}"
+
+    def _request_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _handle(self):
+        url = self._url()
+        body = self._request_body()
+        if self.server.mode == "record":
+            self._record(url, body)
+        else:
+            self._replay(url, body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = do_OPTIONS = do_PATCH = _handle
+
+    def _record(self, url, request_body):
+        headers = {
+            name: value
+            for name, value in self.headers.items()
+            if name.lower() not in HOP_BY_HOP_HEADERS
+            and name.lower() not in ("host", "accept-encoding")
+        }
+        headers["Accept-Encoding"] = UPSTREAM_ACCEPT_ENCODING
+        start = time.perf_counter()
+        try:
+            response = self.server.upstream.request(
+                self.command,
+                url,
+                body=request_body or None,
+                headers=headers,
+                redirect=False,
+                retries=False,
+                preload_content=True,
+                decode_content=True,
+            )
+        except urllib3.exceptions.HTTPError as e:
+            logger.warning(f"Upstream request failed for {url}: {e}")
+            self._send(502, [], str(e).encode())
+            return
+        elapsed = time.perf_counter() - start
+        stripped = STRIPPED_RESPONSE_HEADERS
+        if not body_decoded(response):
+            # Kept so the stored body is still served with its encoding
+            stripped = stripped - {"content-encoding"}
+        response_headers = [
+            [name, value]
+            for name, value in response.headers.items()
+            if name.lower() not in stripped
+        ]
+        self.server.archive.add(
+            self.command,
+            url,
+            request_body,
+            response.status,
+            response_headers,
+            response.data,
+            elapsed,
+            self.headers.get("Content-Type"),
+        )
+        self._send(response.status, response_headers, response.data)
+
+    def _replay(self, url, request_body):
+        entry = self.server.archive.lookup(self.command, url, request_body)
+        if entry is None:
+            self.server.record_miss(self.command, url)
+            self._send(404, [["Content-Type", "text/plain"]], b"Not recorded")
+            return
+        delay = self.server.delay(entry)
+        if delay:
+            time.sleep(delay)
+        self._send(entry["status"], entry["headers"], self.server.archive.read_body(entry))
+
+    def _send(self, status, headers, body):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+
+class ReplayProxy(ThreadingHTTPServer):
+    """
+    Threaded record/replay proxy server.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, archive_path, mode="replay", port=0, latency="zero"):
+        """
+        Args:
+            archive_path (str): Archive directory
+            mode (str): "record" or "replay"
+            port (int): Port to listen on (0 picks a free port)
+            latency (str|float): "zero", "recorded" or a fixed delay in seconds
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown proxy mode {mode!r}")
+        super().__init__(("127.0.0.1", port), ProxyHandler)
+        self.mode = mode
+        self.latency = latency
+        self.archive = Archive(archive_path, "w" if mode == "record" else "r")
+        self.upstream = urllib3.PoolManager(maxsize=16) if mode == "record" else None
+        self.misses = []
+        self._misses_lock = threading.Lock()
+        self._cert_dir = tempfile.mkdtemp(prefix="egis-proxy-")
+        cert_file, key_file = create_certificate(self._cert_dir)
+        self.tls_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.tls_context.load_cert_chain(cert_file, key_file)
+        self.tls_context.set_alpn_protocols(["http/1.1"])
+        self._thread = None
+
+    @property
+    def address(self):
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    def delay(self, entry):
+        """
+        Returns the number of seconds to hold a replayed response.
+        """
+        if self.latency == "zero":
+            return 0.0
+        if self.latency == "recorded":
+            return entry.get("elapsed", 0.0)
+        return float(self.latency)
+
+    def record_miss(self, method, url):
+        with self._misses_lock:
+            self.misses.append(f"{method} {url}")
+        logger.warning(f"Replay miss: {method} {url}")
+
+    def start(self):
+        """
+        Serves requests on a background thread.
+        """
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="egis-replay-proxy", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops serving and writes the list of replay misses next to the archive.
+        """
+        self.shutdown()
+        self.server_close()
+        shutil.rmtree(self._cert_dir, ignore_errors=True)
+        if self.misses:
+            with open(
+                os.path.join(self.archive.path, "misses.txt"), "w", encoding="utf-8"
+            ) as misses:
+                misses.write("\n".join(self.misses) + "\n")
+
+
+def parse_latency(value):
+    if value in LATENCY_CHOICES:
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"latency must be one of {LATENCY_CHOICES} or seconds"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Record or replay the HTTP traffic of an EGIS test run."
+    )
+    parser.add_argument("mode", choices=("record", "replay"))
+    parser.add_argument("archive", help="Archive directory")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--latency",
+        type=parse_latency,
+        default="zero",
+        help="Replay delay: zero, recorded or a number of seconds",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    proxy = ReplayProxy(args.archive, args.mode, args.port, args.latency).start()
+    print(f"{args.mode.capitalize()}ing through proxy at {proxy.address}")
+    print(f"export EGIS_PROXY={proxy.address}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.stop()
+        print(f"{len(proxy.archive)} exchanges in {args.archive}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
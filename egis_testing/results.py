@@ -0,0 +1,336 @@
+"""
+Structured, append-only store of test results across runs.
+
+Every parallel run (and every matrix run) appends one row per test to a
+SQLite database: test id, app, environment, outcome, duration, per-step
+timings and the failure's exception class. The CLI summarises the history:
+pass rate per run, p50/p95 duration per test over the last N runs, and the
+tests whose duration is growing fastest.
+
+Usage:
+    python -m egis_testing.results
+    python -m egis_testing.results --runs 50 --app TDAT
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+
+from egis_testing.benchmark import percentile
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_STORE = os.path.join(REPO_ROOT, "test-results", "results.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    wall REAL,
+    workers INTEGER,
+    run_dir TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    test_id TEXT NOT NULL,
+    app TEXT,
+    environment TEXT,
+    outcome TEXT NOT NULL,
+    duration REAL,
+    failure_class TEXT,
+    steps TEXT,
+    worker INTEGER,
+    inputs TEXT
+);
+CREATE INDEX IF NOT EXISTS results_test ON results (test_id, run_id);
+"""
+
+
+def slope(points):
+    """
+    Least-squares slope of (x, y) points.
+    """
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    if not spread:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+
+class ResultsStore:
+    """
+    SQLite database of result records, one row per test per run.
+    """
+
+    def __init__(self, path=DEFAULT_STORE):
+        self.path = path
+
+    @contextmanager
+    def connect(self):
+        """
+        Opens the database, creating it if needed, and commits on success.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            connection.executescript(SCHEMA)
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def add_run(self, records, wall=None, workers=None, run_dir=None, kind="suite"):
+        """
+        Appends one run.
+        Args:
+            records (list): Result records as produced by the runner
+            wall (float): Wall time of the run in seconds
+            workers (int): Number of worker processes
+            run_dir (str): Directory holding the run's report and logs
+            kind (str): "suite" for runner runs, "matrix" for matrix runs,
+                "api" for API check runs
+        Returns:
+            int: The new run id
+        """
+        with self.connect() as connection:
+            cursor = connection.execute(
+                "INSERT INTO runs (started, kind, wall, workers, run_dir) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    datetime.now().isoformat(timespec="seconds"),
+                    kind,
+                    wall,
+                    workers,
+                    run_dir,
+                ),
+            )
+            run_id = cursor.lastrowid
+            connection.executemany(
+                "INSERT INTO results (run_id, test_id, app, environment, outcome, "
+                "duration, failure_class, steps, worker, inputs) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_id,
+                        record["id"],
+                        record.get("app"),
+                        record.get("environment"),
+                        record["outcome"],
+                        record.get("duration"),
+                        record.get("failure_class"),
+                        json.dumps(record.get("steps") or {}),
+                        record.get("worker"),
+                        record.get("inputs"),
+                    )
+                    for record in records
+                ],
+            )
+        return run_id
+
+    def recent_runs(self, limit, kind="suite"):
+        """
+        Returns:
+            list: The last `limit` runs of the given kind, oldest first
+        """
+        with self.connect() as connection:
+            rows = connection.execute(
+                "SELECT id, started, wall FROM runs WHERE kind = ? "
+                "ORDER BY id DESC LIMIT ?",
+                (kind, limit),
+            ).fetchall()
+        return list(reversed(rows))
+
+    def results(self, run_ids, app=None, environment=None):
+        """
+        Returns:
+            list: (run_id, test_id, outcome, duration, failure_class) rows
+        """
+        if not run_ids:
+            return []
+        query = (
+            "SELECT run_id, test_id, outcome, duration, failure_class FROM results "
+            f"WHERE run_id IN ({', '.join('?' * len(run_ids))})"
+        )
+        params = list(run_ids)
+        if app:
+            query += " AND app = ?"
+            params.append(app)
+        if environment:
+            query += " AND environment = ?"
+            params.append(environment)
+        with self.connect() as connection:
+            return connection.execute(query + " ORDER BY run_id", params).fetchall()
+
+    def median_durations(self, runs=20):
+        """
+        Typical duration of each test that passed in the last `runs` suite runs.
+        Returns:
+            dict: Test id to its median successful duration in seconds
+        """
+        run_ids = [run_id for run_id, _, _ in self.recent_runs(runs)]
+        durations = {}
+        for _, test_id, outcome, duration, _ in self.results(run_ids):
+            if outcome == "success" and duration is not None:
+                durations.setdefault(test_id, []).append(duration)
+        return {
+            test_id: statistics.median(values) for test_id, values in durations.items()
+        }
+
+    def last_executed(self, test_ids, environment=None):
+        """
+        The latest outcome of each test that was not skipped, in suite runs.
+        Args:
+            environment (str): Only runs against this environment
+        Returns:
+            dict: Test id to (outcome, input digest)
+        """
+        if not test_ids:
+            return {}
+        query = (
+            "SELECT test_id, outcome, inputs FROM results "
+            "JOIN runs ON runs.id = results.run_id "
+            "WHERE runs.kind = 'suite' AND outcome != 'skipped' "
+            f"AND test_id IN ({', '.join('?' * len(test_ids))})"
+        )
+        params = list(test_ids)
+        if environment:
+            query += " AND environment = ?"
+            params.append(environment)
+        with self.connect() as connection:
+            rows = connection.execute(query + " ORDER BY run_id", params).fetchall()
+        return {test_id: (outcome, inputs) for test_id, outcome, inputs in rows}
+
+
+def trends(rows, run_ids):
+    """
+    Aggregates result rows per test.
+    Args:
+        rows (list): Rows from ResultsStore.results
+        run_ids (list): The runs the rows came from, oldest first
+    Returns:
+        list: Per-test dicts with pass rate, p50/p95 duration, growth in
+        seconds per run and the most common failure class
+    """
+    position = {run_id: index for index, run_id in enumerate(run_ids)}
+    tests = {}
+    for run_id, test_id, outcome, duration, failure_class in rows:
+        test = tests.setdefault(
+            test_id,
+            {"runs": 0, "passed": 0, "executed": 0, "points": [], "failures": {}},
+        )
+        test["runs"] += 1
+        if outcome == "skipped":
+            continue
+        test["executed"] += 1
+        if outcome == "success":
+            test["passed"] += 1
+            if duration is not None:
+                test["points"].append((position[run_id], duration))
+        elif failure_class:
+            failures = test["failures"]
+            failures[failure_class] = failures.get(failure_class, 0) + 1
+
+    summary = []
+    for test_id, test in sorted(tests.items()):
+        durations = sorted(duration for _, duration in test["points"])
+        summary.append(
+            {
+                "test": test_id,
+                "runs": test["runs"],
+                "pass_rate": (
+                    round(100.0 * test["passed"] / test["executed"], 1)
+                    if test["executed"]
+                    else None
+                ),
+                "p50": percentile(durations, 50),
+                "p95": percentile(durations, 95),
+                "growth": slope(test["points"]) if len(test["points"]) > 2 else None,
+                "failure_class": (
+                    max(test["failures"], key=test["failures"].get)
+                    if test["failures"]
+                    else None
+                ),
+            }
+        )
+    return summary
+
+
+def format_trends(runs, rows, summary, top):
+    lines = ["Runs"]
+    for run_id, started, wall in runs:
+        outcomes = [outcome for rid, _, outcome, _, _ in rows if rid == run_id]
+        executed = [outcome for outcome in outcomes if outcome != "skipped"]
+        passed = executed.count("success")
+        rate = f"{100.0 * passed / len(executed):5.1f}%" if executed else "    -"
+        lines.append(
+            f"  #{run_id:<5} {started}  {len(outcomes):4} tests  pass rate {rate}"
+            f"  {wall or 0:8.1f}s"
+        )
+
+    lines.append("")
+    lines.append(f"{'Test':70} {'runs':>4} {'pass':>6} {'p50':>8} {'p95':>8}  failure")
+    for test in summary:
+        rate = "-" if test["pass_rate"] is None else f"{test['pass_rate']:.0f}%"
+        p50 = "-" if test["p50"] is None else f"{test['p50']:.2f}s"
+        p95 = "-" if test["p95"] is None else f"{test['p95']:.2f}s"
+        lines.append(
+            f"{test['test'][-70:]:70} {test['runs']:4} {rate:>6} {p50:>8} {p95:>8}"
+            f"  {test['failure_class'] or ''}"
+        )
+
+    growing = sorted(
+        (test for test in summary if test["growth"] and test["growth"] > 0),
+        key=lambda test: test["growth"],
+        reverse=True,
+    )[:top]
+    lines.append("")
+    lines.append("Slowest-growing tests (successful runs, seconds added per run)")
+    for test in growing:
+        lines.append(f"  {test['growth']:+7.3f}s/run  {test['test']}")
+    if not growing:
+        lines.append("  none")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Summarise pass rates and duration trends of past runs."
+    )
+    parser.add_argument("--store", default=DEFAULT_STORE, help="Results database")
+    parser.add_argument("--runs", type=int, default=20, help="Number of recent runs")
+    parser.add_argument("--app", help="Only tests of this app, e.g. TDAT")
+    parser.add_argument(
+        "--environment", help="Only tests run against this environment"
+    )
+    parser.add_argument(
+        "--kind",
+        default="suite",
+        choices=("suite", "matrix", "api"),
+        help="Kind of run",
+    )
+    parser.add_argument(
+        "--top", type=int, default=10, help="Number of slowest-growing tests"
+    )
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.store):
+        print(f"No results store at {args.store}; run egis_testing.runner first")
+        return 1
+    store = ResultsStore(args.store)
+    runs = store.recent_runs(args.runs, args.kind)
+    run_ids = [run_id for run_id, _, _ in runs]
+    rows = store.results(run_ids, args.app, args.environment)
+    print(format_trends(runs, rows, trends(rows, run_ids), args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
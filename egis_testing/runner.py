@@ -0,0 +1,777 @@
+"""
+Parallel runner for the EGIS application test suites.
+
+Discovers the unittest suites under ``apps/*``, splits the tests into shards
+and runs each shard in its own worker process, which owns its own pool of
+Chrome sessions. Results and worker logs are merged
+back into a single report. With several environments, every environment gets
+its own workers and a side-by-side comparison is added to the report.
+
+Usage:
+    python -m egis_testing.runner --workers 4
+    python -m egis_testing.runner --workers 2 -k menu apps/TDAT
+    python -m egis_testing.runner --workers 2 --environments egis,egis-stg
+"""
+
+import argparse
+import glob
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+import unittest
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from egis_testing.artifacts import ARTIFACTS_DIR_ENV, flush_artifacts
+from egis_testing.comparison import write_comparison
+from egis_testing.drivers import PROFILE_ENV, PROFILES, PROXY_ENV, chromedriver_path
+from egis_testing.environments import ENVIRONMENT_ENV, current_environment
+from egis_testing.fingerprints import select_changed
+from egis_testing.logs import LOG_FILE_ENV, WORKER_ENV, merge_logs, stop_logging
+from egis_testing.network import NETWORK_DIR_ENV, compare_reports, previous_reports
+from egis_testing.pool import close_pool
+from egis_testing.queries import CAPTURE_DIR_ENV, build_cases
+from egis_testing.replay import ReplayProxy, parse_latency
+from egis_testing.results import ResultsStore
+from egis_testing.scheduler import (
+    estimate_durations,
+    failure_risks,
+    predicted_loads,
+    schedule,
+    schedule_within_budget,
+)
+from egis_testing.templates import (
+    TEMPLATE_ENV,
+    ensure_template,
+    template_path,
+    template_ready,
+    templates_enabled,
+)
+from egis_testing.tracing import (
+    TRACE_DIR_ENV,
+    export_trace,
+    get_tracer,
+    merge_traces,
+    step_timings,
+)
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_APPS_GLOB = os.path.join(REPO_ROOT, "apps", "*")
+DEFAULT_PATTERN = "*test*.py"
+DEFAULT_RESULTS_DIR = os.path.join(REPO_ROOT, "test-results")
+
+
+def iter_tests(suite):
+    """
+    Flattens a (possibly nested) unittest suite into individual test cases.
+    """
+    for item in suite:
+        if isinstance(item, unittest.TestSuite):
+            yield from iter_tests(item)
+        else:
+            yield item
+
+
+def discover(app_dirs, pattern=DEFAULT_PATTERN, keyword=None):
+    """
+    Discovers the tests of every application directory.
+    Args:
+        app_dirs (list): Application directories such as ``apps/TDAT``
+        pattern (str): File name pattern of the test modules
+        keyword (str): Only keep tests whose id contains this substring
+    Returns:
+        list: ``(app_dir, test_id)`` pairs in discovery order
+    """
+    loader = unittest.TestLoader()
+    tests = []
+    for app_dir in app_dirs:
+        suite = loader.discover(app_dir, pattern=pattern, top_level_dir=app_dir)
+        for test in iter_tests(suite):
+            test_id = test.id()
+            if keyword and keyword.lower() not in test_id.lower():
+                continue
+            tests.append((app_dir, test_id))
+    return tests
+
+
+def shard(tests, workers):
+    """
+    Splits tests round-robin across workers.
+    Args:
+        tests (list): ``(app_dir, test_id)`` pairs
+        workers (int): Number of shards to produce
+    Returns:
+        list: One list of ``(app_dir, test_id)`` pairs per worker
+    """
+    shards = [[] for _ in range(max(workers, 1))]
+    for index, test in enumerate(tests):
+        shards[index % len(shards)].append(test)
+    for tests_in_shard in shards:
+        tests_in_shard.sort(key=lambda test: test[1])
+    return [tests_in_shard for tests_in_shard in shards if tests_in_shard]
+
+
+class RecordingResult(unittest.TestResult):
+    """
+    Test result that keeps a picklable record of every test outcome.
+    """
+
+    def __init__(self, worker, app_dirs, deadline=None, estimates=None):
+        """
+        Args:
+            worker (int): Index of the worker running the tests
+            app_dirs (dict): Test module name to its application directory
+            deadline (float): Epoch time by which the planned tests must end
+            estimates (dict): Test id to estimated seconds, for the deadline
+        """
+        super().__init__()
+        self.worker = worker
+        self.app_dirs = app_dirs
+        self.deadline = deadline
+        self.estimates = estimates or {}
+        self.plan = []
+        self.records = {}
+        self._started = {}
+        self._trace_marks = {}
+
+    def out_of_budget(self):
+        """
+        Returns True if the next planned test would not finish by the deadline.
+        """
+        if self.deadline is None or not self.plan:
+            return False
+        return time.time() + self.estimates.get(self.plan[0], 0.0) > self.deadline
+
+    def _app(self, test):
+        module = test.id().split(".")[0]
+        return self.app_dirs.get(module, "")
+
+    def _record(self, test, outcome, details="", err=None):
+        test_id = test.id()
+        failure_class = err[0].__name__ if err else None
+        record = self.records.get(test_id)
+        if record is None:
+            started = self._started.get(test_id, time.perf_counter())
+            record = {
+                "id": test_id,
+                "app": os.path.basename(self._app(test)),
+                "environment": getattr(test, "environment_url", ""),
+                "outcome": outcome,
+                "duration": round(time.perf_counter() - started, 3),
+                "worker": self.worker,
+                "details": details,
+                "failure_class": failure_class,
+            }
+            self.records[test_id] = record
+        elif outcome in ("error", "failure") and record["outcome"] == "success":
+            record["outcome"] = outcome
+            record["details"] = details
+            record["failure_class"] = failure_class
+        return record
+
+    def startTest(self, test):
+        super().startTest(test)
+        self._started[test.id()] = time.perf_counter()
+        self._trace_marks[test.id()] = get_tracer().mark()
+
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self._record(test, "success")
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self._record(test, "failure", self._exc_info_to_string(err, test), err)
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        if not isinstance(test, unittest.TestCase):
+            # setUpClass/tearDownClass failures are reported against the class
+            self.records[test.id()] = {
+                "id": test.id(),
+                "app": "",
+                "outcome": "error",
+                "duration": 0.0,
+                "worker": self.worker,
+                "details": self._exc_info_to_string(err, test),
+                "failure_class": err[0].__name__,
+            }
+            return
+        self._record(test, "error", self._exc_info_to_string(err, test), err)
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self._record(test, "skipped", reason)
+
+    def addSubTest(self, test, subtest, err):
+        super().addSubTest(test, subtest, err)
+        if err is not None:
+            outcome = (
+                "failure" if issubclass(err[0], test.failureException) else "error"
+            )
+            self._record(test, outcome, self._exc_info_to_string(err, test), err)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        record = self.records.get(test.id())
+        mark = self._trace_marks.pop(test.id(), None)
+        if record is not None:
+            started = self._started.get(test.id())
+            if started is not None:
+                record["duration"] = round(time.perf_counter() - started, 3)
+            if mark is not None:
+                record["steps"] = step_timings(get_tracer().events_since(mark))
+        if mark is not None:
+            get_tracer().release(mark)
+        if test.id() in self.plan:
+            self.plan.remove(test.id())
+        if self.out_of_budget():
+            # unittest checks this between tests, so class fixtures still
+            # tear down and the running test is never interrupted
+            self.stop()
+
+
+def run_shard(
+    worker, tests, log_dir, deadline=None, estimates=None, environment=None
+):
+    """
+    Runs one shard of tests in the current (worker) process.
+    Args:
+        worker (int): Index of the worker running the shard
+        tests (list): ``(app_dir, test_id)`` pairs to run
+        log_dir (str): Directory for the per-worker log file
+        deadline (float): Epoch time after which no further test may run
+        estimates (dict): Test id to estimated seconds
+        environment (str): Environment to run against, when a run fans out
+            to several; its failure artifacts and network reports get their
+            own directories
+    Returns:
+        list: Result records of the tests that ran
+    """
+    os.environ[WORKER_ENV] = str(worker)
+    os.environ[LOG_FILE_ENV] = os.path.join(log_dir, f"worker-{worker}.jsonl")
+    os.environ[TRACE_DIR_ENV] = log_dir
+    os.environ[ARTIFACTS_DIR_ENV] = os.path.join(log_dir, "artifacts")
+    os.environ[NETWORK_DIR_ENV] = os.path.join(log_dir, "network")
+    if environment:
+        os.environ[ENVIRONMENT_ENV] = environment
+        os.environ[ARTIFACTS_DIR_ENV] = os.path.join(
+            log_dir, "artifacts", environment
+        )
+        os.environ[NETWORK_DIR_ENV] = os.path.join(log_dir, "network", environment)
+
+    app_dirs = {}
+    for app_dir, test_id in tests:
+        if app_dir not in sys.path:
+            sys.path.insert(0, app_dir)
+        app_dirs[test_id.split(".")[0]] = app_dir
+
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    result = RecordingResult(worker, app_dirs, deadline, estimates)
+    result.plan = [test_id for _, test_id in tests]
+    for app_dir, test_id in tests:
+        try:
+            suite.addTest(loader.loadTestsFromName(test_id))
+        except Exception:
+            result.records[test_id] = {
+                "id": test_id,
+                "app": os.path.basename(app_dir),
+                "outcome": "error",
+                "duration": 0.0,
+                "worker": worker,
+                "details": traceback.format_exc(),
+            }
+    try:
+        if result.out_of_budget():
+            result.stop()
+        suite.run(result)
+    finally:
+        close_pool()
+        export_trace()
+        flush_artifacts()
+        stop_logging()
+    return list(result.records.values())
+
+
+def summarize(records):
+    """
+    Builds summary counts for a list of result records.
+    Returns:
+        dict: Totals per outcome and the pass rate in percent
+    """
+    summary = {"total": len(records)}
+    for outcome in ("success", "failure", "error", "skipped"):
+        summary[outcome] = sum(1 for r in records if r["outcome"] == outcome)
+    executed = summary["total"] - summary["skipped"]
+    summary["pass_rate"] = (
+        round(100.0 * summary["success"] / executed, 1) if executed else 0.0
+    )
+    return summary
+
+
+def write_report(records, wall, report_file, notes=()):
+    """
+    Writes the merged text report and returns the summary.
+    Args:
+        notes (iterable): Extra lines appended after the summary
+    """
+    summary = summarize(records)
+    environments = {record.get("environment") for record in records}
+
+    def label(record):
+        if len(environments) > 1:
+            return f"[{record.get('environment')}] {record['id']}"
+        return record["id"]
+
+    lines = []
+    for record in sorted(records, key=lambda r: (r["id"], r.get("environment") or "")):
+        lines.append(
+            f"{record['outcome'].upper():8} {record['duration']:8.2f}s "
+            f"w{'-' if record['worker'] is None else record['worker']}  "
+            f"{label(record)}"
+        )
+    lines.append("")
+    for record in records:
+        if record["outcome"] in ("failure", "error"):
+            lines.append("=" * 70)
+            lines.append(f"{record['outcome'].upper()}: {label(record)}")
+            lines.append("-" * 70)
+            lines.append(record["details"].rstrip())
+    lines.append("")
+    lines.append(
+        f"Ran {summary['total']} tests in {wall:.2f}s: "
+        f"{summary['success']} passed, {summary['failure']} failed, "
+        f"{summary['error']} errors, {summary['skipped']} skipped "
+        f"(pass rate {summary['pass_rate']}%)"
+    )
+    lines.extend(notes)
+    report = "\n".join(lines) + "\n"
+    with open(report_file, "w", encoding="utf-8") as output:
+        output.write(report)
+    print(report)
+    return summary
+
+
+def format_schedule(
+    scheduling, shards, predicted, finished, round_robin, wall, first_worker=0
+):
+    """
+    Describes predicted against actual makespan, overall and per worker.
+    Args:
+        first_worker (int): Number of the first shard's worker
+    """
+    lines = [
+        f"Schedule ({scheduling}): predicted makespan {max(predicted, default=0):.1f}s "
+        f"(round-robin {round_robin:.1f}s), actual {wall:.1f}s"
+    ]
+    for worker, tests_in_shard in enumerate(shards):
+        actual = finished.get(worker)
+        lines.append(
+            f"  worker {first_worker + worker}: {len(tests_in_shard)} tests, "
+            f"predicted {predicted[worker]:.1f}s, "
+            f"actual {'-' if actual is None else f'{actual:.1f}s'}"
+        )
+    return lines
+
+
+def skipped_record(app_dir, test_id, reason, digest=None, environment=None):
+    """
+    The record of a test the runner chose not to run.
+    """
+    return {
+        "id": test_id,
+        "app": os.path.basename(app_dir),
+        "environment": environment or current_environment(),
+        "outcome": "skipped",
+        "duration": 0.0,
+        "worker": None,
+        "details": reason,
+        "inputs": digest,
+    }
+
+
+def format_budget(budget, ran, dropped, stopped, estimates):
+    """
+    Describes what a budgeted run left out.
+    """
+    lines = [
+        f"Budget {budget:.0f}s: ran {ran} tests, skipped {len(dropped)} that did "
+        f"not fit and {len(stopped)} stopped when the budget ran out"
+    ]
+    for reason, tests in (("not selected", dropped), ("out of time", stopped)):
+        for _, test_id in sorted(tests, key=lambda test: test[1]):
+            lines.append(f"  {reason:12} ~{estimates[test_id]:5.1f}s  {test_id}")
+    return lines
+
+
+def plan_environment(
+    tests, workers, store, environment, scheduling, incremental, budget
+):
+    """
+    Selects and schedules the tests of one environment.
+    Returns:
+        dict: The environment's tests, estimates, shards and the tests it
+        leaves out, as used by run()
+    """
+    plan = {
+        "environment": environment,
+        "selected": len(tests),
+        "unchanged": [],
+        "digests": {},
+        "dropped": [],
+        "scheduling": scheduling,
+    }
+    if incremental:
+        tests, plan["unchanged"], plan["digests"] = select_changed(
+            tests, store, environment
+        )
+    estimates = estimate_durations(tests, store)
+    plan["estimates"] = estimates
+    plan["round_robin"] = max(
+        predicted_loads(shard(tests, workers), estimates), default=0.0
+    )
+    if budget is not None:
+        plan["scheduling"] = "budget"
+        plan["shards"], plan["predicted"], plan["dropped"] = schedule_within_budget(
+            tests, workers, estimates, failure_risks(tests, store), budget
+        )
+    elif scheduling == "duration":
+        plan["shards"], plan["predicted"] = schedule(tests, workers, estimates)
+    else:
+        plan["shards"] = shard(tests, workers)
+        plan["predicted"] = predicted_loads(plan["shards"], estimates)
+    return plan
+
+
+def run(
+    tests,
+    workers,
+    results_dir=DEFAULT_RESULTS_DIR,
+    scheduling="duration",
+    incremental=False,
+    budget=None,
+    environments=None,
+    capture_queries=False,
+):
+    """
+    Runs tests across a pool of worker processes.
+    Args:
+        tests (list): ``(app_dir, test_id)`` pairs
+        workers (int): Number of worker processes (and browser sessions)
+            per environment
+        results_dir (str): Parent directory for this run's output
+        scheduling (str): "duration" packs tests by their historical
+            durations; "round-robin" deals them out in discovery order
+        incremental (bool): Skip tests that passed last time and whose
+            fingerprinted inputs have not changed since
+        budget (float): Wall-clock seconds; run only the most valuable tests
+            that fit and stop starting new ones when the time is up
+        environments (list): Environment host prefixes to run against
+            concurrently, each with its own workers; the current environment
+            if omitted. With several, a side-by-side comparison is written.
+        capture_queries (bool): Capture the service queries of passing tests
+            and add them to the API cases (see egis_testing.queries)
+    Returns:
+        tuple: (records, summary, run_dir)
+    """
+    # The budget covers the whole run, planning and preparation included
+    deadline = None if budget is None else time.time() + budget
+    run_dir = os.path.join(results_dir, datetime.now().strftime("%Y%m%d-%H%M%S"))
+    os.makedirs(run_dir, exist_ok=True)
+
+    store = ResultsStore(os.path.join(results_dir, "results.sqlite"))
+    environments = environments or [current_environment()]
+    fan_out = len(environments) > 1
+    if not fan_out:
+        # Spawned workers inherit the environment
+        os.environ[ENVIRONMENT_ENV] = environments[0]
+    plans = [
+        plan_environment(
+            tests,
+            workers,
+            store,
+            environment,
+            scheduling,
+            incremental,
+            None if deadline is None else max(deadline - time.time(), 0.0),
+        )
+        for environment in environments
+    ]
+    # Resolved once here; the workers inherit both through the environment
+    chromedriver_path()
+    if deadline is None:
+        templates = [ensure_template(environment) for environment in environments]
+    else:
+        # Building a template loads both apps, which a tight budget cannot
+        # afford; use a ready one or start from empty profiles
+        templates = [
+            templates_enabled() and template_ready(template_path(environment))
+            for environment in environments
+        ]
+    if not all(templates):
+        os.environ[TEMPLATE_ENV] = "0"
+    capture_dir = os.path.join(run_dir, "queries")
+    if capture_queries:
+        os.environ[CAPTURE_DIR_ENV] = capture_dir
+
+    # Workers are numbered across environments, so their logs, traces and
+    # records stay apart
+    jobs = {}
+    for plan in plans:
+        plan["first_worker"] = len(jobs)
+        for tests_in_shard in plan["shards"]:
+            jobs[len(jobs)] = (plan, tests_in_shard)
+    finished = {}
+    records = []
+    start = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(jobs) or 1, mp_context=context) as pool:
+        futures = {
+            pool.submit(
+                run_shard,
+                worker,
+                tests_in_shard,
+                run_dir,
+                deadline,
+                plan["estimates"],
+                plan["environment"] if fan_out else None,
+            ): worker
+            for worker, (plan, tests_in_shard) in jobs.items()
+            if tests_in_shard
+        }
+        for future in as_completed(futures):
+            worker = futures[future]
+            plan, tests_in_shard = jobs[worker]
+            finished[worker] = time.perf_counter() - start
+            try:
+                shard_records = future.result()
+            except Exception:
+                # A crashed worker fails every test it was given
+                shard_records = [
+                    {
+                        "id": test_id,
+                        "app": os.path.basename(app_dir),
+                        "outcome": "error",
+                        "duration": 0.0,
+                        "worker": worker,
+                        "details": traceback.format_exc(),
+                    }
+                    for app_dir, test_id in tests_in_shard
+                ]
+            for record in shard_records:
+                record["environment"] = plan["environment"]
+                record["inputs"] = plan["digests"].get(record["id"])
+            records.extend(shard_records)
+    wall = time.perf_counter() - start
+
+    notes = []
+    for plan in plans:
+        environment = plan["environment"]
+        ran = {
+            record["id"]
+            for record in records
+            if record["environment"] == environment
+        }
+        stopped = []
+        if deadline is not None:
+            stopped = [
+                test
+                for tests_in_shard in plan["shards"]
+                for test in tests_in_shard
+                if test[1] not in ran
+            ]
+        for reason, skipped in (
+            ("inputs unchanged since the test last passed", plan["unchanged"]),
+            ("did not fit in the time budget", plan["dropped"]),
+            ("the time budget ran out", stopped),
+        ):
+            records.extend(
+                skipped_record(
+                    app_dir, test_id, reason, plan["digests"].get(test_id), environment
+                )
+                for app_dir, test_id in skipped
+            )
+
+        first = plan["first_worker"]
+        if fan_out:
+            notes.append(f"Environment {environment}:")
+        notes.extend(
+            format_schedule(
+                plan["scheduling"],
+                plan["shards"],
+                plan["predicted"],
+                {
+                    worker - first: seconds
+                    for worker, seconds in finished.items()
+                    if first <= worker < first + len(plan["shards"])
+                },
+                plan["round_robin"],
+                wall,
+                first,
+            )
+        )
+        if budget is not None:
+            notes.extend(
+                format_budget(
+                    budget, len(ran), plan["dropped"], stopped, plan["estimates"]
+                )
+            )
+        if incremental:
+            notes.append(
+                f"Incremental: {len(plan['unchanged'])} of {plan['selected']} tests "
+                f"skipped, their inputs unchanged since they last passed "
+                f"(--full runs them all)"
+            )
+    if capture_queries:
+        updated, total = build_cases(capture_dir)
+        notes.append(
+            f"Captured queries: {updated} API cases added or updated, {total} in all"
+        )
+    for plan in plans:
+        network = "network"
+        if fan_out:
+            network = os.path.join("network", plan["environment"])
+        previous = previous_reports(results_dir, run_dir, network)
+        if previous and os.path.isdir(os.path.join(run_dir, network)):
+            notes.append("")
+            notes.extend(compare_reports(previous, os.path.join(run_dir, network)))
+    merge_logs(run_dir, os.path.join(run_dir, "run.log"))
+    traces = sorted(glob.glob(os.path.join(run_dir, "trace-*.json")))
+    if traces:
+        merge_traces(traces, os.path.join(run_dir, "trace.json"))
+    if fan_out:
+        notes.append("")
+        notes.extend(
+            write_comparison(
+                records,
+                environments,
+                os.path.join(run_dir, "comparison.txt"),
+                os.path.join(run_dir, "comparison.json"),
+            )
+        )
+    summary = write_report(
+        records,
+        wall,
+        os.path.join(run_dir, "report.txt"),
+        notes,
+    )
+    store.add_run(records, wall=wall, workers=len(jobs), run_dir=run_dir)
+    return records, summary, run_dir
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Run the EGIS test suites in parallel browser sessions."
+    )
+    parser.add_argument(
+        "apps",
+        nargs="*",
+        help="Application directories to run (default: every apps/* directory)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=max(1, min(4, os.cpu_count() or 1)),
+        help="Number of worker processes, each with its own Chrome session",
+    )
+    parser.add_argument(
+        "-p", "--pattern", default=DEFAULT_PATTERN, help="Test module pattern"
+    )
+    parser.add_argument("-k", "--keyword", help="Only run tests whose id matches")
+    parser.add_argument(
+        "--profile",
+        choices=sorted(PROFILES),
+        help="Browser launch profile (default: $EGIS_BROWSER_PROFILE or 'default')",
+    )
+    parser.add_argument(
+        "--environments",
+        type=lambda value: [name.strip() for name in value.split(",") if name.strip()],
+        metavar="ENV[,ENV...]",
+        help="Environment host prefixes to run against at once; the first is the "
+        "baseline of the comparison (default: $EGIS_ENVIRONMENT or 'egis')",
+    )
+    parser.add_argument(
+        "--results-dir", default=DEFAULT_RESULTS_DIR, help="Output directory"
+    )
+    parser.add_argument(
+        "--schedule",
+        choices=("duration", "round-robin"),
+        default="duration",
+        help="Pack tests by historical duration (default) or deal them round-robin",
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        metavar="SECONDS",
+        help="Run the most valuable tests that fit in this many seconds",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Run every test, even those whose fingerprinted inputs are unchanged",
+    )
+    parser.add_argument(
+        "--capture-queries",
+        action="store_true",
+        help="Turn the service queries of passing tests into API cases",
+    )
+    network = parser.add_mutually_exclusive_group()
+    network.add_argument(
+        "--record", metavar="ARCHIVE", help="Record all HTTP traffic to ARCHIVE"
+    )
+    network.add_argument(
+        "--replay", metavar="ARCHIVE", help="Serve all HTTP traffic from ARCHIVE"
+    )
+    parser.add_argument(
+        "--latency",
+        type=parse_latency,
+        default="zero",
+        help="Replay delay: zero, recorded or a number of seconds",
+    )
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.profile:
+        # Spawned workers inherit the environment
+        os.environ[PROFILE_ENV] = args.profile
+    app_dirs = [os.path.abspath(app) for app in args.apps] or sorted(
+        path for path in glob.glob(DEFAULT_APPS_GLOB) if os.path.isdir(path)
+    )
+    tests = discover(app_dirs, args.pattern, args.keyword)
+    if not tests:
+        print("No tests found")
+        return 1
+
+    proxy = None
+    if args.record or args.replay:
+        mode = "record" if args.record else "replay"
+        proxy = ReplayProxy(args.record or args.replay, mode, latency=args.latency)
+        os.environ[PROXY_ENV] = proxy.start().address
+    try:
+        _, summary, run_dir = run(
+            tests,
+            args.workers,
+            args.results_dir,
+            args.schedule,
+            incremental=not args.full,
+            budget=args.budget,
+            environments=args.environments,
+            capture_queries=args.capture_queries,
+        )
+    finally:
+        if proxy is not None:
+            proxy.stop()
+            if proxy.misses:
+                print(f"{len(proxy.misses)} requests were not in the recording")
+    print(f"Results written to {run_dir}")
+    return 0 if summary["failure"] == 0 and summary["error"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Duration-aware assignment of tests to parallel workers.
+
+Tests are estimated from their median duration in recent runs (see
+``egis_testing.results``) and assigned longest-first to the least-loaded
+worker (greedy LPT bin-packing), so one worker does not end up running
+the slow export and map tests back to back while the others sit idle.
+Tests without history fall back to static estimates.
+
+With a time budget, the tests are first ranked by value per second, where
+value is a fixed coverage credit plus the test's recent failure rate, and
+only those that still fit within the budget on some worker are kept.
+"""
+
+import heapq
+import os
+
+from egis_testing.results import ResultsStore
+
+
+# Seconds; used for tests that have no successful run in the results store
+DEFAULT_ESTIMATE = 15.0
+STATIC_ESTIMATES = {
+    "test_export_to_excel": 40.0,
+    "test_print_page": 25.0,
+    "test_click_on_map": 25.0,
+    "test_map_zoom": 25.0,
+    "test_login": 20.0,
+}
+# Seconds per worker for process start-up and the first browser session
+WORKER_OVERHEAD = 5.0
+# Value of running a test: coverage credit plus weighted failure risk
+COVERAGE_VALUE = 1.0
+RISK_WEIGHT = 4.0
+
+
+def estimate_durations(tests, store=None, runs=20):
+    """
+    Estimates how long each test will take.
+    Args:
+        tests (list): ``(app_dir, test_id)`` pairs
+        store (ResultsStore): History to read; the default store if omitted
+        runs (int): Number of recent runs to consider
+    Returns:
+        dict: Test id to estimated seconds
+    """
+    store = store or ResultsStore()
+    history = store.median_durations(runs) if os.path.exists(store.path) else {}
+    estimates = {}
+    for _, test_id in tests:
+        if test_id in history:
+            estimates[test_id] = history[test_id]
+        else:
+            method = test_id.rsplit(".", 1)[-1]
+            estimates[test_id] = STATIC_ESTIMATES.get(method, DEFAULT_ESTIMATE)
+    return estimates
+
+
+def schedule(tests, workers, estimates):
+    """
+    Packs tests onto workers longest-first, each onto the least-loaded worker.
+    Within a worker the tests run in id order, so each test class's fixtures
+    run once per worker.
+    Args:
+        tests (list): ``(app_dir, test_id)`` pairs
+        workers (int): Number of workers
+        estimates (dict): Test id to estimated seconds
+    Returns:
+        tuple: (shards, loads), the tests and the predicted seconds per worker
+    """
+    workers = max(1, min(workers, len(tests)))
+    shards = [[] for _ in range(workers)]
+    loads = [0.0] * workers
+    heap = [(0.0, worker) for worker in range(workers)]
+    for test in sorted(tests, key=lambda test: (-estimates[test[1]], test[1])):
+        load, worker = heapq.heappop(heap)
+        shards[worker].append(test)
+        loads[worker] = load + estimates[test[1]]
+        heapq.heappush(heap, (loads[worker], worker))
+    for tests_in_shard in shards:
+        tests_in_shard.sort(key=lambda test: test[1])
+    return shards, loads
+
+
+def predicted_loads(shards, estimates):
+    """
+    Returns:
+        list: Predicted seconds per shard
+    """
+    return [sum(estimates[test_id] for _, test_id in shard) for shard in shards]
+
+
+def failure_risks(tests, store=None, runs=20):
+    """
+    Estimates how likely each test is to fail, from its outcomes in the
+    last `runs` suite runs. The failure rate is smoothed (one pass and one
+    failure are added), so a test without history counts as a coin flip.
+    Returns:
+        dict: Test id to failure probability
+    """
+    store = store or ResultsStore()
+    outcomes = {}
+    if os.path.exists(store.path):
+        run_ids = [run_id for run_id, _, _ in store.recent_runs(runs)]
+        for _, test_id, outcome, _, _ in store.results(run_ids):
+            if outcome != "skipped":
+                outcomes.setdefault(test_id, []).append(outcome != "success")
+    risks = {}
+    for _, test_id in tests:
+        failed = outcomes.get(test_id, [])
+        risks[test_id] = (sum(failed) + 1) / (len(failed) + 2)
+    return risks
+
+
+def schedule_within_budget(tests, workers, estimates, risks, budget):
+    """
+    Picks the tests worth the most per second that fit within the budget,
+    each onto the least-loaded worker. Within a worker the most valuable
+    tests run first, so a budget overrun only costs the least valuable.
+    Args:
+        tests (list): ``(app_dir, test_id)`` pairs
+        workers (int): Number of workers
+        estimates (dict): Test id to estimated seconds
+        risks (dict): Test id to failure probability
+        budget (float): Wall-clock seconds available
+    Returns:
+        tuple: (shards, loads, dropped), dropped being the tests left out
+    """
+    workers = max(1, min(workers, len(tests)))
+    capacity = budget - WORKER_OVERHEAD
+    values = {
+        test_id: COVERAGE_VALUE + RISK_WEIGHT * risks[test_id] for _, test_id in tests
+    }
+    shards = [[] for _ in range(workers)]
+    loads = [0.0] * workers
+    dropped = []
+    ranked = sorted(
+        tests,
+        key=lambda test: (-values[test[1]] / max(estimates[test[1]], 0.1), test[1]),
+    )
+    for test in ranked:
+        worker = min(range(workers), key=lambda index: loads[index])
+        if loads[worker] + estimates[test[1]] > capacity:
+            dropped.append(test)
+            continue
+        shards[worker].append(test)
+        loads[worker] += estimates[test[1]]
+    for tests_in_shard in shards:
+        tests_in_shard.sort(key=lambda test: (-values[test[1]], test[1]))
+    return shards, loads, dropped
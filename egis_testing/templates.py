@@ -0,0 +1,276 @@
+"""
+Pre-warmed Chrome profiles for faster session start-up.
+
+Every session used to start from an empty temporary profile, so the first
+page it opened downloaded the ArcGIS JS bundles, stylesheets and fonts of
+the app all over again. Instead, a template profile is built once per
+environment by loading each application in a browser that writes to a
+persistent ``--user-data-dir``, which leaves the static assets in the
+profile's HTTP cache. Every session then starts from its own copy of the
+template (a copy-on-write reflink where the filesystem supports it), so it
+never writes to the template and parallel workers do not share a profile.
+
+The template lives under ``test-results/.profiles/<environment>`` and is
+rebuilt when it is older than ``$EGIS_PROFILE_MAX_AGE`` seconds (12 hours by
+default). Set ``EGIS_PROFILE_TEMPLATE=0`` to start every session from an
+empty profile as before.
+
+Usage:
+    python -m egis_testing.templates --refresh
+    python -m egis_testing.templates --benchmark --runs 3
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from selenium.webdriver.support import expected_conditions
+from selenium.webdriver.support.ui import WebDriverWait
+
+from egis_testing.auth import file_lock
+from egis_testing.drivers import PROFILES, chromedriver_path, create_driver
+from egis_testing.environments import DEFAULT_ENVIRONMENT
+from egis_testing.pages import SPLASH_CLOSE
+from egis_testing.profile_benchmark import wait_for_network_quiet
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_ENV = "EGIS_PROFILE_TEMPLATE"
+MAX_AGE_ENV = "EGIS_PROFILE_MAX_AGE"
+DEFAULT_TEMPLATE_DIR = os.path.join(REPO_ROOT, "test-results", ".profiles")
+DEFAULT_MAX_AGE = float(os.environ.get(MAX_AGE_ENV, 12 * 3600))
+APPS = ("TDAT", "TDMT")
+MARKER = "template.json"
+
+# Chrome's per-profile locks; a copy that keeps them refuses to start
+LOCK_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie", "lockfile")
+
+logger = logging.getLogger(__name__)
+
+
+def templates_enabled():
+    return os.environ.get(TEMPLATE_ENV, "1") != "0"
+
+
+def template_path(environment=DEFAULT_ENVIRONMENT, base_dir=DEFAULT_TEMPLATE_DIR):
+    return os.path.join(base_dir, environment)
+
+
+def template_ready(path, max_age=DEFAULT_MAX_AGE):
+    """
+    Returns True if path holds a complete template younger than max_age.
+    """
+    try:
+        with open(os.path.join(path, MARKER), encoding="utf-8") as marker:
+            built = json.load(marker)["built"]
+    except (OSError, ValueError, KeyError):
+        return False
+    return time.time() - built < max_age
+
+
+def app_urls(environment=DEFAULT_ENVIRONMENT, apps=APPS):
+    return [f"https://{environment}.hud.gov/{app}/" for app in apps]
+
+
+def _remove_locks(path):
+    for directory, _, files in os.walk(path):
+        for name in files:
+            if name in LOCK_FILES:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+
+def build_template(path, environment=DEFAULT_ENVIRONMENT, apps=APPS):
+    """
+    Builds a template profile at path by loading each application until its
+    network goes quiet, then swaps it in for any previous template.
+    """
+    staging = tempfile.mkdtemp(
+        prefix="building-", dir=os.path.dirname(os.path.abspath(path))
+    )
+    # Request blocking is left to the sessions; the cache should hold
+    # everything any launch profile may load
+    driver = create_driver(profile=PROFILES["default"], user_data_dir=staging)
+    try:
+        for url in app_urls(environment, apps):
+            driver.get(url)
+            wait_for_network_quiet(driver)
+    finally:
+        driver.quit()
+        shutil.rmtree(driver.download_dir, ignore_errors=True)
+    _remove_locks(staging)
+    with open(os.path.join(staging, MARKER), "w", encoding="utf-8") as marker:
+        json.dump(
+            {"built": time.time(), "environment": environment, "apps": list(apps)},
+            marker,
+        )
+
+    previous = None
+    if os.path.exists(path):
+        previous = f"{path}.old-{os.getpid()}"
+        os.rename(path, previous)
+    os.rename(staging, path)
+    if previous:
+        shutil.rmtree(previous, ignore_errors=True)
+
+
+def ensure_template(
+    environment=DEFAULT_ENVIRONMENT,
+    refresh=False,
+    max_age=DEFAULT_MAX_AGE,
+    base_dir=DEFAULT_TEMPLATE_DIR,
+):
+    """
+    Returns the environment's template profile, building it first if it is
+    missing or stale. Concurrent callers wait for a single build.
+    Returns:
+        str: The template directory, or None if templates are disabled or
+        the template could not be built
+    """
+    if not templates_enabled():
+        return None
+    path = template_path(environment, base_dir)
+    if not refresh and template_ready(path, max_age):
+        return path
+    try:
+        with file_lock(f"{path}.lock"):
+            if refresh or not template_ready(path, max_age):
+                started = time.monotonic()
+                build_template(path, environment)
+                logger.info(
+                    f"Built profile template {path} "
+                    f"in {time.monotonic() - started:.1f}s"
+                )
+    except Exception as e:
+        logger.warning(f"Starting sessions from an empty profile: {e}")
+        return path if template_ready(path, float("inf")) else None
+    return path
+
+
+def clone_template(template):
+    """
+    Copies a template profile to a new temporary directory, as a
+    copy-on-write reflink where supported.
+    Returns:
+        str: The new profile directory; the session owning it removes it
+    """
+    clone = tempfile.mkdtemp(prefix="egis-profile-")
+    if sys.platform.startswith("linux") and shutil.which("cp"):
+        result = subprocess.run(
+            ["cp", "-a", "--reflink=auto", f"{template}/.", clone],
+            capture_output=True,
+        )
+        if result.returncode != 0:
+            shutil.rmtree(clone, ignore_errors=True)
+            shutil.copytree(template, clone, symlinks=True)
+    else:
+        shutil.copytree(template, clone, symlinks=True, dirs_exist_ok=True)
+    _remove_locks(clone)
+    return clone
+
+
+def time_to_interactive(url, template=None, timeout=60):
+    """
+    Times a cold start: launching Chrome and opening url until the splash
+    screen can be closed, the first point a test can interact with the app.
+    Args:
+        template (str): Start from a clone of this template profile
+    Returns:
+        dict: "launch", "page" and "total" seconds
+    """
+    started = time.monotonic()
+    profile_dir = clone_template(template) if template else None
+    driver = create_driver(user_data_dir=profile_dir)
+    launched = time.monotonic()
+    try:
+        driver.get(url)
+        WebDriverWait(driver, timeout).until(
+            expected_conditions.element_to_be_clickable(SPLASH_CLOSE)
+        )
+        interactive = time.monotonic()
+    finally:
+        driver.quit()
+        shutil.rmtree(driver.download_dir, ignore_errors=True)
+        if profile_dir:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+    return {
+        "launch": launched - started,
+        "page": interactive - launched,
+        "total": interactive - started,
+    }
+
+
+def benchmark(environment=DEFAULT_ENVIRONMENT, runs=3, apps=APPS):
+    """
+    Compares cold start to first interactive page from an empty profile and
+    from a clone of the template, and prints the medians.
+    """
+    started = time.monotonic()
+    chromedriver_path()
+    elapsed = time.monotonic() - started
+    print(f"chromedriver resolved in {elapsed:.2f}s (once per run)")
+    template = ensure_template(environment)
+    modes = {"empty": None}
+    if template:
+        modes["template"] = template
+    for url in app_urls(environment, apps):
+        medians = {}
+        for name, source in modes.items():
+            samples = [time_to_interactive(url, source) for _ in range(runs)]
+            medians[name] = {
+                key: statistics.median(sample[key] for sample in samples)
+                for key in ("launch", "page", "total")
+            }
+            print(
+                f"{url} {name:9} launch {medians[name]['launch']:5.2f}s  "
+                f"page {medians[name]['page']:5.2f}s  "
+                f"total {medians[name]['total']:5.2f}s (p50 of {runs})"
+            )
+        if "template" in medians:
+            base = medians["empty"]["total"]
+            change = medians["template"]["total"] - base
+            print(f"{url} template vs empty: {100 * change / (base or 1):+.0f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build the pre-warmed profile template of an environment."
+    )
+    parser.add_argument(
+        "--environment", default=DEFAULT_ENVIRONMENT, help="Environment host prefix"
+    )
+    parser.add_argument(
+        "--refresh", action="store_true", help="Rebuild even if the template is fresh"
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Time cold start to first interactive page with and without it",
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Starts per benchmark mode")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    if args.benchmark:
+        if args.refresh:
+            ensure_template(args.environment, refresh=True)
+        benchmark(args.environment, args.runs)
+        return 0
+    path = ensure_template(args.environment, refresh=args.refresh)
+    if path is None:
+        print("No profile template (disabled or the build failed)")
+        return 1
+    print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,347 @@
+"""
+Nested timing spans for tests, helpers, waits and WebDriver commands.
+
+Spans are kept in memory as Chrome trace "complete" events and written once
+per process to a JSON file that loads in chrome://tracing, Perfetto or
+speedscope. Recording a span costs a couple of clock reads and a list append,
+which is negligible next to a WebDriver round trip. Long-lived processes
+(load and matrix runs) spill older events to a spool file next to the trace
+so memory stays bounded; events after an open mark stay in memory.
+
+Tracing is on by default; set ``EGIS_TRACE=0`` to turn it off. Traces go to
+``$EGIS_TRACE_DIR`` (the parallel runner points this at the run directory) or
+``test-results/traces``.
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+TRACE_ENV = "EGIS_TRACE"
+TRACE_DIR_ENV = "EGIS_TRACE_DIR"
+DEFAULT_TRACE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "test-results",
+    "traces",
+)
+
+# Command parameters worth keeping in the trace (selectors, URLs, handles)
+TRACED_PARAMS = ("using", "value", "url", "handle", "name")
+# Events kept in memory before older ones are spilled to the spool file
+FLUSH_EVENTS = 10000
+
+
+class Span:
+    """
+    An open span; call end() (or use Tracer.span) to record it.
+    """
+
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = time.perf_counter_ns()
+
+    def end(self, **args):
+        """
+        Closes the span, optionally adding arguments.
+        Returns:
+            float: The span duration in seconds
+        """
+        duration = time.perf_counter_ns() - self.start
+        if args:
+            self.args = dict(self.args or {}, **args)
+        self.tracer._record(self, duration)
+        return duration / 1e9
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def end(self, **args):
+        return 0.0
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    Collects spans for one process and exports them as a Chrome trace.
+    """
+
+    def __init__(self, enabled=True, flush_events=FLUSH_EVENTS):
+        self.enabled = enabled
+        self.events = []
+        self.pid = os.getpid()
+        self.flush_events = flush_events
+        self._threads = {}
+        self._lock = threading.Lock()
+        # Events spilled so far, and the open marks (position to count)
+        self._flushed = 0
+        self._marks = {}
+        self._spool = None
+        # Anchor the monotonic clock to wall time so traces from several
+        # worker processes line up when merged
+        self._epoch_us = time.time_ns() // 1000
+        self._anchor_ns = time.perf_counter_ns()
+
+    def begin(self, name, category="step", **args):
+        """
+        Opens a span.
+        Args:
+            name (str): Span name shown in the trace viewer
+            category (str): Span category (test, helper, wait, command, ...)
+        Returns:
+            Span: The open span
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, category, args or None)
+
+    @contextmanager
+    def span(self, name, category="step", **args):
+        """
+        Context manager that records the enclosed block as a span.
+        """
+        span = self.begin(name, category, **args)
+        try:
+            yield span
+        finally:
+            span.end()
+
+    def thread_id(self):
+        """
+        Returns:
+            int: The trace "tid" of the calling thread's spans
+        """
+        return self._tid()
+
+    def _tid(self):
+        ident = threading.get_ident()
+        tid = self._threads.get(ident)
+        if tid is None:
+            with self._lock:
+                tid = self._threads.setdefault(ident, len(self._threads) + 1)
+        return tid
+
+    def _record(self, span, duration_ns):
+        event = {
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": self._epoch_us + (span.start - self._anchor_ns) // 1000,
+            "dur": duration_ns // 1000,
+            "pid": self.pid,
+            "tid": self._tid(),
+        }
+        if span.args:
+            event["args"] = span.args
+        # list.append is atomic, so no lock is needed on the hot path
+        self.events.append(event)
+        if len(self.events) >= self.flush_events:
+            self.flush()
+
+    def mark(self):
+        """
+        Marks the current position, e.g. at the start of a test. Events after
+        an open mark are kept in memory until it is released.
+        Returns:
+            int: The mark, for events_since() and release()
+        """
+        with self._lock:
+            mark = self._flushed + len(self.events)
+            self._marks[mark] = self._marks.get(mark, 0) + 1
+        return mark
+
+    def events_since(self, mark):
+        """
+        Returns:
+            list: The events recorded after mark
+        """
+        with self._lock:
+            return self.events[max(mark - self._flushed, 0) :]
+
+    def release(self, mark):
+        """
+        Closes a mark so the events after it may be spilled.
+        """
+        with self._lock:
+            count = self._marks.pop(mark, 0) - 1
+            if count > 0:
+                self._marks[mark] = count
+
+    def _spool_path(self):
+        directory = os.environ.get(TRACE_DIR_ENV) or DEFAULT_TRACE_DIR
+        return os.path.join(directory, f"trace-{self.pid}.spool")
+
+    def flush(self):
+        """
+        Appends the events before the oldest open mark to the spool file and
+        drops them from memory.
+        """
+        with self._lock:
+            count = len(self.events)
+            if self._marks:
+                count = min(count, min(self._marks) - self._flushed)
+            if count <= 0:
+                return
+            if self._spool is None:
+                self._spool = self._spool_path()
+                os.makedirs(os.path.dirname(self._spool), exist_ok=True)
+            with open(self._spool, "a", encoding="utf-8") as spool:
+                for event in self.events[:count]:
+                    spool.write(json.dumps(event) + "\n")
+            # Deleting from the front is atomic, like the appends at the end
+            del self.events[:count]
+            self._flushed += count
+
+    def export(self, path=None):
+        """
+        Writes the collected spans as a Chrome trace file.
+        Args:
+            path (str): Output file; defaults to trace-<pid>.json in the trace dir
+        Returns:
+            str: The path written, or None if there was nothing to write
+        """
+        if not self.events and self._spool is None:
+            return None
+        if path is None:
+            directory = os.environ.get(TRACE_DIR_ENV) or DEFAULT_TRACE_DIR
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"trace-{self.pid}.json")
+        metadata = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": self.pid,
+                "args": {"name": f"worker {os.environ.get('EGIS_WORKER', self.pid)}"},
+            }
+        ]
+        with self._lock:
+            events = self.events[:]
+            spool, self._spool = self._spool, None
+            del self.events[: len(events)]
+            self._flushed += len(events)
+        with open(path, "w", encoding="utf-8") as trace:
+            # Streamed, so spilled events are never all in memory at once
+            trace.write('{"displayTimeUnit": "ms", "traceEvents": [')
+            trace.write(json.dumps(metadata[0]))
+            if spool:
+                with open(spool, encoding="utf-8") as spilled:
+                    for line in spilled:
+                        trace.write("," + line.rstrip("\n"))
+                os.remove(spool)
+            for event in events:
+                trace.write("," + json.dumps(event))
+            trace.write("]}")
+        return path
+
+
+def instrument_driver(driver, tracer=None):
+    """
+    Records every WebDriver command sent through driver as a span.
+    All commands, including WebElement calls, go through driver.execute.
+    """
+    tracer = tracer or get_tracer()
+    if not tracer.enabled or getattr(driver, "_egis_traced", False):
+        return driver
+    execute = driver.execute
+
+    @functools.wraps(execute)
+    def traced_execute(driver_command, params=None):
+        args = None
+        if params:
+            args = {key: params[key] for key in TRACED_PARAMS if key in params}
+        span = tracer.begin(driver_command, "command", **(args or {}))
+        try:
+            return execute(driver_command, params)
+        finally:
+            span.end()
+
+    driver.execute = traced_execute
+    driver._egis_traced = True
+    return driver
+
+
+def traced(method):
+    """
+    Decorator that records each call of a helper method as a span.
+    """
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with get_tracer().span(method.__name__, "helper"):
+            return method(*args, **kwargs)
+
+    return wrapper
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    """
+    Returns the process-wide tracer; its trace is written at exit.
+    """
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer(enabled=os.environ.get(TRACE_ENV, "1") != "0")
+                atexit.register(_tracer.export)
+    return _tracer
+
+
+def export_trace():
+    """
+    Writes the process-wide trace now. Worker processes call this explicitly
+    because multiprocessing children exit without running atexit handlers.
+    """
+    if _tracer is not None:
+        return _tracer.export()
+    return None
+
+
+def merge_traces(paths, output_file):
+    """
+    Combines per-process trace files into one trace.
+    """
+    events = []
+    for path in paths:
+        with open(path, encoding="utf-8") as trace:
+            events.extend(json.load(trace)["traceEvents"])
+    with open(output_file, "w", encoding="utf-8") as merged:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, merged)
+    return output_file
+
+
+def step_timings(events):
+    """
+    Totals the spans recorded during one test.
+    Args:
+        events (list): Trace events recorded while the test ran
+    Returns:
+        dict: Seconds per helper method, plus "waits" and "commands" totals
+    """
+    steps = {}
+    for event in events:
+        if event["cat"] == "helper":
+            key = event["name"]
+        elif event["cat"] == "wait":
+            key = "waits"
+        elif event["cat"] == "command":
+            key = "commands"
+        else:
+            continue
+        steps[key] = steps.get(key, 0.0) + event["dur"] / 1e6
+    return {key: round(seconds, 3) for key, seconds in steps.items()}
@@ -0,0 +1,377 @@
+"""
+Condition-based waits for the EGIS test suites.
+
+Replaces fixed ``time.sleep`` calls with ``WebDriverWait`` conditions that
+return as soon as the page reaches the expected state, and keeps a per-run
+account of how much wall time was spent waiting.
+"""
+
+import time
+from collections import defaultdict
+
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from egis_testing.downloads import wait_for_download
+from egis_testing.tracing import get_tracer
+
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_POLL_FREQUENCY = 0.1
+
+GRID_RENDERED = """
+const title = document.getElementById(arguments[0]);
+return title && title.getClientRects().length && title.innerText.trim() ? title : null;
+"""
+
+
+def xpath_literal(text):
+    """
+    Quotes text as an XPath string literal, including text that contains
+    both quote characters (e.g. county and tribe names with apostrophes).
+    """
+    if "'" not in text:
+        return f"'{text}'"
+    if '"' not in text:
+        return f'"{text}"'
+    parts = text.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in parts) + ")"
+
+
+class WaitStats:
+    """
+    Accumulates time spent in explicit waits for a single test run.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.totals = defaultdict(float)
+        self.counts = defaultdict(int)
+        self.timeouts = defaultdict(int)
+
+    def record(self, description, elapsed, timed_out=False):
+        """
+        Records one completed wait.
+        Args:
+            description (str): Name of the condition that was waited on
+            elapsed (float): Seconds spent waiting
+            timed_out (bool): Whether the wait ended in a timeout
+        """
+        self.totals[description] += elapsed
+        self.counts[description] += 1
+        if timed_out:
+            self.timeouts[description] += 1
+
+    @property
+    def waited(self):
+        return sum(self.totals.values())
+
+    def summary(self):
+        """
+        Summarises the run so far.
+        Returns:
+            dict: Wall time, time spent waiting, time spent on real work and
+            a per-condition breakdown sorted by total wait time.
+        """
+        wall = time.perf_counter() - self.started
+        waited = self.waited
+        conditions = [
+            {
+                "condition": name,
+                "count": self.counts[name],
+                "total": round(total, 3),
+                "timeouts": self.timeouts[name],
+            }
+            for name, total in sorted(
+                self.totals.items(), key=lambda item: item[1], reverse=True
+            )
+        ]
+        return {
+            "wall": round(wall, 3),
+            "waited": round(waited, 3),
+            "work": round(max(wall - waited, 0.0), 3),
+            "conditions": conditions,
+        }
+
+    def log_summary(self, logger):
+        """
+        Writes the summary to the given logger.
+        Args:
+            logger (logging.Logger): Logger to write to
+        """
+        summary = self.summary()
+        wall = summary["wall"] or 1.0
+        logger.info(
+            f"Wait summary: {summary['waited']:.2f}s waiting "
+            f"({100 * summary['waited'] / wall:.0f}%), "
+            f"{summary['work']:.2f}s working, {summary['wall']:.2f}s wall"
+        )
+        for condition in summary["conditions"]:
+            logger.info(
+                f"  {condition['condition']}: {condition['total']:.2f}s "
+                f"over {condition['count']} waits "
+                f"({condition['timeouts']} timeouts)"
+            )
+
+
+class Waiter:
+    """
+    Explicit waits for the page states the EGIS suites depend on.
+
+    The driver's implicit wait is suspended while a condition is polled so
+    that absence checks (closed modals, missing elements) return on the first
+    poll instead of blocking for the full implicit timeout.
+    """
+
+    def __init__(
+        self,
+        driver,
+        timeout=DEFAULT_TIMEOUT,
+        poll_frequency=DEFAULT_POLL_FREQUENCY,
+        stats=None,
+        implicit_wait=0,
+    ):
+        """
+        Args:
+            driver (WebDriver): The driver to wait on
+            timeout (float): Default number of seconds before giving up
+            poll_frequency (float): Seconds between condition checks
+            stats (WaitStats): Optional accumulator for wait timings
+            implicit_wait (float): The implicit wait to restore after polling
+        """
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.stats = stats
+        self.implicit_wait = implicit_wait
+
+    def until(self, condition, description, timeout=None):
+        """
+        Waits until the condition returns a truthy value.
+        Args:
+            condition (callable): Called with the driver until truthy
+            description (str): Name of the condition for logs and stats
+            timeout (float): Overrides the default timeout
+        Returns:
+            The truthy value returned by the condition.
+        Raises:
+            TimeoutException: If the condition is not met in time
+        """
+        wait = WebDriverWait(
+            self.driver,
+            self.timeout if timeout is None else timeout,
+            poll_frequency=self.poll_frequency,
+        )
+        if self.implicit_wait:
+            self.driver.implicitly_wait(0)
+        span = get_tracer().begin(f"wait {description}", "wait")
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return wait.until(condition, f"Timed out waiting for {description}")
+        except TimeoutException:
+            timed_out = True
+            raise
+        finally:
+            if self.stats is not None:
+                self.stats.record(
+                    description, time.perf_counter() - start, timed_out
+                )
+            span.end(timed_out=timed_out)
+            if self.implicit_wait:
+                self.driver.implicitly_wait(self.implicit_wait)
+
+    # Page state
+    def page_ready(self, timeout=None):
+        """
+        Waits until the document has finished loading.
+        """
+        return self.until(
+            lambda driver: driver.execute_script("return document.readyState")
+            == "complete",
+            "page ready",
+            timeout,
+        )
+
+    def visible(self, locator, timeout=None):
+        """
+        Waits until the element is present and visible.
+        Args:
+            locator (tuple): A (By, selector) pair
+        Returns:
+            WebElement: The visible element
+        """
+        return self.until(
+            EC.visibility_of_element_located(locator),
+            f"visible {locator[1]}",
+            timeout,
+        )
+
+    def clickable(self, locator, timeout=None):
+        """
+        Waits until the element is visible and enabled.
+        Args:
+            locator (tuple): A (By, selector) pair
+        Returns:
+            WebElement: The clickable element
+        """
+        return self.until(
+            EC.element_to_be_clickable(locator),
+            f"clickable {locator[1]}",
+            timeout,
+        )
+
+    # Modals
+    def modal_open(self, modal_selector, timeout=None):
+        """
+        Waits until a modal has finished opening.
+        Args:
+            modal_selector (str): CSS selector of the modal container
+        Returns:
+            WebElement: The modal element
+        """
+        return self.until(
+            EC.visibility_of_element_located((By.CSS_SELECTOR, modal_selector)),
+            f"modal open {modal_selector}",
+            timeout,
+        )
+
+    def modal_closed(self, modal_selector, timeout=None):
+        """
+        Waits until a modal is hidden and its backdrop has been removed.
+        Args:
+            modal_selector (str): CSS selector of the modal container
+        """
+
+        def closed(driver):
+            for element in driver.find_elements(By.CSS_SELECTOR, modal_selector):
+                if element.is_displayed():
+                    return False
+            return not driver.find_elements(By.CSS_SELECTOR, ".modal-backdrop")
+
+        return self.until(closed, f"modal closed {modal_selector}", timeout)
+
+    # Dropdowns
+    def option_present(self, option_text, dropdown_id=None, timeout=None, scope=None):
+        """
+        Waits until an option with the given text has been loaded.
+        Args:
+            option_text (str): The visible text of the option
+            dropdown_id (str): Optionally restrict the search to one dropdown
+            scope (str): Optionally restrict the search to an XPath expression
+        Returns:
+            WebElement: The option element
+        """
+        if dropdown_id:
+            scope = f"//*[@id={xpath_literal(dropdown_id)}]"
+        xpath = f"{scope or ''}//option[text()={xpath_literal(option_text)}]"
+        return self.until(
+            EC.presence_of_element_located((By.XPATH, xpath)),
+            f"option {option_text}",
+            timeout,
+        )
+
+    def dropdown_populated(self, dropdown_id, option_text=None, timeout=None):
+        """
+        Waits until a dropdown has been filled with options.
+        Args:
+            dropdown_id (str): The ID of the dropdown element
+            option_text (str): If given, wait for this specific option
+        Returns:
+            WebElement: The requested option, or the dropdown itself
+        """
+        if option_text is not None:
+            return self.option_present(option_text, dropdown_id, timeout)
+
+        def populated(driver):
+            try:
+                dropdown = driver.find_element(By.ID, dropdown_id)
+            except NoSuchElementException:
+                return False
+            options = dropdown.find_elements(By.TAG_NAME, "option")
+            return dropdown if len(options) > 1 else False
+
+        return self.until(populated, f"dropdown populated #{dropdown_id}", timeout)
+
+    # Results grid
+    def grid_rendered(self, title_id="grid-title", timeout=None):
+        """
+        Waits until the results grid title is visible and has text.
+        Args:
+            title_id (str): The ID of the grid title element
+        Returns:
+            WebElement: The grid title element
+        """
+
+        def rendered(driver):
+            # One round trip per poll instead of find + is_displayed + text
+            return driver.execute_script(GRID_RENDERED, title_id) or False
+
+        return self.until(rendered, f"grid rendered #{title_id}", timeout)
+
+    # Windows
+    def new_window_opened(self, known_handles, timeout=None):
+        """
+        Waits until a window that was not in known_handles has opened.
+        Args:
+            known_handles (list): Window handles open before the action
+        Returns:
+            str: The handle of the new window
+        """
+        self.until(
+            EC.new_window_is_opened(list(known_handles)),
+            "new window opened",
+            timeout,
+        )
+        return next(
+            handle
+            for handle in self.driver.window_handles
+            if handle not in known_handles
+        )
+
+    def window_navigated(self, timeout=None):
+        """
+        Waits until the current window has navigated away from about:blank.
+        Returns:
+            str: The current URL
+        """
+        return self.until(
+            lambda driver: driver.current_url not in ("", "about:blank")
+            and driver.current_url,
+            "window navigated",
+            timeout,
+        )
+
+    def url_changes(self, previous_url, timeout=None):
+        """
+        Waits until the current URL differs from previous_url.
+        """
+        return self.until(EC.url_changes(previous_url), "url change", timeout)
+
+    # Filesystem
+    def file_downloaded(self, directory, pattern, timeout=None):
+        """
+        Waits until a finished file matching pattern exists in directory.
+        Uses filesystem events rather than polling the driver.
+        Args:
+            directory (str): Directory the browser downloads into
+            pattern (str): Glob pattern of the expected file name
+        Returns:
+            str: Path of the downloaded file
+        Raises:
+            TimeoutException: If no finished download appears in time
+        """
+        description = f"download {pattern}"
+        span = get_tracer().begin(f"wait {description}", "wait")
+        start = time.perf_counter()
+        path = wait_for_download(
+            directory, pattern, self.timeout if timeout is None else timeout
+        )
+        if self.stats is not None:
+            self.stats.record(description, time.perf_counter() - start, path is None)
+        span.end(timed_out=path is None)
+        if path is None:
+            raise TimeoutException(f"Timed out waiting for {description}")
+        return path
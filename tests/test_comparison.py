@@ -0,0 +1,109 @@
+import unittest
+
+from egis_testing.comparison import compare, format_comparison
+
+
+ENVIRONMENTS = ["egis", "egis-stg"]
+
+
+def records(test, baseline, other):
+    """
+    Result records of one test in both environments; each side is
+    (outcome, duration, steps).
+    """
+    return [
+        {
+            "id": f"tdat_test.TDATSiteNavigationTests.{test}",
+            "app": "TDAT",
+            "environment": environment,
+            "outcome": outcome,
+            "duration": duration,
+            "steps": steps,
+        }
+        for environment, (outcome, duration, steps) in zip(
+            ENVIRONMENTS, (baseline, other)
+        )
+    ]
+
+
+class CompareTests(unittest.TestCase):
+    CASES = [
+        # name, baseline, other, expected flags, expected worst ratio
+        ("same", ("success", 2.0, {}), ("success", 2.2, {}), [], 1.1),
+        (
+            "slower",
+            ("success", 2.0, {}),
+            ("success", 5.0, {}),
+            ["2.5x slower on egis-stg"],
+            2.5,
+        ),
+        (
+            "outcome differs",
+            ("success", 2.0, {}),
+            ("failure", 2.0, {}),
+            ["failure on egis-stg, success on egis"],
+            1.0,
+        ),
+        # Both under MIN_SECONDS: the ratio means nothing
+        ("too short", ("success", 0.1, {}), ("success", 0.4, {}), [], 1.0),
+        (
+            "slower step",
+            ("success", 10.0, {"search_counties": 1.0, "waits": 2.0}),
+            ("success", 11.0, {"search_counties": 3.0, "waits": 2.1}),
+            ["search_counties 3.0x slower on egis-stg"],
+            3.0,
+        ),
+        (
+            "short step",
+            ("success", 10.0, {"open_menu": 0.1}),
+            ("success", 10.0, {"open_menu": 0.45}),
+            [],
+            1.0,
+        ),
+    ]
+
+    def test_flags(self):
+        for name, baseline, other, flags, worst in self.CASES:
+            with self.subTest(name):
+                (row,) = compare(records("test_x", baseline, other), ENVIRONMENTS)
+                self.assertEqual(row["flags"], flags)
+                self.assertAlmostEqual(row["worst"], worst)
+
+    def test_deltas_only_for_passing_tests(self):
+        (passed,) = compare(
+            records("test_x", ("success", 2.0, {}), ("success", 3.0, {})),
+            ENVIRONMENTS,
+        )
+        self.assertEqual(passed["deltas"], {"egis-stg": {"seconds": 1.0, "ratio": 1.5}})
+        (failed,) = compare(
+            records("test_x", ("success", 2.0, {}), ("error", 3.0, {})),
+            ENVIRONMENTS,
+        )
+        self.assertEqual(failed["deltas"], {})
+
+    def test_flagged_and_slowest_first(self):
+        rows = compare(
+            records("test_a", ("success", 2.0, {}), ("success", 2.0, {}))
+            + records("test_b", ("success", 2.0, {}), ("success", 5.0, {}))
+            + records("test_c", ("success", 2.0, {}), ("success", 8.0, {}))
+            + records("test_d", ("success", 2.0, {}), ("failure", 2.0, {})),
+            ENVIRONMENTS,
+        )
+        self.assertEqual(
+            [row["test"].rsplit(".", 1)[-1] for row in rows],
+            ["test_c", "test_b", "test_d", "test_a"],
+        )
+
+    def test_missing_environment(self):
+        rows = compare(
+            records("test_x", ("success", 2.0, {}), ("success", 9.0, {}))[:1],
+            ENVIRONMENTS,
+        )
+        self.assertEqual(rows[0]["flags"], [])
+        lines = format_comparison(rows, ENVIRONMENTS)
+        self.assertIn("egis-stg: 0/0 passed, 0.0s of test time", lines)
+        self.assertEqual(lines[-1], "0 of 1 tests flagged")
+
+
+if __name__ == "__main__":
+    unittest.main()
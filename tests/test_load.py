@@ -0,0 +1,77 @@
+import argparse
+import unittest
+
+from egis_testing.load import Metrics, parse_stages, target_users
+
+
+class StageTests(unittest.TestCase):
+    def test_parse_stages(self):
+        self.assertEqual(
+            parse_stages("10:30,50:60,0:10"), [(10, 30.0), (50, 60.0), (0, 10.0)]
+        )
+        self.assertEqual(parse_stages("5:2.5"), [(5, 2.5)])
+        for value in ("10", "10:30,", "a:30", "10:30:5"):
+            with self.subTest(value):
+                with self.assertRaises(argparse.ArgumentTypeError):
+                    parse_stages(value)
+
+    def test_target_users(self):
+        stages = [(10, 30.0), (50, 60.0), (0, 10.0)]
+        cases = [
+            (0.0, 0),
+            (15.0, 5),
+            (29.9, 10),
+            # A stage boundary starts the next ramp from the previous target
+            (30.0, 10),
+            (60.0, 30),
+            (89.9, 50),
+            (90.0, 50),
+            (95.0, 25),
+            (99.9, 0),
+            # The profile has ended
+            (100.0, None),
+            (1000.0, None),
+        ]
+        for elapsed, users in cases:
+            with self.subTest(elapsed=elapsed):
+                self.assertEqual(target_users(stages, elapsed), users)
+
+    def test_empty_profile(self):
+        self.assertIsNone(target_users([], 0.0))
+
+
+class TimelineTests(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Metrics()
+        # (offset, step, seconds, ok), as Metrics.add records them
+        self.metrics.samples = [
+            (1.0, "address", 0.2, True),
+            (9.99, "address", 0.4, True),
+            (10.0, "address", 1.0, False),
+            (12.0, "search_address", 5.0, True),
+            (35.0, "counties", 0.3, True),
+        ]
+        self.metrics.users = [(0.5, 1), (5.0, 3), (10.0, 2), (31.0, 4)]
+
+    def test_windows(self):
+        rows = self.metrics.timeline(["address", "counties"], window=10.0)
+        self.assertEqual([row["start"] for row in rows], [0.0, 10.0, 20.0, 30.0])
+        self.assertEqual([row["users"] for row in rows], [3, 2, 0, 4])
+        self.assertEqual([row["throughput"] for row in rows], [0.2, 0.1, 0.0, 0.1])
+        # Steps that are not flows are left out; an empty window has no p95
+        self.assertEqual([row["p95"] for row in rows], [390.0, 1000.0, None, 300.0])
+
+    def test_no_flow_samples(self):
+        self.assertEqual(self.metrics.timeline(["tribe"]), [])
+
+    def test_summary(self):
+        summary = self.metrics.summary(elapsed=30.0)
+        self.assertEqual(summary["address"]["count"], 3)
+        self.assertEqual(summary["address"]["errors"], 1)
+        self.assertEqual(summary["address"]["throughput"], 0.1)
+        self.assertEqual(summary["address"]["max"], 1000.0)
+        self.assertEqual(summary["counties"]["p50"], 300.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
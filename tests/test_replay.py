@@ -0,0 +1,134 @@
+import os
+import tempfile
+import unittest
+
+from egis_testing.replay import Archive, normalize_url, request_key
+
+
+class KeyTests(unittest.TestCase):
+    def test_normalize_url(self):
+        cases = [
+            # Parameters are sorted
+            ("https://h/a?b=2&a=1", "https://h/a?a=1&b=2"),
+            # Cache busters are dropped
+            ("https://h/a?a=1&_=123&dojo.preventCache=456", "https://h/a?a=1"),
+            ("https://h/a?timestamp=1&nocache=2&_ts=3", "https://h/a"),
+            # The host is case-insensitive, the path is not
+            ("https://WWW.Example.GOV/Path", "https://www.example.gov/Path"),
+            # Fragments never reach the server
+            ("https://h/a?a=1#top", "https://h/a?a=1"),
+            # Blank values are kept
+            ("https://h/a?q=&a=1", "https://h/a?a=1&q="),
+        ]
+        for url, expected in cases:
+            with self.subTest(url):
+                self.assertEqual(normalize_url(url), expected)
+
+    def test_request_key(self):
+        self.assertEqual(
+            request_key("get", "https://h/a?b=2&a=1&_=9"),
+            request_key("GET", "https://h/a?a=1&b=2"),
+        )
+        self.assertEqual(request_key("GET", "https://h/a"), "GET https://h/a -")
+        self.assertNotEqual(
+            request_key("POST", "https://h/a", b"where=1=1"),
+            request_key("POST", "https://h/a", b"where=2=2"),
+        )
+        self.assertNotEqual(
+            request_key("GET", "https://h/a"), request_key("POST", "https://h/a")
+        )
+
+
+class ArchiveTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "recording")
+
+    def record(self, exchanges):
+        archive = Archive(self.path, mode="w")
+        for method, url, request_body, body in exchanges:
+            archive.add(
+                method,
+                url,
+                request_body,
+                200,
+                [["Content-Type", "application/json"]],
+                body,
+                0.1,
+                "application/x-www-form-urlencoded" if request_body else None,
+            )
+        return archive
+
+    def test_round_trip(self):
+        self.record(
+            [
+                ("GET", "https://h/rest/info?f=json&_=1", b"", b'{"v": 1}'),
+                ("POST", "https://h/rest/0/query", b"where=1=1", b'{"count": 3}'),
+            ]
+        )
+        archive = Archive(self.path)
+        self.assertEqual(len(archive), 2)
+
+        # A differently ordered, cache-busted URL finds the same recording
+        entry = archive.lookup("get", "https://H/rest/info?_=2&f=json")
+        self.assertEqual(entry["status"], 200)
+        self.assertEqual(entry["url"], "https://h/rest/info?f=json&_=1")
+        self.assertEqual(archive.read_body(entry), b'{"v": 1}')
+        self.assertEqual(archive.read_request_body(entry), b"")
+
+        entry = archive.lookup("POST", "https://h/rest/0/query", b"where=1=1")
+        self.assertEqual(archive.read_body(entry), b'{"count": 3}')
+        self.assertEqual(archive.read_request_body(entry), b"where=1=1")
+        self.assertEqual(entry["request_type"], "application/x-www-form-urlencoded")
+
+        self.assertIsNone(archive.lookup("POST", "https://h/rest/0/query", b"x"))
+        self.assertIsNone(archive.lookup("GET", "https://h/rest/other"))
+
+    def test_repeated_requests_replay_in_order(self):
+        url = "https://h/rest/0/query?where=1%3D1"
+        self.record(
+            [
+                ("GET", url, b"", b"first"),
+                ("GET", "https://h/other", b"", b"other"),
+                ("GET", url, b"", b"second"),
+                ("GET", url, b"", b"third"),
+            ]
+        )
+        archive = Archive(self.path)
+        bodies = [archive.read_body(archive.lookup("GET", url)) for _ in range(5)]
+        # Once the recordings run out the last one is served again
+        self.assertEqual(bodies, [b"first", b"second", b"third", b"third", b"third"])
+        # Each archive keeps its own replay position
+        self.assertEqual(
+            Archive(self.path).read_body(Archive(self.path).lookup("GET", url)),
+            b"first",
+        )
+
+    def test_identical_bodies_share_a_blob(self):
+        archive = self.record(
+            [
+                ("GET", "https://h/a", b"", b"same"),
+                ("GET", "https://h/b", b"", b"same"),
+            ]
+        )
+        first = archive.lookup("GET", "https://h/a")
+        second = archive.lookup("GET", "https://h/b")
+        self.assertEqual(first["blob"], second["blob"])
+
+    def test_recording_discards_previous_entries(self):
+        self.record([("GET", "https://h/a", b"", b"old")])
+        self.record([("GET", "https://h/b", b"", b"new")])
+        archive = Archive(self.path)
+        self.assertEqual(len(archive), 1)
+        self.assertIsNone(archive.lookup("GET", "https://h/a"))
+        entry = archive.lookup("GET", "https://h/b")
+        self.assertEqual(archive.read_body(entry), b"new")
+
+    def test_missing_recording(self):
+        with self.assertRaises(FileNotFoundError):
+            Archive(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import os
+import tempfile
+import unittest
+
+from egis_testing.results import ResultsStore
+from egis_testing.scheduler import (
+    DEFAULT_ESTIMATE,
+    WORKER_OVERHEAD,
+    estimate_durations,
+    failure_risks,
+    predicted_loads,
+    schedule,
+    schedule_within_budget,
+)
+
+
+def make_tests(*names):
+    return [
+        ("apps/TDAT", f"tdat_test.TDATSiteNavigationTests.{name}") for name in names
+    ]
+
+
+def names(shard):
+    return [test_id.rsplit(".", 1)[-1] for _, test_id in shard]
+
+
+class ScheduleTests(unittest.TestCase):
+    def setUp(self):
+        self.tests = make_tests("a", "b", "c", "d", "e")
+        self.estimates = {
+            test_id: seconds
+            for (_, test_id), seconds in zip(self.tests, [10.0, 8.0, 6.0, 5.0, 4.0])
+        }
+
+    def test_longest_first_onto_least_loaded(self):
+        shards, loads = schedule(self.tests, 2, self.estimates)
+        # a(10) -> 0, b(8) -> 1, c(6) -> 1, d(5) -> 0, e(4) -> 1
+        self.assertEqual(
+            [names(shard) for shard in shards], [["a", "d"], ["b", "c", "e"]]
+        )
+        self.assertEqual(loads, [15.0, 18.0])
+        self.assertEqual(predicted_loads(shards, self.estimates), loads)
+
+    def test_more_workers_than_tests(self):
+        shards, loads = schedule(self.tests[:2], 8, self.estimates)
+        self.assertEqual(len(shards), 2)
+        self.assertEqual(sorted(loads), [8.0, 10.0])
+
+    def test_equal_estimates_are_stable(self):
+        tests = make_tests("z", "y", "x", "w")
+        estimates = {test_id: 5.0 for _, test_id in tests}
+        first = schedule(tests, 2, estimates)
+        self.assertEqual(schedule(list(reversed(tests)), 2, estimates), first)
+        self.assertEqual(
+            [names(shard) for shard in first[0]], [["w", "y"], ["x", "z"]]
+        )
+
+
+class BudgetTests(unittest.TestCase):
+    def setUp(self):
+        self.tests = make_tests("a", "b", "c", "d")
+        self.estimates = {test_id: 10.0 for _, test_id in self.tests}
+        self.risks = {test_id: 0.5 for _, test_id in self.tests}
+
+    def test_everything_fits(self):
+        shards, loads, dropped = schedule_within_budget(
+            self.tests, 2, self.estimates, self.risks, 100.0
+        )
+        self.assertEqual(dropped, [])
+        self.assertEqual(sorted(loads), [20.0, 20.0])
+
+    def test_budget_cut_off_reports_dropped_tests(self):
+        # Room for one 10 s test per worker
+        budget = WORKER_OVERHEAD + 15.0
+        shards, loads, dropped = schedule_within_budget(
+            self.tests, 2, self.estimates, self.risks, budget
+        )
+        self.assertEqual(sum(len(shard) for shard in shards), 2)
+        self.assertEqual(names(dropped), ["c", "d"])
+        self.assertTrue(all(load <= budget - WORKER_OVERHEAD for load in loads))
+
+    def test_riskier_and_cheaper_tests_win(self):
+        risks = dict(self.risks)
+        risks[self.tests[3][1]] = 1.0
+        estimates = dict(self.estimates)
+        estimates[self.tests[2][1]] = 2.0
+        shards, _, dropped = schedule_within_budget(
+            self.tests, 1, estimates, risks, WORKER_OVERHEAD + 12.0
+        )
+        # c is worth the most per second, then d; only they fit
+        self.assertEqual(names(shards[0]), ["d", "c"])
+        self.assertEqual(names(dropped), ["a", "b"])
+
+    def test_most_valuable_first_within_a_worker(self):
+        risks = {
+            test_id: 0.1 * index for index, (_, test_id) in enumerate(self.tests)
+        }
+        shards, _, _ = schedule_within_budget(
+            self.tests, 1, self.estimates, risks, 1000.0
+        )
+        self.assertEqual(names(shards[0]), ["d", "c", "b", "a"])
+
+    def test_nothing_fits(self):
+        shards, loads, dropped = schedule_within_budget(
+            self.tests, 2, self.estimates, self.risks, WORKER_OVERHEAD
+        )
+        self.assertEqual(shards, [[], []])
+        self.assertEqual(len(dropped), 4)
+
+
+class HistoryTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = ResultsStore(os.path.join(directory.name, "results.sqlite"))
+        self.tests = make_tests("flaky", "stable", "new", "test_export_to_excel")
+
+    def record(self, outcomes):
+        self.store.add_run(
+            [
+                {
+                    "id": self.tests[index][1],
+                    "app": "TDAT",
+                    "outcome": outcome,
+                    "duration": 3.0,
+                }
+                for index, outcome in outcomes.items()
+            ]
+        )
+
+    def test_failure_risks_are_smoothed(self):
+        self.record({0: "failure", 1: "success"})
+        self.record({0: "failure", 1: "success", 2: "skipped"})
+        risks = failure_risks(self.tests, self.store)
+        self.assertEqual(risks[self.tests[0][1]], 0.75)
+        self.assertEqual(risks[self.tests[1][1]], 0.25)
+        # Skipped runs do not count; no history is a coin flip
+        self.assertEqual(risks[self.tests[2][1]], 0.5)
+
+    def test_estimates_fall_back_to_static_values(self):
+        self.record({1: "success"})
+        estimates = estimate_durations(self.tests, self.store)
+        self.assertEqual(estimates[self.tests[1][1]], 3.0)
+        self.assertEqual(estimates[self.tests[2][1]], DEFAULT_ESTIMATE)
+        self.assertEqual(estimates[self.tests[3][1]], 40.0)
+
+
+if __name__ == "__main__":
+    unittest.main()